@@ -1,5 +1,22 @@
-from .state import ResearchState, Source, Note, SearchResult, VerificationClaim
-from .graph import build_graph, run_research
+# public API, loaded on first attribute access so `import agent` stays cheap
+# (graph pulls in langgraph & the model SDKs)
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .state import ResearchState, Source, Note, SearchResult, VerificationClaim
+    from .graph import build_graph, run_research
+
+_EXPORTS = {
+    "ResearchState": ".state",
+    "Source": ".state",
+    "Note": ".state",
+    "SearchResult": ".state",
+    "VerificationClaim": ".state",
+    "build_graph": ".graph",
+    "run_research": ".graph",
+}
 
 __all__ = [
     "ResearchState",
@@ -9,4 +26,17 @@ __all__ = [
     "VerificationClaim",
     "build_graph",
     "run_research",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,82 @@
+"""
+Content-addressed blob store
+
+heavy payloads (raw search results, page chunks, report text) are stored once
+under the hash of their bytes & referenced from state by ID
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+BLOB_PREFIX = "blob:"
+
+
+def blob_id(data: bytes) -> str:
+    return BLOB_PREFIX + hashlib.sha256(data).hexdigest()[:32]
+
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_PREFIX) and len(value) == len(BLOB_PREFIX) + 32
+
+
+class BlobStore:
+    """
+    blob store held in memory, or in a directory (one file per blob) when root is given
+
+    identical payloads get the same ID, so storing them again is free
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root) if root else None
+        self._blobs: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ref: str) -> Path:
+        digest = ref[len(BLOB_PREFIX):]
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        ref = blob_id(data)
+        if self.root is None:
+            with self._lock:
+                self._blobs.setdefault(ref, data)
+            return ref
+        path = self._path(ref)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        if self.root is None:
+            with self._lock:
+                data = self._blobs.get(ref)
+        else:
+            path = self._path(ref)
+            data = path.read_bytes() if path.exists() else None
+        if data is None:
+            raise KeyError(f"Unknown blob: {ref}")
+        return data
+
+    def __contains__(self, ref: str) -> bool:
+        if self.root is None:
+            with self._lock:
+                return ref in self._blobs
+        return self._path(ref).exists()
+
+    def refs(self) -> list[str]:
+        if self.root is None:
+            with self._lock:
+                return list(self._blobs)
+        return [BLOB_PREFIX + p.name for p in self.root.glob("*/*") if not p.name.endswith(".tmp")]
+
+    def __len__(self) -> int:
+        return len(self.refs())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(self.get(ref)) for ref in self.refs())
@@ -0,0 +1,216 @@
+"""
+Run budgets: deadline, token & search limits with graceful degradation
+
+a Budget is made per run (deadline_s / max_tokens / max_search_calls on
+run_research, stream_research or the CLI) and, like the tracer, travels in
+the LangGraph config and is activated inside each node. Nodes charge it for
+LLM tokens and searches and ask it how much more work fits; as it drains the
+run degrades in this order, always keeping room for the report itself:
+
+    fewer subquestions -> fewer sources -> smaller extraction model -> CoVe skipped
+
+every degradation is recorded in state["degradations"].
+
+    research "..." --cove --deadline 60 --max-tokens 40000 --max-search-calls 8
+
+costs are estimated in "average LLM calls": an EWMA of the run's observed
+call latency & tokens (defaults until the planner has answered), with report
+calls (writer / reviser) counted as several.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# run_research / stream_research options that make a run's Budget (not graph config)
+BUDGET_KEYS = ("deadline_s", "max_tokens", "max_search_calls")
+
+_budget: contextvars.ContextVar["Budget | None"] = contextvars.ContextVar("budget", default=None)
+
+
+def current_budget() -> "Budget | None":
+    # budget of the run whose node is executing in this context, if any
+    return _budget.get()
+
+
+class Budget:
+    """
+    time / token / search allowance of one run and the degradation policy
+
+    limits left as None are unbounded; clock is injectable for tests
+    """
+
+    # cost of one LLM call before any has been observed
+    DEFAULT_CALL_S = 4.0
+    DEFAULT_CALL_TOKENS = 1500
+    # a writer or reviser call, in average calls (long prompt & output)
+    REPORT_CALLS = 4.0
+    # CoVe after drafting: compile (1 call) + revise
+    COVE_CALLS = 1.0 + REPORT_CALLS
+    # searches kept back at planning time for CoVe verification
+    VERIFY_SEARCHES = 2
+    # share of the tightest limit used past which extraction moves to the smaller model
+    FAST_EXTRACTION_PRESSURE = 0.5
+    # extraction calls one deepening search costs (agent.graph.SOURCES_PER_GAP)
+    GAP_CALLS = 2.0
+
+    def __init__(
+            self,
+            deadline_s: float | None = None,
+            max_tokens: int | None = None,
+            max_search_calls: int | None = None,
+            alpha: float = 0.3,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        for name, value in (("deadline_s", deadline_s), ("max_tokens", max_tokens), ("max_search_calls", max_search_calls)):
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive, got {value}")
+        self.deadline_s = deadline_s
+        self.max_tokens = max_tokens
+        self.max_search_calls = max_search_calls
+        self.alpha = alpha
+        self.clock = clock
+        self.start = clock()
+        self.tokens = 0
+        self.search_calls = 0
+        self.denied_searches = 0
+        self.call_s: float | None = None
+        self.call_tokens: float | None = None
+        # set once extraction has been moved to the smaller model
+        self.fast_extraction = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(cls, **options) -> "Budget | None":
+        # Budget for the BUDGET_KEYS options given, or None when all are unset
+        limits = {key: options.get(key) for key in BUDGET_KEYS}
+        return cls(**limits) if any(v is not None for v in limits.values()) else None
+
+    @contextmanager
+    def activate(self) -> Iterator["Budget"]:
+        token = _budget.set(self)
+        try:
+            yield self
+        finally:
+            _budget.reset(token)
+
+    # accounting
+
+    def elapsed(self) -> float:
+        return self.clock() - self.start
+
+    def remaining_s(self) -> float | None:
+        return None if self.deadline_s is None else max(0.0, self.deadline_s - self.elapsed())
+
+    def remaining_tokens(self) -> int | None:
+        return None if self.max_tokens is None else max(0, self.max_tokens - self.tokens)
+
+    def remaining_searches(self) -> int | None:
+        return None if self.max_search_calls is None else max(0, self.max_search_calls - self.search_calls)
+
+    def observe_call(self, seconds: float | None, tokens: int) -> None:
+        # charge an LLM call's tokens; its latency & size update the per-call estimates
+        with self._lock:
+            self.tokens += tokens
+            if seconds is not None:
+                self.call_s = seconds if self.call_s is None else self.call_s + self.alpha * (seconds - self.call_s)
+            if tokens:
+                self.call_tokens = tokens if self.call_tokens is None else self.call_tokens + self.alpha * (tokens - self.call_tokens)
+
+    def take_search(self) -> bool:
+        # charge one search; False (and nothing charged) once the search budget is spent
+        with self._lock:
+            if self.max_search_calls is not None and self.search_calls >= self.max_search_calls:
+                self.denied_searches += 1
+                return False
+            self.search_calls += 1
+            return True
+
+    def pressure(self) -> tuple[float, str | None]:
+        # (share used of the tightest limit, that limit's name); (0, None) when unlimited
+        used = []
+        if self.deadline_s is not None:
+            used.append((self.elapsed() / self.deadline_s, "deadline"))
+        if self.max_tokens is not None:
+            used.append((self.tokens / self.max_tokens, "tokens"))
+        if self.max_search_calls is not None:
+            used.append((self.search_calls / self.max_search_calls, "searches"))
+        return max(used, default=(0.0, None))
+
+    def calls_left(self, reserve: float = 0.0) -> tuple[float | None, str | None]:
+        # (average LLM calls still affordable after `reserve` calls, binding limit); (None, None) when unlimited
+        left = []
+        if self.deadline_s is not None:
+            left.append((self.remaining_s() / (self.call_s or self.DEFAULT_CALL_S) - reserve, "deadline"))
+        if self.max_tokens is not None:
+            left.append((self.remaining_tokens() / (self.call_tokens or self.DEFAULT_CALL_TOKENS) - reserve, "tokens"))
+        return min(left, default=(None, None))
+
+    # degradation policy; each returns (allowed, reason) and the caller records what it cut
+
+    def plan_size(self, requested: int, cove: bool) -> tuple[int, str | None]:
+        # subquestions to plan: no more than the searches left (some kept for CoVe) or than sources we could extract
+        allowed, reason = requested, None
+        searches = self.remaining_searches()
+        if searches is not None:
+            reserve = min(self.VERIFY_SEARCHES, searches - 1) if cove else 0
+            if searches - reserve < allowed:
+                allowed, reason = searches - reserve, "searches"
+        calls, limit = self.calls_left(1 + self.REPORT_CALLS + (self.COVE_CALLS if cove else 0))
+        if calls is not None and int(calls) < allowed:
+            allowed, reason = int(calls), limit
+        return max(1, allowed), reason
+
+    def source_count(self, requested: int, cove: bool) -> tuple[int, str | None]:
+        # sources to extract (one LLM call each), leaving room for the report and CoVe
+        calls, limit = self.calls_left(self.REPORT_CALLS + (self.COVE_CALLS if cove else 0))
+        if calls is None or int(calls) >= requested:
+            return requested, None
+        return max(1, int(calls)), limit
+
+    def extraction_degraded(self, sources_cut: bool) -> tuple[bool, str | None]:
+        # move extraction to the smaller model once sources are being cut or the budget is half spent
+        used, limit = self.pressure()
+        if sources_cut or used >= self.FAST_EXTRACTION_PRESSURE:
+            return True, limit
+        return False, None
+
+    def cove_affordable(self) -> tuple[bool, str | None]:
+        # whether CoVe (compile, verification searches, revise) still fits after the draft
+        if self.remaining_searches() == 0:
+            return False, "searches"
+        calls, limit = self.calls_left(self.COVE_CALLS)
+        if calls is not None and calls < 0:
+            return False, limit
+        return True, None
+
+    def gap_searches(self, requested: int, cove: bool) -> tuple[int, str | None]:
+        # follow-up searches for another deepening round (0 = stop); each brings ~SOURCES_PER_GAP extractions
+        allowed, reason = requested, None
+        searches = self.remaining_searches()
+        if searches is not None:
+            reserve = self.VERIFY_SEARCHES if cove else 0
+            if searches - reserve < allowed:
+                allowed, reason = max(0, searches - reserve), "searches"
+        calls, limit = self.calls_left(self.REPORT_CALLS + (self.COVE_CALLS if cove else 0))
+        if calls is not None and int(calls // self.GAP_CALLS) < allowed:
+            allowed, reason = max(0, int(calls // self.GAP_CALLS)), limit
+        return allowed, reason
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "elapsed_s": round(self.elapsed(), 3),
+            "deadline_s": self.deadline_s,
+            "tokens": self.tokens,
+            "max_tokens": self.max_tokens,
+            "search_calls": self.search_calls,
+            "max_search_calls": self.max_search_calls,
+            "denied_searches": self.denied_searches,
+        }
+
+
+def degradation(stage: str, action: str, reason: str | None, **detail) -> dict[str, Any]:
+    # state["degradations"] entry
+    return {"stage": stage, "action": action, "reason": reason, **detail}
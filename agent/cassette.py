@@ -0,0 +1,190 @@
+"""
+Record / replay cassettes for LLM and search I/O
+
+record mode wraps the real chat models and search provider of a run and
+captures every request, response (streamed chunks with their timing) and
+latency; replay mode serves them back without network or API keys, at the
+original latencies or at zero latency. Requests are matched by model, call
+options & messages (chat) or provider, query & max_results (search);
+repeats of the same request are served in recorded order.
+
+cassettes are packed like stored runs (msgpack, zstd when available)
+
+    research "..." --record run.cassette
+    research "..." --replay run.cassette --replay-latency zero
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from .serialize import pack, unpack
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+class Cassette:
+    """
+    recorded interactions of one or more runs
+
+    mode: "record" (wrap live clients, save() to write) or "replay"
+    latency: replay timing, "original" (sleep as recorded) or "zero"
+    """
+
+    def __init__(self, path: str | Path, mode: str = "replay", latency: str = "original"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if latency not in ("original", "zero"):
+            raise ValueError(f"Unknown replay latency: {latency}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.interactions: list[dict[str, Any]] = []
+        self._queues: dict[str, deque] = defaultdict(deque)
+        self._last: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            data = unpack(self.path.read_bytes())
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+            for interaction in data["interactions"]:
+                self._queues[interaction["key"]].append(interaction)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(kind: str, request: dict[str, Any]) -> str:
+        canonical = json.dumps([kind, request], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+    def add(self, kind: str, request: dict[str, Any], response: dict[str, Any], latency_s: float) -> None:
+        interaction = {
+            "kind": kind,
+            "key": self.key(kind, request),
+            "request": request,
+            "response": response,
+            "latency_s": latency_s,
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def take(self, kind: str, request: dict[str, Any]) -> dict[str, Any]:
+        # next recorded interaction for this request; the last one again once they run out
+        key = self.key(kind, request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            elif key not in self._last:
+                raise CassetteMiss(f"No recorded {kind} interaction for request {json.dumps(request, default=str)[:200]}")
+            return self._last[key]
+
+    def wait(self, seconds: float) -> None:
+        if self.latency == "original" and seconds > 0:
+            time.sleep(seconds)
+
+    def save(self) -> Path:
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": list(self.interactions)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(pack(data))
+        return self.path
+
+    def wrap_chat(self, model: str, inner: Any = None) -> "CassetteChatModel":
+        # recording wrapper around `inner`, or (replay) a stand-in serving `model`'s recorded responses
+        return CassetteChatModel(model=model, cassette=self, inner=None if self.replaying else inner)
+
+    def wrap_search(self, name: str, provider: Any = None) -> "CassetteSearch":
+        return CassetteSearch(self, name, None if self.replaying else provider)
+
+
+class CassetteChatModel(BaseChatModel):
+    # chat model that records the wrapped model's I/O, or replays it when there is none
+
+    model: str
+    cassette: Any
+    inner: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _request(self, messages, stop, kwargs) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "options": {**kwargs, "stop": stop},
+            "messages": [[m.type, m.content] for m in messages],
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        request = self._request(messages, stop, kwargs)
+        if self.inner is not None:
+            start = time.perf_counter()
+            message = self.inner.invoke(messages, stop=stop, **kwargs)
+            response = {"content": message.content, "usage": message.usage_metadata}
+            self.cassette.add("chat", request, response, time.perf_counter() - start)
+        else:
+            interaction = self.cassette.take("chat", request)
+            self.cassette.wait(interaction["latency_s"])
+            response = interaction["response"]
+            if "chunks" in response:
+                response = {"content": "".join(text for _, text in response["chunks"]), "usage": response["usage"]}
+        message = AIMessage(content=response["content"], usage_metadata=response["usage"])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        request = self._request(messages, stop, kwargs)
+        start = time.perf_counter()
+        if self.inner is not None:
+            chunks, usage = [], None
+            for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                usage = chunk.usage_metadata or usage
+                chunks.append([time.perf_counter() - start, text])
+                yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+            self.cassette.add("chat", request, {"chunks": chunks, "usage": usage}, time.perf_counter() - start)
+        else:
+            interaction = self.cassette.take("chat", request)
+            response = interaction["response"]
+            # a response recorded unstreamed replays as one chunk
+            chunks = response.get("chunks") or [[interaction["latency_s"], response["content"]]]
+            usage = response["usage"]
+            for offset, text in chunks:
+                self.cassette.wait(offset - (time.perf_counter() - start))
+                yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+        if usage:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+
+class CassetteSearch:
+    # SearchProvider that records the wrapped provider's results, or replays them when there is none
+
+    def __init__(self, cassette: Cassette, name: str, provider: Any = None):
+        self.cassette = cassette
+        self.name = name
+        self.provider = provider
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        request = {"provider": self.name, "query": query, "max_results": max_results}
+        if self.provider is not None:
+            start = time.perf_counter()
+            results = self.provider.search(query, max_results=max_results)
+            self.cassette.add("search", request, {"results": results}, time.perf_counter() - start)
+            return results
+        interaction = self.cassette.take("search", request)
+        self.cassette.wait(interaction["latency_s"])
+        return interaction["response"]["results"]
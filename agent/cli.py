@@ -10,6 +10,23 @@ from dotenv import load_dotenv
 def main():
     # Load environment variables from .env at repo root
     load_dotenv()
+
+    # subcommands; anything else is a research query
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from agent.service import main as serve_main
+        return serve_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "index":
+        from agent.corpus import main as index_main
+        return index_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "tune":
+        from agent.tune import main as tune_main
+        return tune_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        from agent.worker import main as worker_main
+        return worker_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "trace":
+        from agent.tracing import main as trace_main
+        return trace_main(sys.argv[2:])
     
     parser = argparse.ArgumentParser(
         description="Deep Research Agent - LangGraph-based research with CoVe verification"
@@ -34,11 +51,37 @@ def main():
         default="gpt-4o-mini",
         help="Model for verification (default: gpt-4o-mini)",
     )
+    parser.add_argument(
+        "--node-model",
+        action="append",
+        metavar="NODE=MODEL",
+        help="Model for one node (planner, extractor, digester, writer, cove_compiler, reviser); repeatable",
+    )
+    parser.add_argument(
+        "--model-config",
+        metavar="PATH",
+        help="JSON/TOML file with per-node [models] and an optional [router]",
+    )
+    parser.add_argument(
+        "--fast-model",
+        metavar="MODEL",
+        help="Route small extraction / CoVe compile prompts to this faster model",
+    )
     parser.add_argument(
         "--search-provider",
-        choices=["tavily", "stub"],
         default="tavily",
-        help="Search provider (default: tavily)",
+        help="Search provider: tavily, stub, local, or several joined with + to query them concurrently (default: tavily)",
+    )
+    parser.add_argument(
+        "--index-dir",
+        metavar="DIR",
+        help="Index for --search-provider local (default: $RESEARCH_INDEX_DIR or .research_index)",
+    )
+    parser.add_argument(
+        "--search-deadline",
+        type=float,
+        default=3.0,
+        help="Seconds a federated search waits for slower backends (default: 3.0)",
     )
     parser.add_argument(
         "--max-searches",
@@ -52,11 +95,61 @@ def main():
         default=8,
         help="Max sources to use (default: 8)",
     )
+    parser.add_argument(
+        "--deepen",
+        type=int,
+        default=0,
+        metavar="ROUNDS",
+        help="Up to ROUNDS rounds of targeted searches for outline sections the notes don't cover yet (default: 0)",
+    )
+    parser.add_argument(
+        "--hierarchical-notes",
+        action="store_true",
+        help="Condense notes into per-subquestion digests before drafting (for runs with many sources)",
+    )
+    parser.add_argument(
+        "--no-stream-plan",
+        action="store_true",
+        help="Wait for the full plan before searching instead of searching subquestions as they stream in",
+    )
+    parser.add_argument(
+        "--min-relevance",
+        type=float,
+        default=0.1,
+        help="Drop sources scoring below this (0-1) before extraction (default: 0.1)",
+    )
     parser.add_argument(
         "--cove",
         action="store_true",
         help="Enable CoVe verification layer (adds ~5 extra searches)",
     )
+    parser.add_argument(
+        "--speculative-cove",
+        action="store_true",
+        help="CoVe that verifies the draft's paragraphs while it is still being written (implies --cove)",
+    )
+    parser.add_argument(
+        "--revision-mode",
+        choices=["rewrite", "patch"],
+        default="rewrite",
+        help="After CoVe, rewrite the whole report or apply targeted edits to the draft (default: rewrite)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Finish within this many seconds, trimming subquestions, sources, extraction model and CoVe as needed",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        help="Token budget (prompt + completion) for the run; degrades like --deadline",
+    )
+    parser.add_argument(
+        "--max-search-calls",
+        type=int,
+        help="Search call budget for the run, CoVe verification searches included",
+    )
     parser.add_argument(
         "--output", "-o",
         type=str,
@@ -68,39 +161,157 @@ def main():
         default="default",
         help="Report style/format (default, executive, academic, or bullet)",
     )
+    parser.add_argument(
+        "--note-cache",
+        metavar="PATH",
+        help="SQLite note store; reuses extracted notes for sources seen in earlier runs",
+    )
+    parser.add_argument(
+        "--report-cache",
+        metavar="PATH",
+        help="SQLite report cache; near-duplicates of recent queries are answered from it",
+    )
+    parser.add_argument(
+        "--cache-threshold",
+        type=float,
+        default=0.85,
+        help="Query similarity (0-1) needed for a report cache hit (default: 0.85)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=24 * 3600,
+        help="Seconds a cached report stays fresh (default: 86400)",
+    )
+    parser.add_argument(
+        "--fetch-pages",
+        action="store_true",
+        help="Fetch full pages for selected sources instead of extracting from search snippets",
+    )
+    parser.add_argument(
+        "--page-cache",
+        metavar="DIR",
+        help="Directory for the compressed page cache (used with --fetch-pages)",
+    )
+    parser.add_argument(
+        "--raw-content",
+        action="store_true",
+        help="Request full page text from the search backend and extract from its most relevant passages",
+    )
+    parser.add_argument(
+        "--passage-budget",
+        type=int,
+        default=1000,
+        help="Token budget of ranked passages sent to extraction per source (default: 1000)",
+    )
+    parser.add_argument(
+        "--follow-up",
+        metavar="RUN_ID",
+        help="Follow up on a stored run, reusing its searches, sources and notes",
+    )
+    parser.add_argument(
+        "--trace-out",
+        metavar="PATH",
+        help="Append spans (nodes, LLM calls, searches, fetches, cache lookups) to a JSON-lines file",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Record every chat model and search request/response of the run to a cassette file",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Serve chat model and search calls from a recorded cassette (no network or API keys)",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        choices=["original", "zero"],
+        default="original",
+        help="Replay with the recorded latencies or none (default: original)",
+    )
+    parser.add_argument(
+        "--run-dir",
+        help="Directory where runs are stored (default: $RESEARCH_RUN_DIR or .research_runs)",
+    )
     
     args = parser.parse_args()
     
     # Import here to avoid loading heavy deps before env is set
     from agent import run_research
-    
-    if args.interactive:
-        print("Deep Research Agent (interactive mode)")
-        print("Enter your research query (Ctrl+D to exit):\n")
-        try:
-            query = input("> ").strip()
-        except EOFError:
-            print("\nExiting.")
-            sys.exit(0)
-    elif args.query:
-        query = args.query
-    else:
-        parser.print_help()
-        sys.exit(1)
-    
-    print(f"\nResearching: {query}\n")
-    print("=" * 60)
-    
+    from agent.models import parse_node_models
+    from agent.runs import RunStore
+
     try:
+        node_models = parse_node_models(args.node_model)
+    except ValueError as e:
+        parser.error(str(e))
+    router = {"fast_model": args.fast_model} if args.fast_model else None
+
+    run_store = RunStore(args.run_dir)
+
+    report_cache = None
+    if args.report_cache:
+        from agent.report_cache import ReportCache
+        report_cache = ReportCache(args.report_cache, threshold=args.cache_threshold, ttl_s=args.cache_ttl)
+
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    cassette = None
+    if args.record or args.replay:
+        from agent.cassette import Cassette
+        if args.record:
+            cassette = Cassette(args.record, mode="record")
+        else:
+            cassette = Cassette(args.replay, latency=args.replay_latency)
+
+    trace_exporter = None
+    if args.trace_out:
+        from agent.tracing import JsonlExporter
+        trace_exporter = JsonlExporter(args.trace_out)
+
+    def research(query: str, previous):
+        print(f"\nResearching: {query}\n")
+        print("=" * 60)
+
+        tracer = None
+        if trace_exporter is not None:
+            from agent.tracing import Tracer
+            tracer = Tracer(trace_exporter)
+
         result = run_research(
             query=query,
+            previous=previous,
+            run_store=run_store,
+            report_cache=report_cache,
+            tracer=tracer,
+            cassette=cassette,
             draft_model=args.model,
             verify_model=args.verify_model,
+            node_models=node_models,
+            router=router,
+            model_config=args.model_config,
             search_provider=args.search_provider,
+            search_deadline_s=args.search_deadline,
+            local_index=args.index_dir,
             max_searches=args.max_searches,
             max_sources=args.max_sources,
-            enable_cove=args.cove,
+            deepen_rounds=args.deepen,
+            hierarchical_notes=args.hierarchical_notes,
+            min_source_relevance=args.min_relevance,
+            stream_plan=not args.no_stream_plan,
+            enable_cove=args.cove or args.speculative_cove,
+            speculative_cove=args.speculative_cove,
+            revision_mode=args.revision_mode,
             report_style=args.report_style,
+            note_cache=args.note_cache,
+            fetch_pages=args.fetch_pages,
+            page_cache=args.page_cache,
+            use_raw_content=args.raw_content,
+            passage_token_budget=args.passage_budget,
+            deadline_s=args.deadline,
+            max_tokens=args.max_tokens,
+            max_search_calls=args.max_search_calls,
         )
         
         report = result.get("report") or result.get("report_draft") or "No report generated"
@@ -118,9 +329,57 @@ def main():
         if result.get("verification_results"):
             confirmed = sum(1 for c in result["verification_results"] if c["status"] == "confirmed")
             print(f"Claims verified: {confirmed}/{len(result['verification_results'])}")
-        
-    except Exception as e:
-        print(f"\nError: {e}", file=sys.stderr)
+        metrics = result.get("metrics") or {}
+        if metrics.get("served_from_cache"):
+            hit = metrics["served_from_cache"]
+            print(f"Served from cache: \"{hit['query']}\" (similarity {hit['similarity']:.2f}, {hit['age_s']:.0f}s old)")
+        if args.note_cache:
+            print(f"Note cache: {metrics.get('note_cache_hits', 0)} hits, {metrics.get('note_cache_misses', 0)} misses")
+        if metrics.get("input_tokens"):
+            total = sum(metrics["input_tokens"].values())
+            cached = sum((metrics.get("cached_tokens") or {}).values())
+            print(f"Prompt tokens: {total} ({cached} served from the provider's prompt cache)")
+        if metrics.get("model_calls"):
+            print("Model calls: " + ", ".join(f"{m} x{n}" for m, n in metrics["model_calls"].items()))
+        if metrics.get("budget"):
+            b = metrics["budget"]
+            print(f"Budget: {b['elapsed_s']}s, {b['tokens']} tokens, {b['search_calls']} searches")
+        for d in result.get("degradations") or []:
+            detail = ", ".join(f"{k}={v}" for k, v in d.items() if k not in ("stage", "action", "reason"))
+            print(f"Degraded: {d['action']} ({d['reason'] or 'budget'}{'; ' + detail if detail else ''})")
+        if args.record:
+            print(f"Cassette: {cassette.save()} ({len(cassette.interactions)} interactions)")
+        print(f"Run ID: {result['run_id']}")
+        if tracer is not None:
+            print(f"Trace: {args.trace_out} (research trace {args.trace_out})")
+        return result
+
+    if args.interactive:
+        # each query after the first follows up on the previous result
+        print("Deep Research Agent (interactive mode)")
+        print("Enter your research query; later queries follow up on the last report (Ctrl+D to exit):\n")
+        previous = args.follow_up
+        while True:
+            try:
+                query = input("> ").strip()
+            except EOFError:
+                print("\nExiting.")
+                sys.exit(0)
+            if not query:
+                continue
+            try:
+                previous = research(query, previous)
+            except Exception as e:
+                print(f"\nError: {e}", file=sys.stderr)
+            print()
+    elif args.query:
+        try:
+            research(args.query, args.follow_up)
+        except Exception as e:
+            print(f"\nError: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        parser.print_help()
         sys.exit(1)
 
 
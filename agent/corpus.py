@@ -0,0 +1,281 @@
+"""
+Local document corpus: on-disk inverted index & search provider
+
+`research index DIR` splits the text / Markdown / HTML files under DIR into
+passages and writes an inverted index: terms are 64-bit hashes in a sorted
+array pointing into flat posting arrays (passage ID, term frequency), with
+passage lengths / text offsets alongside. Every array is a .npy file that is
+memory-mapped at query time, so opening an index reads only a small header
+and a query touches just its terms' postings & the passages it returns -
+memory stays flat as the corpus grows.
+
+    research index ./docs --out .research_index
+    research "..." --search-provider local        # or tavily+local
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from .fetch import TextExtractor, chunk_text, normalize_plain
+from .rank import tokenize
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_DIR = ".research_index"
+TEXT_SUFFIXES = {".txt", ".text", ".md", ".markdown", ".rst"}
+HTML_SUFFIXES = {".html", ".htm"}
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), "little")
+
+
+def read_document(path: Path) -> tuple[str, str]:
+    # (title, plain text) of a text / Markdown / HTML file
+    raw = path.read_text(encoding="utf-8", errors="replace")
+    if path.suffix.lower() in HTML_SUFFIXES:
+        match = TITLE_RE.search(raw)
+        extractor = TextExtractor(max_chars=len(raw) + 1)
+        extractor.feed(raw)
+        extractor.close()
+        text = extractor.text()
+        title = " ".join(match.group(1).split()) if match else ""
+    else:
+        text = normalize_plain(raw)
+        heading = re.search(r"^#\s+(.+)$", raw, re.MULTILINE)
+        title = heading.group(1).strip() if heading else ""
+    return title or path.stem.replace("_", " ").replace("-", " "), text
+
+
+def build_index(source_dir: str | Path, index_dir: str | Path = DEFAULT_INDEX_DIR, chunk_chars: int = 1200) -> dict:
+    """
+    index every supported file under source_dir into index_dir; returns build stats
+
+    postings are collected as flat (term hash, passage, tf) arrays and sorted
+    once at the end (~14 bytes per posting while building)
+    """
+    start = time.perf_counter()
+    source_dir, index_dir = Path(source_dir), Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    hashes: dict[str, int] = {}
+    post_terms, post_ids, post_tfs = array("Q"), array("I"), array("H")
+    lengths, passage_docs, text_offsets, doc_offsets = array("I"), array("I"), array("Q", [0]), array("Q", [0])
+    n_docs = 0
+
+    with open(index_dir / "texts.bin", "wb") as texts, open(index_dir / "docs.jsonl", "wb") as docs:
+        for path in sorted(p for p in source_dir.rglob("*") if p.is_file()):
+            if path.suffix.lower() not in TEXT_SUFFIXES | HTML_SUFFIXES:
+                continue
+            title, text = read_document(path)
+            passages = chunk_text(text, chunk_chars)
+            if not passages:
+                continue
+            line = (json.dumps({"url": path.resolve().as_uri(), "title": title}) + "\n").encode()
+            docs.write(line)
+            doc_offsets.append(doc_offsets[-1] + len(line))
+
+            for passage in passages:
+                passage_id = len(lengths)
+                tokens = tokenize(passage)
+                for term, tf in Counter(tokens).items():
+                    if term not in hashes:
+                        hashes[term] = term_hash(term)
+                    post_terms.append(hashes[term])
+                    post_ids.append(passage_id)
+                    post_tfs.append(min(tf, 65535))
+                lengths.append(len(tokens))
+                passage_docs.append(n_docs)
+                data = passage.encode()
+                texts.write(data)
+                text_offsets.append(text_offsets[-1] + len(data))
+            n_docs += 1
+
+    terms = np.frombuffer(post_terms, dtype=np.uint64)
+    order = np.argsort(terms, kind="stable")  # stable: postings stay in passage order
+    terms = terms[order]
+    unique, starts = np.unique(terms, return_index=True)
+    offsets = np.append(starts, len(terms)).astype(np.uint64)
+
+    arrays = {
+        "terms": unique,
+        "term_offsets": offsets,
+        "post_ids": np.frombuffer(post_ids, dtype=np.uint32)[order],
+        "post_tfs": np.frombuffer(post_tfs, dtype=np.uint16)[order],
+        "passage_len": np.frombuffer(lengths, dtype=np.uint32),
+        "passage_doc": np.frombuffer(passage_docs, dtype=np.uint32),
+        "text_offsets": np.frombuffer(text_offsets, dtype=np.uint64),
+        "doc_offsets": np.frombuffer(doc_offsets, dtype=np.uint64),
+    }
+    for name, values in arrays.items():
+        np.save(index_dir / f"{name}.npy", values)
+
+    meta = {
+        "version": INDEX_VERSION,
+        "documents": n_docs,
+        "passages": len(lengths),
+        "terms": len(unique),
+        "postings": len(terms),
+        "avg_passage_len": float(np.mean(arrays["passage_len"])) if len(lengths) else 0.0,
+        "chunk_chars": chunk_chars,
+        "source": str(source_dir.resolve()),
+    }
+    (index_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    size = sum(f.stat().st_size for f in index_dir.iterdir() if f.is_file())
+    return {**meta, "bytes": size, "seconds": round(time.perf_counter() - start, 3)}
+
+
+class LocalIndex:
+    """
+    memory-mapped inverted index written by build_index
+
+    search() ranks passages with BM25 over the query's terms only, keeps the
+    best passage per document and returns a snippet around the matches
+    """
+
+    def __init__(self, index_dir: str | Path = DEFAULT_INDEX_DIR, k1: float = 1.2, b: float = 0.75):
+        self.root = Path(index_dir)
+        meta_path = self.root / "meta.json"
+        if not meta_path.exists():
+            raise ValueError(f"No local index at {self.root} (build one with: research index DIR --out {self.root})")
+        self.meta = json.loads(meta_path.read_text())
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported local index version: {self.meta.get('version')}")
+        self.k1, self.b = k1, b
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.root / f"{name}.npy", mmap_mode="r")
+
+        self.terms = load("terms")
+        self.term_offsets = load("term_offsets")
+        self.post_ids = load("post_ids")
+        self.post_tfs = load("post_tfs")
+        self.passage_len = load("passage_len")
+        self.passage_doc = load("passage_doc")
+        self.text_offsets = load("text_offsets")
+        self.doc_offsets = load("doc_offsets")
+        self.texts = np.memmap(self.root / "texts.bin", dtype=np.uint8, mode="r") if self.meta["passages"] else None
+        self.docs = np.memmap(self.root / "docs.jsonl", dtype=np.uint8, mode="r") if self.meta["documents"] else None
+
+    def __len__(self) -> int:
+        return self.meta["passages"]
+
+    def passage_text(self, passage_id: int) -> str:
+        start, end = int(self.text_offsets[passage_id]), int(self.text_offsets[passage_id + 1])
+        return bytes(self.texts[start:end]).decode()
+
+    def document(self, doc_id: int) -> dict:
+        start, end = int(self.doc_offsets[doc_id]), int(self.doc_offsets[doc_id + 1])
+        return json.loads(bytes(self.docs[start:end]))
+
+    def score(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        # (passage IDs, BM25 scores) of passages containing any query term
+        n = len(self)
+        ids, contributions = [], []
+        avg_len = max(self.meta["avg_passage_len"], 1.0)
+        for term in set(tokenize(query)):
+            h = np.uint64(term_hash(term))
+            pos = int(np.searchsorted(self.terms, h))
+            if pos >= len(self.terms) or self.terms[pos] != h:
+                continue
+            start, end = int(self.term_offsets[pos]), int(self.term_offsets[pos + 1])
+            passage_ids = np.asarray(self.post_ids[start:end])
+            tf = np.asarray(self.post_tfs[start:end], dtype=np.float32)
+            df = end - start
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * np.asarray(self.passage_len[passage_ids], dtype=np.float32) / avg_len)
+            ids.append(passage_ids)
+            contributions.append(tf * (self.k1 + 1) / (tf + norm) * idf)
+        if not ids:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32)
+        # sum per passage over the touched postings only (no corpus-sized score array)
+        unique, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        return unique, np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+
+    def search(self, query: str, max_results: int = 5, snippet_chars: int = 320) -> list[dict]:
+        passage_ids, scores = self.score(query)
+        if not len(scores):
+            return []
+        # best passage per document among the top candidates
+        k = min(len(scores), max_results * 8)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        best = float(scores[top[0]])
+        query_terms = set(tokenize(query))
+        results, seen_docs = [], set()
+        for i in top:
+            passage_id = int(passage_ids[i])
+            doc_id = int(self.passage_doc[passage_id])
+            if doc_id in seen_docs:
+                continue
+            seen_docs.add(doc_id)
+            doc = self.document(doc_id)
+            text = self.passage_text(passage_id)
+            results.append({
+                "url": doc["url"],
+                "title": doc["title"],
+                "content": snippet(text, query_terms, snippet_chars),
+                "raw_content": text,
+                "score": round(float(scores[i]) / best, 4),
+            })
+            if len(results) >= max_results:
+                break
+        return results
+
+
+def snippet(text: str, query_terms: set[str], max_chars: int = 320) -> str:
+    # window of text with the most query-term matches, cut at word boundaries
+    if len(text) <= max_chars:
+        return text
+    hits = [m.start() for m in WORD_RE.finditer(text) if m.group().lower() in query_terms]
+    start = 0
+    if hits:
+        best, j = 0, 0
+        for i, pos in enumerate(hits):
+            while pos - hits[j] > max_chars * 0.8:
+                j += 1
+            if i - j + 1 > best:
+                best, start = i - j + 1, hits[j]
+        start = max(0, start - max_chars // 8)
+        start = text.rfind(" ", 0, start) + 1 if start else 0
+    end = min(len(text), start + max_chars)
+    if end < len(text) and " " in text[start:end]:
+        end = text.rfind(" ", start, end)
+    return ("…" if start else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+
+
+class LocalSearch:
+    # SearchProvider over a local index
+
+    def __init__(self, index_dir: str | Path | None = None):
+        self.index = LocalIndex(index_dir or os.getenv("RESEARCH_INDEX_DIR", DEFAULT_INDEX_DIR))
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        return self.index.search(query, max_results=max_results)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="research index", description="Index a directory of documents for --search-provider local")
+    parser.add_argument("source", help="Directory of .txt / .md / .html files")
+    parser.add_argument("--out", default=os.getenv("RESEARCH_INDEX_DIR", DEFAULT_INDEX_DIR),
+                        help="Index directory (default: $RESEARCH_INDEX_DIR or .research_index)")
+    parser.add_argument("--chunk-chars", type=int, default=1200, help="Max characters per passage (default: 1200)")
+    args = parser.parse_args(argv)
+
+    stats = build_index(args.source, args.out, chunk_chars=args.chunk_chars)
+    print(f"Indexed {stats['documents']} documents -> {stats['passages']} passages, {stats['terms']} terms "
+          f"({stats['bytes'] / 1e6:.1f} MB) in {stats['seconds']}s at {args.out}")
+
+
+if __name__ == "__main__":
+    main()
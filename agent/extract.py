@@ -1,56 +1,159 @@
 # source selection / note extraction
 
-from .state import Source, Note, SearchResult
-from .search import extract_domain
+import heapq
+import re
+
+import numpy as np
+
+from .state import Source, Note, NoteDigest, SearchResult
+from .search import canonical_url, extract_domain
+from .rank import bm25_scores, tokenize
+
+# selection score weights; a source's score is multiplied by DOMAIN_PENALTY per already-selected source from its domain
+PROVIDER_WEIGHT = 0.5
+RELEVANCE_WEIGHT = 0.5
+DOMAIN_PENALTY = 0.7
+DEFAULT_PROVIDER_SCORE = 0.5
+# raw BM25 relevance that counts as 0.5 for the min_relevance floor (rel / (rel + RELEVANCE_HALF))
+RELEVANCE_HALF = 1.0
+# inline citations: [1], [1, 3]
+CITATION_RE = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]")
+# outline words naming a kind of section rather than a topic (not searched for)
+GENERIC_SECTION_WORDS = frozenset(
+    "background overview introduction summary conclusion conclusions analysis key findings discussion "
+    "context details recommendations outlook future tl dr sources references".split()
+)
+
 
 def select_sources(
     search_results: list[SearchResult],
     max_sources: int = 8,
     min_unique_domains: int = 4,
+    query: str | None = None,
+    min_relevance: float = 0.0,
 ) -> list[Source]:
     """
-    selects / deduplicates sources from search results
-    ensures domain diversity / cap total sources
+    selects / deduplicates sources from search results by score
+
+    score = provider score (Tavily `score`) + local BM25 relevance to the query and
+    the source's subquestion, with a penalty per source already taken from the same
+    domain. Sources are dropped before extraction when their absolute score - the
+    same mix, with raw BM25 squashed onto [0, 1) rather than scaled to the pool's
+    best - is below min_relevance, so a pool of irrelevant results isn't kept just
+    because one of them is the least irrelevant. Ranking uses the pool-normalized
+    score; each subquestion gets its best source first so none is starved, then
+    the rest are filled top-k from a heap.
     """
 
-    seen_urls: set[str] = set()
-    seen_domains: dict[str, int] = {}
-    sources: list[Source] = []
-
-    # flatten results
-    all_results: list[tuple[str, dict]] = []
+    # flatten & dedupe by canonical url, keeping the best provider score
+    candidates: dict[str, dict] = {}
     for sr in search_results:
-        sr.get("results") or []
-        for result in sr["results"]:
-            all_results.append((sr["query"], result))
-    
-    # First pass: ensure domain diversity
-    for query, result in all_results:
-        url = result.get("url", "")
-        if not url or url in seen_urls:
-            continue
-
-        domain = extract_domain(url)
-        domain_count = seen_domains.get(domain, 0)
+        for result in sr.get("results") or []:
+            url = result.get("url", "")
+            if not url:
+                continue
+            key = canonical_url(url)
+            provider_score = float(result.get("score", DEFAULT_PROVIDER_SCORE))
+            if key in candidates:
+                candidates[key]["provider_score"] = max(candidates[key]["provider_score"], provider_score)
+                continue
+            candidates[key] = {
+                "url": url,
+                "title": result.get("title", "Unititled"),
+                "domain": extract_domain(url),
+                "snippet": result.get("content", "")[:500],
+                "subquestion": sr["query"],
+                "provider_score": provider_score,
+            }
+    if not candidates:
+        return []
+
+    # local relevance: main query + the candidate's own subquestion
+    pool = list(candidates.values())
+    subquestions = list(dict.fromkeys(c["subquestion"] for c in pool))
+    texts = [f"{c['title']} {c['snippet']}" for c in pool]
+    raw = bm25_scores(texts, [query or "", *subquestions])
+    column = {q: i + 1 for i, q in enumerate(subquestions)}
+    relevance = np.array([raw[i, 0] + raw[i, column[c["subquestion"]]] for i, c in enumerate(pool)])
+
+    # the floor is on the absolute score; the pool-normalized one only ranks
+    normalized = relevance / relevance.max() if relevance.max() > 0 else relevance
+    absolute = relevance / (relevance + RELEVANCE_HALF)
+    kept = []
+    for c, rel, abs_rel in zip(pool, normalized, absolute):
+        provider = PROVIDER_WEIGHT * min(c["provider_score"], 1.0)
+        c["score"] = provider + RELEVANCE_WEIGHT * float(rel)
+        if provider + RELEVANCE_WEIGHT * float(abs_rel) >= min_relevance:
+            kept.append(c)
+    pool = kept
+
+    selected: list[dict] = []
+    chosen: set[str] = set()
+    seen_domains: dict[str, int] = {}
 
+    def allowed(c: dict) -> bool:
         # skip if we have too many from this domain and haven't hit min unique
+        return not (seen_domains.get(c["domain"], 0) >= 2 and len(seen_domains) < min_unique_domains)
 
-        if (domain_count >= 2 and len(seen_domains) < min_unique_domains):
-            continue
-        seen_urls.add(url)
-        seen_domains[domain] = domain_count + 1
+    def effective(c: dict) -> float:
+        return c["score"] * DOMAIN_PENALTY ** seen_domains.get(c["domain"], 0)
 
-        sources.append(Source(
-            url=url,
-            title=result.get("title", "Unititled"),
-            domain=domain,
-            snippet=result.get("content", "")[:500],
-        ))
+    def take(c: dict) -> None:
+        selected.append(c)
+        chosen.add(c["url"])
+        seen_domains[c["domain"]] = seen_domains.get(c["domain"], 0) + 1
 
-        if len(sources) == max_sources:
+    # coverage pass: best remaining source for each subquestion, in plan order
+    for subquestion in subquestions:
+        if len(selected) == max_sources:
             break
+        options = [c for c in pool if c["subquestion"] == subquestion and c["url"] not in chosen and allowed(c)]
+        if options:
+            take(max(options, key=effective))
+
+    # fill pass: top-k by effective score; stale heap entries are re-scored lazily
+    heap = [(-effective(c), i, c) for i, c in enumerate(pool) if c["url"] not in chosen]
+    heapq.heapify(heap)
+    while heap and len(selected) < max_sources:
+        neg_score, i, c = heapq.heappop(heap)
+        if not allowed(c):
+            continue
+        current = effective(c)
+        if current < -neg_score:
+            heapq.heappush(heap, (-current, i, c))
+            continue
+        take(c)
+
+    return [
+        Source(
+            url=c["url"],
+            title=c["title"],
+            domain=c["domain"],
+            snippet=c["snippet"],
+            subquestion=c["subquestion"],
+            score=round(c["score"], 4),
+        )
+        for c in selected
+    ]
 
-    return sources
+def section_coverage(outline: list[str], notes: list[Note]) -> dict[str, float]:
+    """
+    how well the notes cover each outline section: the largest share of the
+    section's topic words that a single note (bullets + quote) mentions.
+    Sections with no topic words (e.g. "Background") count as covered.
+    """
+    note_terms = [
+        set(tokenize(" ".join([*note["bullets"], note.get("quote") or ""])))
+        for note in notes
+    ]
+    coverage = {}
+    for section in outline:
+        terms = {t for t in tokenize(section) if t not in GENERIC_SECTION_WORDS}
+        if not terms:
+            coverage[section] = 1.0
+            continue
+        coverage[section] = max((len(terms & seen) / len(terms) for seen in note_terms), default=0.0)
+    return coverage
 
 def format_notes_for_report(notes: list[Note], sources: list[Source]) -> str:
     # format notes for the report writer prompts
@@ -72,6 +175,29 @@ def format_notes_for_report(notes: list[Note], sources: list[Source]) -> str:
 
     return "\n\n".join(formatted_parts)
 
+def cluster_notes(notes: list[Note], sources: list[Source], max_size: int = 12) -> list[tuple[str, list[Note]]]:
+    # (subquestion, notes) groups by the subquestion that surfaced each note's source, in first-seen order;
+    # groups over max_size are split into even parts
+    topic = {s["url"]: s["subquestion"] for s in sources}
+    groups: dict[str, list[Note]] = {}
+    for note in notes:
+        groups.setdefault(topic.get(note["source_url"], "Other"), []).append(note)
+    clusters = []
+    for name, group in groups.items():
+        size = -(-len(group) // -(-len(group) // max_size))
+        clusters += [(name, group[i:i + size]) for i in range(0, len(group), size)]
+    return clusters
+
+
+def cited_numbers(text: str) -> set[int]:
+    # source numbers cited inline in text
+    return {int(n) for group in CITATION_RE.findall(text) for n in group.split(",")}
+
+
+def format_digests(digests: list[NoteDigest]) -> str:
+    # note digests for the report writer prompts, one block per subquestion
+    return "\n\n".join(f"### {d['topic']}\n{d['text']}" for d in digests)
+
 def formatted_sources_list(sources: list[Source]) -> str:
     # format sources as numbered list
     lines = []
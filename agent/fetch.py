@@ -0,0 +1,308 @@
+"""
+Raw page fetching
+
+pulls full pages for selected sources so extraction can see more than the
+search snippet: pooled async client, per-domain concurrency limits, streaming
+decode under a size cap, boilerplate stripping & a gzip on-disk page cache
+"""
+
+import asyncio
+import codecs
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+import httpx
+
+from .search import canonical_url, extract_domain
+from .tracing import span
+
+# tags whose text is never article content
+SKIP_TAGS = {
+    "script", "style", "noscript", "nav", "header", "footer", "aside",
+    "form", "svg", "iframe", "template", "button", "select",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "br", "li", "ul", "ol", "tr",
+    "table", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+}
+MIN_PARAGRAPH_WORDS = 5
+
+
+class TextExtractor(HTMLParser):
+    # incremental HTML -> text; fed piece by piece so the raw page is never held whole
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts: list[str] = []
+        self.size = 0
+        self.skip_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self.skip_depth or self.full:
+            return
+        self.parts.append(data)
+        self.size += len(data)
+
+    def text(self) -> str:
+        return strip_boilerplate("".join(self.parts))
+
+
+def strip_boilerplate(text: str) -> str:
+    # collapse whitespace & drop short lines (menus, link lists, cookie bars)
+    paragraphs = []
+    for line in text.split("\n"):
+        line = " ".join(line.split())
+        if len(line.split()) >= MIN_PARAGRAPH_WORDS:
+            paragraphs.append(line)
+    return "\n\n".join(paragraphs)
+
+
+def normalize_plain(text: str) -> str:
+    # plain text: blank-line separated paragraphs with wrapped lines joined
+    paragraphs = (" ".join(p.split()) for p in re.split(r"\n\s*\n", text))
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+def chunk_text(text: str, max_chars: int = 1200) -> list[str]:
+    """
+    split text into chunks of at most max_chars along paragraph, then sentence boundaries
+    """
+    pieces: list[str] = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        sentence = ""
+        for part in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(part) > max_chars:
+                pieces.append(part[:max_chars])
+                part = part[max_chars:]
+            if sentence and len(sentence) + len(part) + 1 > max_chars:
+                pieces.append(sentence)
+                sentence = ""
+            sentence = f"{sentence} {part}".strip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class PageCache:
+    # extracted page text, gzip-compressed on disk, keyed by canonical URL
+
+    def __init__(self, root: str | Path, ttl_s: float = 24 * 3600):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+
+    def path_for(self, url: str) -> Path:
+        digest = hashlib.sha256(canonical_url(url).encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest}.txt.gz"
+
+    def get(self, url: str) -> str | None:
+        path = self.path_for(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_s:
+                return None
+            return gzip.decompress(path.read_bytes()).decode("utf-8")
+        except (OSError, EOFError):
+            return None
+
+    def put(self, url: str, text: str) -> None:
+        # written to a temp file of its own, then renamed, so concurrent writers never share one
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            try:
+                tmp.write(gzip.compress(text.encode("utf-8")))
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+
+
+class PageFetcher:
+    """
+    fetches pages concurrently & returns their text split into chunks
+
+    max_bytes caps decoded bytes read per page (the rest of the body is never
+    downloaded); max_chars caps extracted text kept per page
+
+    one pooled client per fetcher, on an event loop the fetcher runs in a
+    daemon thread (both started on first use), so connections are reused
+    across calls; close() shuts them down
+    """
+
+    def __init__(
+            self,
+            cache_dir: str | Path | None = None,
+            max_bytes: int = 2_000_000,
+            max_chars: int = 200_000,
+            chunk_chars: int = 1200,
+            per_domain: int = 2,
+            max_connections: int = 16,
+            timeout_s: float = 10.0,
+    ):
+        self.cache = PageCache(cache_dir) if cache_dir else None
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.chunk_chars = chunk_chars
+        self.per_domain = per_domain
+        self.max_connections = max_connections
+        self.timeout_s = timeout_s
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        # the fetcher's event loop, started in its thread on first use
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="page-fetcher", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _pooled_client(self) -> httpx.AsyncClient:
+        # created on the fetcher's loop, which it stays bound to
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(
+                limits=limits,
+                timeout=self.timeout_s,
+                follow_redirects=True,
+                headers={"User-Agent": "deep-research-agent/0.1"},
+            )
+        return self._client
+
+    def fetch_all(self, urls: list[str]) -> dict[str, list[str]]:
+        # sync entry point for graph nodes; runs on the fetcher's loop with its pooled client
+        return asyncio.run_coroutine_threadsafe(self.fetch_many(urls), self._running_loop()).result()
+
+    def close(self) -> None:
+        # close the pooled client & stop the loop; a later fetch starts them again
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def fetch_many(self, urls: list[str]) -> dict[str, list[str]]:
+        # url -> chunks; failed / empty pages are left out (runs on the fetcher's loop, see fetch_all)
+        client = self._pooled_client()
+        semaphores: dict[str, asyncio.Semaphore] = {}
+
+        async def one(url: str) -> tuple[str, str | None]:
+            domain = extract_domain(url)
+            semaphore = semaphores.setdefault(domain, asyncio.Semaphore(self.per_domain))
+            async with semaphore:
+                return url, await self.fetch_text(client, url)
+
+        pages = await asyncio.gather(*(one(url) for url in dict.fromkeys(urls)))
+
+        return {
+            url: chunk_text(text, self.chunk_chars)
+            for url, text in pages
+            if text
+        }
+
+    async def fetch_text(self, client: httpx.AsyncClient, url: str) -> str | None:
+        # cached text, else stream the page & extract its text under the size caps
+        with span("fetch", "fetch", url=url) as current:
+            if self.cache is not None:
+                cached = self.cache.get(url)
+                current.set(cache_hit=cached is not None)
+                if cached is not None:
+                    current.set(chars=len(cached))
+                    return cached
+
+            text, received = await self._download(client, url)
+            current.set(bytes=received, chars=len(text or ""))
+
+        if self.cache is not None and text:
+            self.cache.put(url, text)
+        return text
+
+    async def _download(self, client: httpx.AsyncClient, url: str) -> tuple[str | None, int]:
+        # (extracted text or None, bytes received)
+        received = 0
+        try:
+            async with client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    return None, received
+                content_type = response.headers.get("content-type", "text/html").lower()
+                if not content_type.startswith(("text/", "application/xhtml")):
+                    return None, received
+
+                decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+                is_html = "html" in content_type
+                extractor = TextExtractor(self.max_chars) if is_html else None
+                plain: list[str] = []
+
+                def emit(text: str) -> None:
+                    if extractor is not None:
+                        extractor.feed(text)
+                    else:
+                        plain.append(text)
+
+                async for block in response.aiter_bytes():
+                    block = block[:self.max_bytes - received]
+                    received += len(block)
+                    emit(decoder.decode(block))
+                    if received >= self.max_bytes or (extractor is not None and extractor.full):
+                        break
+                # bytes held back for a character split across blocks (or cut off by max_bytes)
+                emit(decoder.decode(b"", final=True))
+        except (httpx.HTTPError, LookupError):
+            return None, received
+
+        if extractor is not None:
+            extractor.close()
+            return extractor.text(), received
+        return normalize_plain("".join(plain)[:self.max_chars]), received
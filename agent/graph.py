@@ -1,22 +1,87 @@
 # LangGraph Definition for Agent
 
+import contextvars
+import copy
 import json
-from typing import Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, START, END
 
-from .state import ResearchState, Note, VerificationClaim
+from .models import ModelRouter, chat_model, load_model_config, node_model_map
+from .state import ResearchState, SearchResult, Source, Note, NoteDigest, VerificationClaim, merge_metrics
 from .prompts import (
-    PLANNER_SYSTEM, PLANNER_USER,
-    EXTRACTOR_SYSTEM, EXTRACTOR_USER,
-    WRITER_SYSTEM, REPORT_STYLE_HEADERS, WRITER_USER,
-    COVE_COMPILER_SYSTEM, COVE_COMPILER_USER,
-    COVE_REVISER_SYSTEM, COVE_REVISER_USER,
+    PLANNER_SYSTEM, PLANNER_USER, PLANNER_FOLLOWUP_USER,
+    EXTRACTOR_SYSTEM, EXTRACTOR_USER, DIGEST_SYSTEM, DIGEST_USER,
+    REPORT_SYSTEM, REPORT_CONTEXT, REPORT_STYLE_HEADERS, WRITER_USER,
+    COVE_COMPILER_SYSTEM, COVE_COMPILER_USER, COVE_COMPILER_EXCERPT_USER,
+    COVE_REVISER_USER, COVE_PATCH_USER,
 )
 from .search import get_search_provider, run_search
-from .extract import select_sources, format_notes_for_report, formatted_sources_list
+from .extract import (
+    select_sources, format_notes_for_report, formatted_sources_list, section_coverage, cluster_notes, format_digests, cited_numbers,
+)
+from .runs import RunStore, new_run_id
+from .note_store import NoteStore
+from .rank import estimate_tokens, select_passages
+from .jsonstream import ParagraphSplitter, StreamingArrayParser
+from .patch import apply_edits, verification_checklist
+from .singleflight import FLIGHTS, CoalescingSearch
+from .tracing import Tracer, span
+from .cassette import Cassette
+from .budget import Budget, current_budget, degradation
+from .report_cache import ReportCache
+from .blobs import BlobStore
+from .serialize import check_checkpointer, pack, unpack
+
+# per-node LLM usage of the node currently running (set by ResearchAgent._node)
+_node_usage: ContextVar[dict | None] = ContextVar("node_usage", default=None)
+_usage_lock = threading.Lock()
+# blob store of the run whose node is running (the run store's), for payloads kept out of the state
+_run_blobs: ContextVar[BlobStore | None] = ContextVar("run_blobs", default=None)
+
+# claims checked by verification searches per run
+MAX_VERIFIED_CLAIMS = 5
+# speculative CoVe: streamed draft text is compiled & verified in spans of at least this many characters
+COVE_SPAN_CHARS = 600
+# iterative deepening: sections covered below this are searched again, a few sources per gap search
+COVERAGE_THRESHOLD = 0.5
+SOURCES_PER_GAP = 2
+# hierarchical notes: clusters of at least DIGEST_MIN_NOTES are condensed, at most DIGEST_MAX_NOTES per digest call
+DIGEST_MIN_NOTES = 3
+DIGEST_MAX_NOTES = 12
+
+
+def _token_attributes(usage_metadata: dict | None) -> dict[str, int]:
+    # span attributes from a response's usage_metadata
+    if not usage_metadata:
+        return {}
+    return {
+        "input_tokens": usage_metadata.get("input_tokens", 0),
+        "output_tokens": usage_metadata.get("output_tokens", 0),
+        "cached_tokens": (usage_metadata.get("input_token_details") or {}).get("cache_read", 0),
+    }
+
+
+def strip_code_fences(content: str) -> str:
+    # Strip markdown code blocks if present
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return content.strip()
+
 
 class ResearchAgent:
     # research agent w configable models / search
@@ -26,175 +91,698 @@ class ResearchAgent:
             draft_model: str = "gpt-4o",
             verify_model: str = "gpt-4o-mini",
             search_provider: str = "tavily",
+            search_deadline_s: float = 3.0,
+            local_index: str | None = None,
             max_searches: int = 6,
             max_sources: int = 8,
             min_unique_domains: int = 4,
             enable_cove: bool = True,
+            speculative_cove: bool = False,
+            revision_mode: str = "rewrite",
+            deepen_rounds: int = 0,
+            hierarchical_notes: bool = False,
             report_style: str = "default",
+            note_cache: str | None = None,
+            fetch_pages: bool = False,
+            page_cache: str | None = None,
+            use_raw_content: bool = False,
+            passages_per_source: int = 4,
+            passage_token_budget: int = 1000,
+            min_source_relevance: float = 0.1,
+            stream_plan: bool = True,
+            node_models: dict[str, str] | None = None,
+            router: ModelRouter | dict | None = None,
+            model_config: str | None = None,
+            cassette: Cassette | None = None,
     ):
-        self.draft_llm = ChatOpenAI(model=draft_model)
-        self.verify_llm = ChatOpenAI(model=verify_model)
-        self.search = get_search_provider(search_provider)
+        # per-node models: config file, then explicit node_models; router likewise
+        file_config = load_model_config(model_config) if model_config else {}
+        self.node_models = node_model_map(
+            draft_model, verify_model, {**(file_config.get("node_models") or {}), **(node_models or {})}
+        )
+        router = router if router is not None else file_config.get("router")
+        self.router = ModelRouter(**router) if isinstance(router, dict) else router
+        self._clients: dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+        # a cassette records the live search provider, or replays it without building one
+        self.cassette = cassette
+        search_name = f"{search_provider}:{use_raw_content}"
+        provider = None
+        if cassette is None or not cassette.replaying:
+            provider = get_search_provider(
+                search_provider,
+                include_raw_content=use_raw_content,
+                deadline_s=search_deadline_s,
+                local_index=local_index,
+            )
+        self._backend = provider  # closed with the agent
+        if cassette is not None:
+            provider = cassette.wrap_search(search_name, provider)
+        # coalescing group: only searches that would hit the same backend & data share a call
+        # (a cassette records / replays only its own calls)
+        group = f"{search_name}:{Path(local_index).resolve() if local_index else '-'}"
+        if cassette is not None:
+            group += f":cassette-{id(cassette)}"
+        self.search = CoalescingSearch(provider, name=group, on_shared=lambda: self._count("shared_searches"))
         self.max_searches = max_searches
+        self.stream_plan = stream_plan
+        self.search_pool = ThreadPoolExecutor(max_workers=max(1, max_searches), thread_name_prefix="search")
         self.max_sources = max_sources
         self.min_unique_domains = min_unique_domains
+        self.min_source_relevance = min_source_relevance
         self.enable_cove = enable_cove
+        self.speculative_cove = speculative_cove
+        if revision_mode not in ("rewrite", "patch"):
+            raise ValueError(f"Unknown revision_mode: {revision_mode!r} (expected 'rewrite' or 'patch')")
+        self.revision_mode = revision_mode
+        self.deepen_rounds = deepen_rounds
+        self.hierarchical_notes = hierarchical_notes
         self.report_style = report_style
+        self.note_store = NoteStore(note_cache) if note_cache else None
+        self.fetcher = None
+        if fetch_pages:
+            # httpx & the HTML parser load only for graphs that fetch pages
+            from .fetch import PageFetcher
+            self.fetcher = PageFetcher(cache_dir=page_cache)
+        self.use_raw_content = use_raw_content
+        self.passages_per_source = passages_per_source
+        self.passage_token_budget = passage_token_budget
+
+    def close(self) -> None:
+        # shut down the search pool, a federated search's backend pool & the page fetcher's client
+        self.search_pool.shutdown(wait=False, cancel_futures=True)
+        if hasattr(self._backend, "close"):
+            self._backend.close()
+        if self.fetcher is not None:
+            self.fetcher.close()
+
+    def _node(self, fn):
+        # wrap a node so the LLM calls it makes are counted into its metrics update:
+        # calls per model, and prompt / completion / provider-cached prompt tokens & first-token latency per node;
+        # with a tracer in the run config, the node runs inside a span under the run's span;
+        # with a budget, the node charges it & consults it (see agent.budget);
+        # with a blob store, heavy intermediate payloads go there and the state keeps their IDs
+        def node(state: ResearchState, config: RunnableConfig) -> dict[str, Any]:
+            configurable = (config or {}).get("configurable") or {}
+            tracer = configurable.get("tracer")
+            tracing = tracer.activate(configurable.get("trace_parent")) if tracer else nullcontext()
+            budget = configurable.get("budget")
+            budgeting = budget.activate() if budget else nullcontext()
+            usage: dict[str, Any] = {}
+            token = _node_usage.set(usage)
+            blobs_token = _run_blobs.set(configurable.get("blobs"))
+            try:
+                with tracing, budgeting, span(fn.__name__, "node"):
+                    update = fn(state)
+            finally:
+                _run_blobs.reset(blobs_token)
+                _node_usage.reset(token)
+            if usage:
+                per_node = {
+                    key: {fn.__name__: usage.pop(key)}
+                    for key in ("input_tokens", "output_tokens", "cached_tokens", "first_token_s")
+                    if key in usage
+                }
+                update = {**update, "metrics": merge_metrics(update.get("metrics"), {**usage, **per_node})}
+            return update
+        node.__name__ = fn.__name__
+        return node
+
+    def _submit(self, fn, *args):
+        # search pool task that keeps the caller's context (active tracer / span)
+        return self.search_pool.submit(contextvars.copy_context().run, fn, *args)
+
+    def _llm(self, role: str, messages: list) -> Any:
+        # chat client for a node role; the router may pick a faster model for small prompts,
+        # and a draining run budget moves extraction to the smaller model
+        model = self.node_models[role]
+        budget = current_budget()
+        if role == "extractor" and budget is not None and budget.fast_extraction:
+            model = self._small_model
+        elif self.router is not None:
+            tokens = sum(estimate_tokens(m.content) for m in messages if isinstance(m.content, str))
+            model = self.router.choose(role, model, tokens)
+        with self._clients_lock:
+            if model not in self._clients:
+                if self.cassette is None:
+                    self._clients[model] = chat_model(model)
+                else:
+                    self._clients[model] = self.cassette.wrap_chat(
+                        model, None if self.cassette.replaying else chat_model(model)
+                    )
+            return self._clients[model]
+
+    @property
+    def _small_model(self) -> str:
+        # model extraction degrades to: the router's fast model, else the verify model
+        return self.router.fast_model if self.router is not None else self.node_models["cove_compiler"]
+
+    def _search(self, query: str, max_results: int = 5) -> SearchResult | None:
+        # run_search charged to the run budget & counted in metrics["search_calls"]; None once its searches are spent
+        budget = current_budget()
+        if budget is not None and not budget.take_search():
+            return None
+        self._count("search_calls")
+        result = run_search(query, self.search, max_results)
+        return SearchResult(query=result["query"], results=[self._offload_page_text(r) for r in result["results"]])
+
+    def _offload_page_text(self, result: dict) -> dict:
+        # full page text (raw_content) stays out of the state: with use_raw_content it goes to the
+        # run's blob store as raw_content_id (read back by select_and_extract), otherwise it is dropped
+        raw = result.get("raw_content")
+        blobs = _run_blobs.get()
+        if not raw or (self.use_raw_content and blobs is None):
+            return result  # graph run outside stream_research: nowhere to put it
+        result = {k: v for k, v in result.items() if k != "raw_content"}
+        if self.use_raw_content:
+            result["raw_content_id"] = blobs.put(pack(raw))
+        return result
+
+    @staticmethod
+    def _page_text(result: dict) -> str | None:
+        # a search result's raw_content, inline or from the run's blob store
+        ref = result.get("raw_content_id")
+        blobs = _run_blobs.get()
+        if ref and blobs is not None and ref in blobs:
+            return unpack(blobs.get(ref))
+        return result.get("raw_content")
+
+    def _count(self, metric: str) -> None:
+        # add one to a counter in the running node's metrics
+        usage = _node_usage.get()
+        if usage is not None:
+            with _usage_lock:  # planner & speculative CoVe search from search pool threads
+                usage[metric] = usage.get(metric, 0) + 1
+
+    def _record(self, model: str, seconds: float | None, usage_metadata: dict | None = None) -> None:
+        # count a call & its token usage for the running node; feed its latency to the router & run budget
+        budget = current_budget()
+        if budget is not None and (seconds is not None or usage_metadata):
+            tokens = (usage_metadata or {}).get("input_tokens", 0) + (usage_metadata or {}).get("output_tokens", 0)
+            budget.observe_call(seconds, tokens)
+        usage = _node_usage.get()
+        if usage is not None:
+            counts = {"model_calls": {model: 1}}
+            if usage_metadata:
+                counts["input_tokens"] = usage_metadata.get("input_tokens", 0)
+                counts["output_tokens"] = usage_metadata.get("output_tokens", 0)
+                counts["cached_tokens"] = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0)
+            with _usage_lock:  # speculative CoVe records from search pool threads
+                usage.update(merge_metrics(usage, counts))
+        if seconds is not None and self.router is not None:
+            self.router.observe(model, seconds)
+
+    @staticmethod
+    def _model_name(llm) -> str:
+        return getattr(llm, "model_name", None) or getattr(llm, "model", None) or repr(llm)
+
+    def _invoke(self, llm, messages: list) -> Any:
+        # chat model call; identical concurrent requests (same model & messages) share one call
+        model = self._model_name(llm)
+        key = (model, repr(getattr(llm, "kwargs", None)), tuple((m.type, m.content) for m in messages))
+        with span("chat", "llm", model=model, messages=len(messages)) as current:
+            start = time.perf_counter()
+            response, shared = FLIGHTS["llm"].do(key, lambda: llm.invoke(messages))
+            usage_metadata = None if shared else getattr(response, "usage_metadata", None)
+            current.set(shared=shared, **_token_attributes(usage_metadata))
+        if shared:
+            # the call we joined (and its tokens) is in its own run's model_calls
+            self._count("shared_llm_calls")
+        else:
+            self._record(model, time.perf_counter() - start, usage_metadata)
+        return response
 
     def plan_research(self, state: ResearchState) -> dict[str, Any]:
+        # follow-ups arrive with a previous run's search results; plan only the gaps
+        researched = [sr["query"] for sr in state.get("search_results") or []]
+        if researched:
+            user_prompt = PLANNER_FOLLOWUP_USER.format(
+                query=state["query"],
+                previous_queries="; ".join(state.get("previous_queries") or []),
+                researched="\n".join(f"- {q}" for q in researched),
+            )
+            max_plan = max(1, self.max_searches // 2)
+        else:
+            user_prompt = PLANNER_USER.format(query=state["query"])
+            max_plan = self.max_searches
+
+        degradations = []
+        budget = current_budget()
+        if budget is not None:
+            allowed, reason = budget.plan_size(max_plan, self.enable_cove)
+            if allowed < max_plan:
+                degradations.append(degradation("plan", "fewer_subquestions", reason, requested=max_plan, used=allowed))
+                max_plan = allowed
+
         messages = [
             SystemMessage(content=PLANNER_SYSTEM),
-            HumanMessage(content=PLANNER_USER.format(query=state["query"])),
+            HumanMessage(content=user_prompt),
         ]
 
-        response = self.draft_llm.invoke(messages)
-        content = response.content if hasattr(response, 'content') else str(response)
-        
-        # Strip markdown code blocks if present
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+        # JSON-mode planner; streamed so each subquestion is searched as soon as it is emitted
+        planner_llm = self._llm("planner", messages)
+        planner = planner_llm.bind(response_format={"type": "json_object"})
+        seen = {q.lower() for q in researched}
+        dispatched: list[str] = []
+        futures = {}
+
+        if self.stream_plan:
+            parser = StreamingArrayParser("subquestions")
+            parts = []
+            model = self._model_name(planner_llm)
+            with span("chat", "llm", model=model, messages=len(messages), streamed=True) as current:
+                start = time.perf_counter()
+                first_token_s = None
+                usage_metadata = None
+                for chunk in planner.stream(messages):
+                    text = chunk.content if isinstance(chunk.content, str) else ""
+                    if text and first_token_s is None:
+                        first_token_s = time.perf_counter() - start
+                    usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                    parts.append(text)
+                    for subquestion in parser.feed(text):
+                        if subquestion.lower() in seen or len(dispatched) >= max_plan:
+                            continue
+                        seen.add(subquestion.lower())
+                        dispatched.append(subquestion)
+                        futures[subquestion] = self._submit(self._search, subquestion, 5)
+                current.set(first_token_ms=round((first_token_s or 0) * 1000, 1), **_token_attributes(usage_metadata))
+            content = "".join(parts)
+            self._record(model, time.perf_counter() - start, usage_metadata)
+            usage = _node_usage.get()
+            if usage is not None and first_token_s is not None:
+                usage["first_token_s"] = round(first_token_s, 3)
+        else:
+            response = self._invoke(planner, messages)
+            content = response.content if hasattr(response, 'content') else str(response)
 
         try:
-            parsed = json.loads(content)
+            parsed = json.loads(strip_code_fences(content))
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict):
             plan = parsed.get("subquestions", [])
             outline = parsed.get("outline", [])
-        except json.JSONDecodeError:
-            # plaintext fallback by newline
-            plan = [line.strip() for line in content.split("\n") if line.strip() and len(line.strip()) > 10]
+        else:
+            # broken or not a JSON object: keep whatever streamed out before; else search the query itself
+            plan = dispatched or [state["query"]]
             outline = None
-        
+
+        researched_lower = {q.lower() for q in researched}
+        plan = list(dict.fromkeys(dispatched + [q for q in plan if q.lower() not in researched_lower]))[:max_plan]
+
+        prior = list(state.get("search_results") or [])
+        early_results = [r for r in (futures[q].result() for q in plan if q in futures) if r is not None]
+
         return {
-            "plan": plan[:self.max_searches],
+            "plan": plan,
             "outline": outline,
+            "search_results": prior + early_results,
             "status": "searching",
-            "messages": [{"role": "assistant", "content": f"Planned {len(plan[:self.max_searches])} subquestions."}],
+            "messages": [{"role": "assistant", "content": f"Planned {len(plan)} subquestions ({len(early_results)} searched while planning)."}],
+            "metrics": {"searches_during_planning": len(early_results)},
+            "degradations": degradations,
         }
     
     def run_searches(self, state: ResearchState) -> dict[str, Any]:
-        # do web searches for subquestions
-        search_results = []
+        # search subquestions (or a deepening round's gap queries) not already searched, concurrently
+        prior = list(state.get("search_results") or [])
+        searched = {sr["query"] for sr in prior}
+        pending = [q for q in state.get("gap_queries") or state["plan"] if q not in searched]
+        futures = [self._submit(self._search, q, 5) for q in pending]
+        search_results = [r for r in (f.result() for f in futures) if r is not None]
 
-        for subquestion in state["plan"]:
-            result = run_search(subquestion, self.search, max_results = 5)
-            search_results.append(result)
+        degradations = []
+        if len(search_results) < len(pending):
+            skipped = [q for q in pending if q not in {sr["query"] for sr in search_results}]
+            degradations.append(degradation("search", "skipped_searches", "searches", skipped=skipped))
         
         return {
-            "search_results": search_results,
+            "search_results": prior + search_results,
             "status": "extracting",
             "messages": [{"role": "assistant", "content": f"Ran {len(search_results)} searches."}],
+            "degradations": degradations,
         }
 
     def select_and_extract(self, state: ResearchState) -> dict[str, Any]:
-        sources = select_sources(
-            state["search_results"],
-            max_sources=self.max_sources,
+        # keep sources / notes already extracted; select & extract only from this round's results
+        prior_sources = list(state.get("sources") or [])
+        prior_notes = list(state.get("notes") or [])
+        known_urls = {s["url"] for s in prior_sources}
+
+        # this round's queries: the plan, or the gap searches of a deepening round
+        queries = list(state.get("gap_queries") or state["plan"])
+        new_results = [
+            {
+                "query": sr["query"],
+                "results": [r for r in sr["results"] if r.get("url") not in known_urls],
+            }
+            for sr in state["search_results"]
+            if sr["query"] in queries
+        ]
+        # a deepening round only needs a few sources per gap search
+        requested = self.max_sources
+        if state.get("deepen_round"):
+            requested = min(requested, SOURCES_PER_GAP * len(queries))
+        # a draining budget extracts fewer sources, then extracts with the smaller model
+        max_sources = requested
+        degradations = []
+        budget = current_budget()
+        if budget is not None:
+            max_sources, reason = budget.source_count(requested, self.enable_cove)
+            if max_sources < requested:
+                degradations.append(degradation("extract", "fewer_sources", reason, requested=requested, used=max_sources))
+            degrade, reason = budget.extraction_degraded(max_sources < self.max_sources)
+            if degrade and not budget.fast_extraction and self._small_model != self.node_models["extractor"]:
+                budget.fast_extraction = True
+                degradations.append(degradation(
+                    "extract", "smaller_extraction_model", reason,
+                    requested=self.node_models["extractor"], used=self._small_model,
+                ))
+
+        new_sources = select_sources(
+            new_results,
+            max_sources=max_sources,
             min_unique_domains=self.min_unique_domains,
+            query=state["query"],
+            min_relevance=self.min_source_relevance,
         )
+        sources = prior_sources + new_sources
 
-        notes = []
-        for source in sources:
-            messages = [
-                SystemMessage(content=EXTRACTOR_SYSTEM),
-                HumanMessage(content=EXTRACTOR_USER.format(
-                    query=state["query"],
-                    url=source["url"],
-                    title=source["title"],
-                    content=source["snippet"],
-                )),
-            ]
+        # long source text (search raw_content and/or fetched pages) split into chunks
+        chunks: dict[str, list[str]] = {}
+        if self.use_raw_content:
+            from .fetch import chunk_text
 
-            response = self.draft_llm.invoke(messages)
-            content = response.content if hasattr(response, 'content') else str(response)
+            results = {r.get("url"): r for sr in new_results for r in sr["results"]}
+            for source in new_sources:
+                raw = self._page_text(results[source["url"]]) if source["url"] in results else None
+                if raw:
+                    chunks[source["url"]] = chunk_text(raw)
+        if self.fetcher is not None and new_sources:
+            chunks.update(self.fetcher.fetch_all([s["url"] for s in new_sources]))
 
-            # Strip markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+        # best passages per source under a token budget; sources without chunks keep their snippet
+        passages = select_passages(
+            {s["url"]: chunks[s["url"]] for s in new_sources if chunks.get(s["url"])},
+            state["query"],
+            queries,
+            k=self.passages_per_source,
+            token_budget=self.passage_token_budget,
+        )
 
-            try:
-                parsed = json.loads(content)
-                notes.append(Note(
-                    source_url=source["url"],
-                    bullets=parsed.get("bullets", []),
-                    quote=parsed.get("quote"),
-                    relevance=parsed.get("relevance", ""),
-                ))
-            except json.JSONDecodeError:
-                notes.append(Note(
-                    source_url=source["url"],
-                    bullets=[content[:500]],
-                    quote=None,
-                    relevance="Extraction parsing failed",
-                ))
+        # the chunks themselves stay out of the state: it keeps their blob IDs when the run has a blob store
+        blobs = _run_blobs.get()
+        chunk_refs = dict(state.get("chunks") or {})
+        if blobs is not None:
+            chunk_refs.update({url: blobs.put(pack(texts)) for url, texts in chunks.items() if texts})
+
+        notes = prior_notes
+        cache_hits = 0
+        for source in new_sources:
+            content = passages.get(source["url"]) or source["snippet"]
+            cached = None
+            if self.note_store is not None:
+                with span("note_cache", "cache", url=source["url"]) as current:
+                    cached = self.note_store.get(source["url"], content, state["query"])
+                    current.set(hit=cached is not None)
+            if cached is not None:
+                cache_hits += 1
+                notes.append(cached)
+                continue
+            note, parsed_ok = self._extract_note(state["query"], source, content)
+            notes.append(note)
+            if parsed_ok and self.note_store is not None:
+                self.note_store.put(source["url"], content, state["query"], note)
         
         return {
             "sources": sources,
             "notes": notes,
+            "chunks": chunk_refs,
             "status": "drafting",
-            "messages": [{"role": "assistant", "content": f"Extracted notes from {len(sources)} sources."}],
+            "messages": [{"role": "assistant", "content": f"Extracted notes from {len(new_sources)} new sources ({len(sources)} total)."}],
+            "metrics": {
+                "extract_calls": len(new_sources) - cache_hits,
+                "note_cache_hits": cache_hits,
+                "note_cache_misses": len(new_sources) - cache_hits if self.note_store is not None else 0,
+                "pages_fetched": sum(1 for s in new_sources if s["url"] in chunks),
+            },
+            "degradations": degradations,
         }
 
-    def draft_report(self, state: ResearchState) -> dict[str, Any]:
-        # Generate the initial report draft.
+    def _extract_note(self, query: str, source: Source, content: str) -> tuple[Note, bool]:
+        # extract notes from one source; returns (note, parsed_ok)
+        messages = [
+            SystemMessage(content=EXTRACTOR_SYSTEM),
+            HumanMessage(content=EXTRACTOR_USER.format(
+                query=query,
+                url=source["url"],
+                title=source["title"],
+                content=content,
+            )),
+        ]
+
+        response = self._invoke(self._llm("extractor", messages), messages)
+        content = strip_code_fences(response.content if hasattr(response, 'content') else str(response))
+
+        try:
+            parsed = json.loads(content)
+            return Note(
+                source_url=source["url"],
+                bullets=parsed.get("bullets", []),
+                quote=parsed.get("quote"),
+                relevance=parsed.get("relevance", ""),
+            ), True
+        except json.JSONDecodeError:
+            return Note(
+                source_url=source["url"],
+                bullets=[content[:500]],
+                quote=None,
+                relevance="Extraction parsing failed",
+            ), False
+
+    def analyze_gaps(self, state: ResearchState) -> dict[str, Any]:
+        # iterative deepening: search again for outline sections the notes barely cover (lexical, no LLM call)
+        coverage = section_coverage(state.get("outline") or [], state["notes"])
+        gaps = [section for section, covered in coverage.items() if covered < COVERAGE_THRESHOLD]
+        searched = {sr["query"].lower() for sr in state["search_results"]}
+        queries = [f"{state['query']} {section}" for section in gaps]
+        queries = [q for q in queries if q.lower() not in searched][:max(1, self.max_searches // 2)]
+
+        round_ = state.get("deepen_round") or 0
+        degradations = []
+        if round_ >= self.deepen_rounds:
+            queries = []
+        budget = current_budget()
+        if queries and budget is not None:
+            allowed, reason = budget.gap_searches(len(queries), self.enable_cove)
+            if allowed < len(queries):
+                action = "fewer_gap_searches" if allowed else "skipped_deepening"
+                degradations.append(degradation("deepen", action, reason, requested=len(queries), used=allowed))
+                queries = queries[:allowed]
+
+        covered = len(coverage) - len(gaps)
+        if not queries:
+            # converged: nothing uncovered, gaps already searched, or out of rounds / budget
+            return {
+                "coverage": coverage,
+                "gap_queries": [],
+                "status": "drafting",
+                "messages": [{"role": "assistant", "content": f"{covered}/{len(coverage)} outline sections covered."}],
+                "degradations": degradations,
+            }
+        return {
+            "coverage": coverage,
+            "gap_queries": queries,
+            "deepen_round": round_ + 1,
+            "status": "searching",
+            "messages": [{"role": "assistant", "content": f"{covered}/{len(coverage)} outline sections covered; searching {len(queries)} gaps."}],
+            "metrics": {"deepen_rounds": 1, "gap_searches": len(queries)},
+            "degradations": degradations,
+        }
+
+    def digest_notes(self, state: ResearchState) -> dict[str, Any]:
+        # hierarchical aggregation: notes clustered by subquestion, each cluster condensed concurrently
+        clusters = cluster_notes(state["notes"], state["sources"], DIGEST_MAX_NOTES)
+        url_to_idx = {s["url"]: i + 1 for i, s in enumerate(state["sources"])}
+        futures = [
+            self._submit(self._digest, state["query"], topic, notes, state["sources"], url_to_idx)
+            if len(notes) >= DIGEST_MIN_NOTES else None
+            for topic, notes in clusters
+        ]
+        digests = []
+        for (topic, notes), future in zip(clusters, futures):
+            digest = future.result() if future is not None else None
+            if digest is None:  # too small to condense, or the digest lost its citations
+                digest = NoteDigest(
+                    topic=topic,
+                    citations=sorted({url_to_idx[n["source_url"]] for n in notes if n["source_url"] in url_to_idx}),
+                    text=format_notes_for_report(notes, state["sources"]),
+                    condensed=False,
+                )
+            digests.append(digest)
 
+        condensed = [d for d in digests if d["condensed"]]
+        return {
+            "note_digests": digests,
+            "messages": [{"role": "assistant", "content": f"Condensed {len(state['notes'])} notes into {len(digests)} digests ({len(condensed)} condensed)."}],
+            "metrics": {
+                "digest_calls": sum(f is not None for f in futures),
+                "digested_notes": sum(len(notes) for (_, notes), f in zip(clusters, futures) if f is not None),
+            },
+        }
+
+    def _digest(self, query: str, topic: str, notes: list[Note], sources: list[Source], url_to_idx: dict[str, int]) -> NoteDigest | None:
+        # condensed digest of one cluster; None if it cites none of the cluster's sources
+        messages = [
+            SystemMessage(content=DIGEST_SYSTEM),
+            HumanMessage(content=DIGEST_USER.format(
+                query=query,
+                topic=topic,
+                max_bullets=min(2 * len(notes), DIGEST_MAX_NOTES),
+                notes=format_notes_for_report(notes, sources),
+            )),
+        ]
+        response = self._invoke(self._llm("digester", messages), messages)
+        text = (response.content if hasattr(response, 'content') else str(response)).strip()
+        cited = {url_to_idx[n["source_url"]] for n in notes if n["source_url"] in url_to_idx}
+        citations = sorted(cited & cited_numbers(text))
+        if not citations:
+            return None
+        return NoteDigest(topic=topic, citations=citations, text=text, condensed=True)
+
+    def _report_context(self, state: ResearchState) -> list:
+        # leading messages shared by writer & reviser (one cacheable prompt prefix per run)
         outline_str = "\n".join(state["outline"]) if state.get("outline") else "Use your judgment"
-        notes_str = format_notes_for_report(state["notes"], state["sources"])
-        sources_str = formatted_sources_list(state["sources"])
+        digests = state.get("note_digests")
+        return [
+            SystemMessage(content=REPORT_SYSTEM),
+            HumanMessage(content=REPORT_CONTEXT.format(
+                query=state["query"],
+                outline=outline_str,
+                notes=format_digests(digests) if digests else format_notes_for_report(state["notes"], state["sources"]),
+                sources=formatted_sources_list(state["sources"]),
+            )),
+        ]
 
-        # Inject report style guidance into the writer system prompt
+    def draft_report(self, state: ResearchState) -> dict[str, Any]:
+        # Generate the initial report draft.
+
+        # report style guidance goes after the shared context, so styles don't split the prefix
         style = state.get("report_style", "default")
         style_header = REPORT_STYLE_HEADERS.get(style, REPORT_STYLE_HEADERS["default"])
-        writer_system = WRITER_SYSTEM.format(style_header=style_header)
 
         messages = [
-            SystemMessage(content=writer_system),
-            HumanMessage(
-                content=WRITER_USER.format(
-                    query=state["query"],
-                    outline=outline_str,
-                    notes=notes_str,
-                    sources=sources_str,
-                )
-            ),
+            *self._report_context(state),
+            HumanMessage(content=WRITER_USER.format(style_header=style_header)),
         ]
 
-        response = self.draft_llm.invoke(messages)
-        content = response.content if hasattr(response, "content") else str(response)
+        speculative = None
+        if self.enable_cove and self.speculative_cove:
+            content, speculative = self._draft_speculative(state["query"], messages)
+        else:
+            response = self._invoke(self._llm("writer", messages), messages)
+            content = response.content if hasattr(response, "content") else str(response)
 
-        next_status = "verifying" if self.enable_cove else "complete"
+        # the draft is the report when CoVe is off, or no longer fits the run budget
+        verify = self.enable_cove
+        degradations = []
+        budget = current_budget()
+        if verify and budget is not None:
+            verify, reason = budget.cove_affordable()
+            if not verify:
+                degradations.append(degradation("verify", "skipped_cove", reason))
 
-        return {
+        update = {
             "report_style": style,  # optional: keep it in state for downstream/debugging
             "report_draft": content,
-            "report": None if self.enable_cove else content,
-            "status": next_status,
-            "messages": [] if self.enable_cove else [{"role": "assistant", "content": content}],
+            "report": None if verify else content,
+            "status": "verifying" if verify else "complete",
+            # the report is in state["report"]; messages only say what happened
+            "messages": [] if verify else [{"role": "assistant", "content": f"Wrote the report ({len(content.split())} words)."}],
+            "degradations": degradations,
         }
-    
-    def compile_verification(self, state: ResearchState) -> dict[str, Any]:
-        # Generate verification spec using CoVe approach
+        if speculative is not None:
+            # claims were compiled & verified while the draft streamed: straight to revision
+            spec, verified, metrics = speculative
+            update["metrics"] = metrics
+            if verify:
+                update.update(verification_spec=spec, verification_results=verified, status="revising")
+        return update
+
+    def _draft_speculative(self, query: str, messages: list) -> tuple[str, tuple]:
+        """
+        stream the draft; each completed span of paragraphs (COVE_SPAN_CHARS) is
+        compiled into claims and verified on the search pool while writing
+        continues, so little CoVe work is left once the draft is done
+
+        returns (draft, (verification spec, verified claims, metrics))
+        """
+        llm = self._llm("writer", messages)
+        model = self._model_name(llm)
+        splitter = ParagraphSplitter(COVE_SPAN_CHARS)
+        slots = [MAX_VERIFIED_CLAIMS]
+        slots_lock = threading.Lock()
+        futures = []
+
+        def check(excerpt: str) -> tuple[list[VerificationClaim], list[VerificationClaim], str]:
+            claims, focus = self._compile_claims(query, excerpt, COVE_COMPILER_EXCERPT_USER)
+            with slots_lock:
+                taken = claims[:slots[0]]
+                slots[0] -= len(taken)
+            verified = []
+            for claim in taken:
+                result = self._verify_claim(claim)
+                if result is None:
+                    break
+                verified.append(result)
+            return claims, verified, focus
+
+        def dispatch(excerpts: list[str]) -> None:
+            budget = current_budget()
+            for excerpt in excerpts:
+                if slots[0] > 0 and (budget is None or budget.cove_affordable()[0]):
+                    futures.append(self._submit(check, excerpt))
+
+        with span("chat", "llm", model=model, messages=len(messages), streamed=True, speculative=True) as current:
+            start = time.perf_counter()
+            parts = []
+            usage_metadata = None
+            for chunk in llm.stream(messages):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                parts.append(text)
+                dispatch(splitter.feed(text))
+            current.set(**_token_attributes(usage_metadata))
+        drafted = time.perf_counter()
+        self._record(model, drafted - start, usage_metadata)
+        dispatch(splitter.close())
+
+        results = [f.result() for f in futures]
+        claims = [c for spec_claims, _, _ in results for c in spec_claims]
+        verified = [v for _, spec_verified, _ in results for v in spec_verified]
+        spec = {
+            "claims": claims,
+            "verification_focus": "; ".join(dict.fromkeys(focus for _, _, focus in results if focus)),
+        }
+        metrics = {
+            "speculative_spans": len(futures),
+            # CoVe time not hidden behind the draft
+            "cove_wait_s": round(time.perf_counter() - drafted, 3),
+        }
+        return "".join(parts), (spec, verified, metrics)
+
+    def _compile_claims(self, query: str, draft: str, template: str = COVE_COMPILER_USER) -> tuple[list[VerificationClaim], str]:
+        # (claims to verify, verification focus) for a draft or a span of one
         messages = [
             SystemMessage(content=COVE_COMPILER_SYSTEM),
-            HumanMessage(content=COVE_COMPILER_USER.format(
-                query=state["query"],
-                draft=state["report_draft"],
-            )),
+            HumanMessage(content=template.format(query=query, draft=draft)),
         ]
-        
-        response = self.verify_llm.invoke(messages)
+        # tagged so a draft node's compile calls aren't streamed as report tokens
+        llm = self._llm("cove_compiler", messages).with_config(tags=[TAG_NOSTREAM])
+        response = self._invoke(llm, messages)
         content = response.content if hasattr(response, 'content') else str(response)
-        
+
         try:
             parsed = json.loads(content)
             claims = [
@@ -207,11 +795,14 @@ class ResearchAgent:
                 )
                 for c in parsed.get("claims", [])
             ]
-            verification_focus = parsed.get("verification_focus", "")
+            return claims, parsed.get("verification_focus", "")
         except json.JSONDecodeError:
-            claims = []
-            verification_focus = "Parsing failed"
-        
+            return [], "Parsing failed"
+
+    def compile_verification(self, state: ResearchState) -> dict[str, Any]:
+        # Generate verification spec using CoVe approach
+        claims, verification_focus = self._compile_claims(state["query"], state["report_draft"])
+
         return {
             "verification_spec": {
                 "claims": claims,
@@ -219,7 +810,40 @@ class ResearchAgent:
             },
             "status": "verifying",
         }
-    
+
+    def _verify_claim(self, claim: VerificationClaim) -> VerificationClaim | None:
+        # search evidence for one claim; None once the run budget's searches are spent
+        result = self._search(claim["verification_query"], max_results=3)
+        if result is None:
+            return None
+
+        evidence = [
+            r.get("content", "")[:200]
+            for r in result["results"]
+        ]
+
+        # Simple heuristic: if any evidence mentions similar terms, mark as confirmed
+        claim_lower = claim["claim"].lower()
+        matches = sum(1 for e in evidence if any(
+            word in e.lower()
+            for word in claim_lower.split()[:5]
+        ))
+
+        if matches >= 2:
+            status = "confirmed"
+        elif matches == 1:
+            status = "mixed"
+        else:
+            status = "insufficient"
+
+        return VerificationClaim(
+            claim=claim["claim"],
+            source_in_draft=claim["source_in_draft"],
+            verification_query=claim["verification_query"],
+            evidence=evidence,
+            status=status,
+        )
+
     def verify_claims(self, state: ResearchState) -> dict[str, Any]:
         # Run verification searches for each claim.
         if not state.get("verification_spec"):
@@ -228,35 +852,11 @@ class ResearchAgent:
         claims = state["verification_spec"]["claims"]
         verified_claims = []
         
-        for claim in claims[:5]:  # Cap verification searches
-            result = run_search(claim["verification_query"], self.search, max_results=3)
-            
-            evidence = [
-                r.get("content", "")[:200] 
-                for r in result["results"]
-            ]
-            
-            # Simple heuristic: if any evidence mentions similar terms, mark as confirmed
-            claim_lower = claim["claim"].lower()
-            matches = sum(1 for e in evidence if any(
-                word in e.lower() 
-                for word in claim_lower.split()[:5]
-            ))
-            
-            if matches >= 2:
-                status = "confirmed"
-            elif matches == 1:
-                status = "mixed"
-            else:
-                status = "insufficient"
-            
-            verified_claims.append(VerificationClaim(
-                claim=claim["claim"],
-                source_in_draft=claim["source_in_draft"],
-                verification_query=claim["verification_query"],
-                evidence=evidence,
-                status=status,
-            ))
+        for claim in claims[:MAX_VERIFIED_CLAIMS]:  # Cap verification searches
+            verified = self._verify_claim(claim)
+            if verified is None:
+                break  # run budget's searches spent; the rest stay unverified
+            verified_claims.append(verified)
         
         return {
             "verification_results": verified_claims,
@@ -276,104 +876,431 @@ class ResearchAgent:
             ],
             indent=2,
         )
+
+        metrics = {}
+        if self.revision_mode == "patch":
+            report, edits = self._patch_report(state, verification_str)
+            if report is not None:
+                return {
+                    "report": report,
+                    "status": "complete",
+                    "messages": [{"role": "assistant", "content": f"Revised the draft with {edits} edits."}],
+                    "metrics": {"revision_edits": edits},
+                }
+            metrics["revision_fallbacks"] = 1
         
         messages = [
-            SystemMessage(content=COVE_REVISER_SYSTEM),
+            *self._report_context(state),
             HumanMessage(content=COVE_REVISER_USER.format(
-                query=state["query"],
                 draft=state["report_draft"],
                 verification_results=verification_str,
             )),
         ]
         
-        response = self.draft_llm.invoke(messages)
+        response = self._invoke(self._llm("reviser", messages), messages)
         content = response.content if hasattr(response, 'content') else str(response)
         
         return {
             "report": content,
             "status": "complete",
-            "messages": [{"role": "assistant", "content": content}],
+            "messages": [{"role": "assistant", "content": f"Revised the draft ({len(content.split())} words)."}],
+            "metrics": metrics,
         }
 
+    def _patch_report(self, state: ResearchState, verification_str: str) -> tuple[str | None, int]:
+        # (draft with the reviser's edits applied + checklist, edit count); None when an edit can't be applied
+        messages = [
+            *self._report_context(state),
+            HumanMessage(content=COVE_PATCH_USER.format(
+                draft=state["report_draft"],
+                verification_results=verification_str,
+            )),
+        ]
+        # edits are JSON, not report text, so they aren't streamed as report tokens
+        llm = self._llm("reviser", messages).bind(response_format={"type": "json_object"}).with_config(tags=[TAG_NOSTREAM])
+        response = self._invoke(llm, messages)
+        content = response.content if hasattr(response, 'content') else str(response)
+        try:
+            edits = json.loads(strip_code_fences(content)).get("edits")
+        except (json.JSONDecodeError, AttributeError):
+            return None, 0
+        if not isinstance(edits, list) or not all(isinstance(e, dict) for e in edits):
+            return None, 0
+        report, unmatched = apply_edits(state["report_draft"], edits)
+        if unmatched:
+            return None, 0
+        checklist = verification_checklist(state.get("verification_results") or [])
+        return f"{report.rstrip()}\n\n{checklist}\n", len(edits)
+
 
 def build_graph(
     draft_model: str = "gpt-4o",
     verify_model: str = "gpt-4o-mini",
     search_provider: str = "tavily",
+    search_deadline_s: float = 3.0,
+    local_index: str | None = None,
     max_searches: int = 6,
     max_sources: int = 8,
     min_unique_domains: int = 4,
     enable_cove: bool = True,
+    speculative_cove: bool = False,
+    revision_mode: str = "rewrite",
+    deepen_rounds: int = 0,
+    hierarchical_notes: bool = False,
     report_style: str = "default",
+    note_cache: str | None = None,
+    fetch_pages: bool = False,
+    page_cache: str | None = None,
+    use_raw_content: bool = False,
+    passages_per_source: int = 4,
+    passage_token_budget: int = 1000,
+    min_source_relevance: float = 0.1,
+    stream_plan: bool = True,
+    node_models: dict[str, str] | None = None,
+    router: ModelRouter | dict | None = None,
+    model_config: str | None = None,
+    cassette: Cassette | None = None,
+    checkpointer: Any = None,
 ) -> StateGraph:
     # Build and return the research agent graph
-    
+    # search_provider: "tavily", "stub", "local", or backends joined with "+" to federate them;
+    # search_deadline_s bounds how long a federated search waits for more backends
+    # local_index: index directory for "local" (built with `research index DIR`)
+    # node_models: {node: model} for planner / extractor / writer / cove_compiler / reviser
+    # router: ModelRouter (or its kwargs) sending small prompts to a faster model
+    # model_config: JSON / TOML file with [models] and [router] (see agent.models)
+    # cassette: records all chat model & search I/O, or replays it offline (see agent.cassette)
+    # speculative_cove: compile & verify claims from the draft's paragraphs while it is still streaming
+    # revision_mode: "rewrite" regenerates the report after CoVe; "patch" applies the reviser's
+    # edits to the draft (a full rewrite if an edit's anchor isn't found)
+    # deepen_rounds: up to this many rounds of targeted searches for outline sections the notes don't cover
+    # hierarchical_notes: the writer gets per-subquestion digests of the notes (condensed concurrently)
+    # instead of every note, so reports scale to many more sources
+    # checkpointer: optional LangGraph saver, e.g. InMemorySaver(serde=CompactSerializer());
+    # a durable saver's CompactSerializer needs an on-disk BlobStore
+    if checkpointer is not None:
+        check_checkpointer(checkpointer)
+
     agent = ResearchAgent(
         draft_model=draft_model,
         verify_model=verify_model,
         search_provider=search_provider,
+        search_deadline_s=search_deadline_s,
+        local_index=local_index,
         max_searches=max_searches,
         max_sources=max_sources,
         min_unique_domains=min_unique_domains,
         enable_cove=enable_cove,
+        speculative_cove=speculative_cove,
+        revision_mode=revision_mode,
+        deepen_rounds=deepen_rounds,
+        hierarchical_notes=hierarchical_notes,
         report_style=report_style,
+        note_cache=note_cache,
+        fetch_pages=fetch_pages,
+        page_cache=page_cache,
+        use_raw_content=use_raw_content,
+        passages_per_source=passages_per_source,
+        passage_token_budget=passage_token_budget,
+        min_source_relevance=min_source_relevance,
+        stream_plan=stream_plan,
+        node_models=node_models,
+        router=router,
+        model_config=model_config,
+        cassette=cassette,
     )
     
     # Create graph
     graph = StateGraph(ResearchState)
     
     # Add nodes
-    graph.add_node("plan_research", agent.plan_research)
-    graph.add_node("run_searches", agent.run_searches)
-    graph.add_node("select_and_extract", agent.select_and_extract)
-    graph.add_node("draft_report", agent.draft_report)
+    graph.add_node("plan_research", agent._node(agent.plan_research))
+    graph.add_node("run_searches", agent._node(agent.run_searches))
+    graph.add_node("select_and_extract", agent._node(agent.select_and_extract))
+    graph.add_node("draft_report", agent._node(agent.draft_report))
+    if deepen_rounds:
+        graph.add_node("analyze_gaps", agent._node(agent.analyze_gaps))
+    if hierarchical_notes:
+        graph.add_node("digest_notes", agent._node(agent.digest_notes))
     
     if enable_cove:
-        graph.add_node("compile_verification", agent.compile_verification)
-        graph.add_node("verify_claims", agent.verify_claims)
-        graph.add_node("revise_report", agent.revise_report)
+        graph.add_node("compile_verification", agent._node(agent.compile_verification))
+        graph.add_node("verify_claims", agent._node(agent.verify_claims))
+        graph.add_node("revise_report", agent._node(agent.revise_report))
     
     # Add edges; baseline flow
     graph.add_edge(START, "plan_research")
     graph.add_edge("plan_research", "run_searches")
     graph.add_edge("run_searches", "select_and_extract")
-    graph.add_edge("select_and_extract", "draft_report")
+    # notes go to the writer directly, or through per-subquestion digests
+    drafting = "digest_notes" if hierarchical_notes else "draft_report"
+    if hierarchical_notes:
+        graph.add_edge("digest_notes", "draft_report")
+    if deepen_rounds:
+        # gap analysis loops back to searching until coverage converges
+        graph.add_edge("select_and_extract", "analyze_gaps")
+        graph.add_conditional_edges(
+            "analyze_gaps",
+            lambda state: "run_searches" if state.get("status") == "searching" else drafting,
+            ["run_searches", drafting],
+        )
+    else:
+        graph.add_edge("select_and_extract", drafting)
     
     if enable_cove:
         # CoVe verification flow
-        graph.add_edge("draft_report", "compile_verification")
+        # a run budget may skip CoVe (the draft is already the report); speculative
+        # CoVe verifies while drafting and goes straight to revision
+        graph.add_conditional_edges(
+            "draft_report",
+            lambda state: {"complete": END, "revising": "revise_report"}.get(state.get("status"), "compile_verification"),
+            ["compile_verification", "revise_report", END],
+        )
         graph.add_edge("compile_verification", "verify_claims")
         graph.add_edge("verify_claims", "revise_report")
         graph.add_edge("revise_report", END)
     else:
         graph.add_edge("draft_report", END)
     
-    return graph.compile()
+    compiled = graph.compile(checkpointer=checkpointer)
+    compiled.research_agent = agent  # for close_graph
+    return compiled
 
 
-def run_research(
+def close_graph(graph: Any) -> None:
+    # release the thread pools & clients of a graph from build_graph; other graphs are left alone
+    agent = getattr(graph, "research_agent", None)
+    if agent is not None:
+        agent.close()
+
+
+def initial_state(
     query: str,
-    **config_kwargs,
+    report_style: str = "default",
+    previous: ResearchState | None = None,
 ) -> ResearchState:
-    # Convenience function to run research on a query.
-    graph = build_graph(**config_kwargs)
-    
-    initial_state: ResearchState = {
+    # Fresh state for a query; a previous result seeds search results, sources & notes
+    state: ResearchState = {
         "messages": [{"role": "user", "content": query}],
         "query": query,
         "plan": [],
         "outline": None,
+        "coverage": None,
+        "deepen_round": 0,
+        "gap_queries": [],
         "search_results": [],
         "sources": [],
         "notes": [],
+        "chunks": {},
+        "note_digests": None,
         "report_draft": None,
         "report": None,
         "verification_spec": None,
         "verification_results": None,
         "status": "planning",
         "error": None,
-        "report_style": config_kwargs.get("report_style", "default"),
+        "report_style": report_style,
+        "run_id": new_run_id(),
+        "parent_run_id": None,
+        "previous_queries": [],
+        "metrics": {},
+        "degradations": [],
     }
-    
-    final_state = graph.invoke(initial_state)
-    return final_state
\ No newline at end of file
+    if previous:
+        state.update({
+            "search_results": list(previous.get("search_results") or []),
+            "sources": list(previous.get("sources") or []),
+            "notes": list(previous.get("notes") or []),
+            "chunks": dict(previous.get("chunks") or {}),
+            "parent_run_id": previous.get("run_id"),
+            "previous_queries": [*(previous.get("previous_queries") or []), previous["query"]],
+        })
+    return state
+
+
+# nodes whose LLM output is report text (streamed as token events)
+REPORT_NODES = {"draft_report", "revise_report"}
+
+
+def stream_research(
+    query: str,
+    previous: ResearchState | str | None = None,
+    run_store: RunStore | None = None,
+    graph: Any = None,
+    tokens: bool = False,
+    tracer: Tracer | None = None,
+    report_cache: ReportCache | None = None,
+    budget: Budget | None = None,
+    deadline_s: float | None = None,
+    max_tokens: int | None = None,
+    max_search_calls: int | None = None,
+    **config_kwargs,
+) -> Iterator[dict[str, Any]]:
+    """
+    Run research on a query, yielding an event as each node finishes:
+      {"type": "progress", "node": ..., "status": ..., "message": ...}
+    and finally {"type": "result", "state": final_state}.
+    With tokens=True, report text is also streamed as the writer / reviser produce it:
+      {"type": "token", "node": ..., "text": ...}
+
+    previous: an earlier result (or its stored run ID) to follow up on; only
+    the gaps are planned, searched and extracted before the report is redrafted
+    run_store: where run IDs are loaded from / the finished run is saved to; its blob
+    store keeps the run's page text (search results' raw_content_id, state["chunks"]),
+    which otherwise lives in a blob store of the run's own
+    graph: an already compiled graph to reuse instead of building one from config_kwargs
+    (the caller closes it; a graph built here is closed when the run ends)
+    tracer: records a span for the run, each node, LLM call, search, fetch & cache lookup
+    deadline_s / max_tokens / max_search_calls: run budget; as it drains the run plans
+    fewer subquestions, extracts fewer sources with a smaller model and skips CoVe,
+    recording each cut in state["degradations"] (or pass a prepared budget)
+    report_cache: answers near-duplicates of recent queries (same report config) from
+    the cache, marked with metrics["served_from_cache"]; stores finished, undegraded runs
+    """
+    if isinstance(previous, str):
+        previous = (run_store or RunStore()).load(previous)
+
+    use_cache = report_cache is not None and previous is None
+    if use_cache:
+        with tracer.activate() if tracer is not None else nullcontext():
+            with span("report_cache", "cache", query=query) as current:
+                cached = report_cache.get(query, config_kwargs)
+                current.set(hit=cached is not None)
+        if cached is not None:
+            if run_store is not None:
+                run_store.save(cached)  # so the cached run can be followed up
+            hit = cached["metrics"]["served_from_cache"]
+            yield {
+                "type": "progress",
+                "node": "report_cache",
+                "status": cached.get("status"),
+                "message": f"Served from cache (similarity {hit['similarity']:.2f} to \"{hit['query']}\").",
+            }
+            yield {"type": "result", "state": cached}
+            return
+
+    # the clock starts before the graph is built, which counts against the deadline too
+    budget = budget or Budget.from_options(deadline_s=deadline_s, max_tokens=max_tokens, max_search_calls=max_search_calls)
+    owns_graph = graph is None
+    graph = graph or build_graph(**config_kwargs)
+    state = initial_state(query, config_kwargs.get("report_style", "default"), previous)
+
+    # checkpointed graphs need a thread; one per run
+    configurable = {"thread_id": state["run_id"]} if config_kwargs.get("checkpointer") else {}
+    run_span = None
+    if tracer is not None:
+        run_span = tracer.start_span("research", "run", query=query, run_id=state["run_id"])
+        configurable.update(tracer=tracer, trace_parent=run_span)
+    if budget is not None:
+        configurable["budget"] = budget
+    # page text & chunks are kept out of the state in the run store's blobs, else in a store for this run
+    configurable["blobs"] = run_store.blobs if run_store is not None else BlobStore()
+    config = {"configurable": configurable}
+    if config_kwargs.get("deepen_rounds"):
+        # each deepening round is three more steps (gaps, search, extract)
+        config = {**(config or {}), "recursion_limit": 25 + 3 * config_kwargs["deepen_rounds"]}
+    final_state = state
+    modes = ["updates", "values", "messages"] if tokens else ["updates", "values"]
+    try:
+        for mode, chunk in graph.stream(state, config=config, stream_mode=modes):
+            if mode == "values":
+                final_state = chunk
+                continue
+            if mode == "messages":
+                message, metadata = chunk
+                node = metadata.get("langgraph_node")
+                if node in REPORT_NODES and isinstance(message.content, str) and message.content:
+                    yield {"type": "token", "node": node, "text": message.content}
+                continue
+            for node, update in chunk.items():
+                update = update or {}
+                messages = update.get("messages") or []
+                yield {
+                    "type": "progress",
+                    "node": node,
+                    "status": update.get("status"),
+                    "message": messages[-1]["content"] if messages else None,
+                }
+
+        if budget is not None:
+            final_state = {**final_state, "metrics": {**(final_state.get("metrics") or {}), "budget": budget.summary()}}
+        if run_store is not None:
+            run_store.save(final_state)
+        if use_cache and final_state.get("status") == "complete" and not final_state.get("degradations"):
+            report_cache.put(query, config_kwargs, final_state)
+    except Exception:
+        if run_span is not None:
+            run_span.status = "error"
+        raise
+    finally:
+        if owns_graph:
+            close_graph(graph)
+        if run_span is not None:
+            run_span.set(
+                final_status=final_state.get("status"),
+                sources=len(final_state.get("sources") or []),
+                degradations=len(final_state.get("degradations") or []),
+            )
+            tracer.end_span(run_span)
+    yield {"type": "result", "state": final_state}
+
+
+def _freeze(value: Any) -> Any:
+    # hashable form of a plain config value (dicts / lists of plain values); raises TypeError otherwise
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    raise TypeError(f"Unhashable config value: {value!r}")
+
+
+def config_key(config_kwargs: dict[str, Any]) -> tuple | None:
+    # hashable key for a build config; None if it holds non-plain values (objects, savers, ...)
+    try:
+        return _freeze(config_kwargs)
+    except TypeError:
+        return None
+
+
+def research_key(query: str, config_kwargs: dict[str, Any]) -> tuple | None:
+    # coalescing key: normalized query + plain config values; None if the config can't be keyed
+    key = config_key(config_kwargs)
+    if key is None:
+        return None
+    return (" ".join(query.lower().split()), key)
+
+
+def run_research(
+    query: str,
+    previous: ResearchState | str | None = None,
+    run_store: RunStore | None = None,
+    coalesce: bool = True,
+    report_cache: ReportCache | None = None,
+    **config_kwargs,
+) -> ResearchState:
+    """
+    Convenience function to run research on a query; see stream_research for the arguments
+
+    coalesce: identical concurrent requests (same query & config, no follow-up)
+    share one execution; callers that joined another's run get a copy marked
+    with metrics["coalesced"], saved to their own run_store too
+    """
+    def run() -> ResearchState:
+        events = stream_research(query, previous=previous, run_store=run_store, report_cache=report_cache, **config_kwargs)
+        for event in events:
+            if event["type"] == "result":
+                return event["state"]
+
+    key = research_key(query, config_kwargs) if coalesce and previous is None else None
+    if key is None:
+        return run()
+
+    state, shared = FLIGHTS["research"].do(key, run)
+    if shared:
+        state = copy.deepcopy(state)
+        state["metrics"] = {**state.get("metrics", {}), "coalesced": True}
+        if run_store is not None:
+            run_store.save(state)
+    return state
@@ -0,0 +1,94 @@
+"""
+Bounded cache of compiled research graphs, keyed by build config
+
+the HTTP service and queue workers reuse one compiled graph per config, and
+with it its chat / search clients, page fetcher & thread pools. At most
+max_size graphs are kept: the least recently used one is evicted and closed
+(close_graph) once the runs using it have released it. Run budget options
+apply per run, so they don't key (or reach) the graph; a config that can't
+key the cache gets a graph of its own, closed when its run releases it.
+
+    with graphs.using(config) as graph:
+        for event in stream_research(query, graph=graph, **config): ...
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from .budget import BUDGET_KEYS
+
+MAX_CACHED_GRAPHS = 8
+
+
+class GraphCache:
+    # LRU of compiled graphs with a count of the runs using each
+
+    def __init__(self, factory: Callable[..., Any] | None = None, max_size: int = MAX_CACHED_GRAPHS):
+        self.factory = factory
+        self.max_size = max_size
+        self._graphs: OrderedDict[tuple, Any] = OrderedDict()
+        self._users: dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, config: dict[str, Any]) -> Any:
+        # the graph for config, held until release()
+        from .graph import build_graph, close_graph, config_key
+
+        factory = self.factory or build_graph
+        config = {k: v for k, v in config.items() if k not in BUDGET_KEYS}
+        key = config_key(config)
+        evicted = []
+        with self._lock:
+            if key is None:
+                graph = factory(**config)
+            elif key in self._graphs:
+                graph = self._graphs[key]
+                self._graphs.move_to_end(key)
+            else:
+                graph = self._graphs[key] = factory(**config)
+                while len(self._graphs) > self.max_size:
+                    _, old = self._graphs.popitem(last=False)
+                    if not self._users.get(old):
+                        evicted.append(old)  # else closed by its last release()
+            self._users[graph] = self._users.get(graph, 0) + 1
+        for old in evicted:
+            close_graph(old)
+        return graph
+
+    def release(self, graph: Any) -> None:
+        # a run is done with graph; closed if it is no longer cached & nothing else uses it
+        from .graph import close_graph
+
+        with self._lock:
+            users = self._users.get(graph, 0) - 1
+            if users > 0:
+                self._users[graph] = users
+                return
+            self._users.pop(graph, None)
+            if any(cached is graph for cached in self._graphs.values()):
+                return
+        close_graph(graph)
+
+    @contextmanager
+    def using(self, config: dict[str, Any]) -> Iterator[Any]:
+        graph = self.acquire(config)
+        try:
+            yield graph
+        finally:
+            self.release(graph)
+
+    def close(self) -> None:
+        # evict everything: idle graphs close now, those still running on their release
+        from .graph import close_graph
+
+        with self._lock:
+            graphs, self._graphs = list(self._graphs.values()), OrderedDict()
+            idle = [graph for graph in graphs if not self._users.get(graph)]
+        for graph in idle:
+            close_graph(graph)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._graphs)
@@ -0,0 +1,204 @@
+"""
+Durable research job queue
+
+jobs are leased, not popped: a worker that takes a job holds it for lease_s
+seconds, extends the lease while it runs (heartbeat) and acks it when the
+run is saved. A job whose lease runs out - its worker crashed or hung - is
+handed to the next worker that asks; a failed run is retried with backoff
+until max_attempts, then marked failed. Acks, heartbeats and failures from
+a worker that no longer holds the lease are refused.
+
+JobQueue is the interface workers use (agent.worker); SQLiteJobQueue is the
+file-backed default. Several worker processes can share one queue file; to
+spread them over machines, put it on a filesystem with working file locks or
+plug in another JobQueue backend.
+
+    research worker --enqueue "How do heat pumps work?" --queue .research_jobs.db
+    research worker --queue .research_jobs.db --concurrency 4
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Protocol, TypedDict
+
+from .budget import BUDGET_KEYS
+
+DEFAULT_QUEUE_PATH = ".research_jobs.db"
+JOB_STATUSES = ("queued", "running", "complete", "failed")
+# build_graph options a client may set per request (HTTP service & job queue)
+ALLOWED_CONFIG = {
+    "draft_model", "verify_model", "search_provider", "search_deadline_s", "max_searches", "max_sources",
+    "min_unique_domains", "enable_cove", "speculative_cove", "revision_mode", "report_style", "use_raw_content",
+    "passages_per_source", "passage_token_budget", "min_source_relevance", "deepen_rounds", "hierarchical_notes",
+    "node_models", "router", *BUDGET_KEYS,
+}
+
+
+def check_config(config: dict[str, Any] | None) -> None:
+    # ValueError on a config that isn't a dict, or has keys a request may not set
+    if config is not None and not isinstance(config, dict):
+        raise ValueError("config must be a JSON object")
+    unknown = set(config or {}) - ALLOWED_CONFIG
+    if unknown:
+        raise ValueError(f"Unsupported config keys: {', '.join(sorted(unknown))}")
+
+
+class LeasedJob(TypedDict):
+    # a job handed to a worker
+    id: str
+    query: str
+    config: dict[str, Any]
+    attempts: int  # including this one
+
+
+class JobQueue(Protocol):
+    # durable queue of research jobs with leases, acks & retries
+
+    def put(self, query: str, config: dict[str, Any] | None = None) -> str: ...
+
+    def lease(self, worker_id: str, lease_s: float) -> LeasedJob | None: ...
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_s: float) -> bool: ...
+
+    def ack(self, job_id: str, worker_id: str, run_id: str) -> bool: ...
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool: ...
+
+    def get(self, job_id: str) -> dict[str, Any] | None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class SQLiteJobQueue:
+    """
+    JobQueue in one SQLite file (WAL), safe across threads & processes
+
+    leases are claimed in an immediate transaction, so two workers never
+    hold the same job; a job is tried at most max_attempts times (expired
+    leases count), waiting retry_delay_s * attempts before each retry
+    """
+
+    def __init__(
+            self,
+            path: str | Path | None = None,
+            max_attempts: int = 3,
+            retry_delay_s: float = 5.0,
+    ):
+        self.path = Path(path or os.getenv("RESEARCH_QUEUE", DEFAULT_QUEUE_PATH))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_delay_s = retry_delay_s
+        self._lock = threading.Lock()
+        # autocommit; write transactions are opened explicitly
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, query TEXT NOT NULL, config TEXT NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL,"
+            " worker TEXT, lease_until REAL, available_at REAL NOT NULL,"
+            " run_id TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+
+    def _write(self, sql: str, params: tuple) -> int:
+        # one-statement write; rows changed
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def put(self, query: str, config: dict[str, Any] | None = None) -> str:
+        check_config(config)
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        self._write(
+            "INSERT INTO jobs (id, query, config, status, max_attempts, available_at, created, updated)"
+            " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, query, json.dumps(config or {}), self.max_attempts, now, now, now),
+        )
+        return job_id
+
+    def lease(self, worker_id: str, lease_s: float) -> LeasedJob | None:
+        # oldest ready job (queued, or running with an expired lease), now held by worker_id
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # expired leases that were the last attempt won't be retried
+                self._db.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'lease expired', worker = NULL, updated = ?"
+                    " WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                    (now, now),
+                )
+                row = self._db.execute(
+                    "SELECT id, query, config, attempts FROM jobs"
+                    " WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until < ?)"
+                    " ORDER BY created LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1,"
+                        " updated = ? WHERE id = ?",
+                        (worker_id, now + lease_s, now, row[0]),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return LeasedJob(id=row[0], query=row[1], config=json.loads(row[2]), attempts=row[3] + 1)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_s: float) -> bool:
+        # extend a held lease; False if worker_id no longer holds it
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (now + lease_s, now, job_id, worker_id),
+        ) == 1
+
+    def ack(self, job_id: str, worker_id: str, run_id: str) -> bool:
+        # job done, its result saved as run_id
+        return self._write(
+            "UPDATE jobs SET status = 'complete', run_id = ?, error = NULL, worker = NULL, lease_until = NULL,"
+            " updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (run_id, time.time(), job_id, worker_id),
+        ) == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        # run failed: back in the queue after a backoff, or failed for good past max_attempts
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,"
+            " available_at = ? + ? * attempts, error = ?, worker = NULL, lease_until = NULL, updated = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (now, self.retry_delay_s, error, now, job_id, worker_id),
+        ) == 1
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, query, config, status, attempts, worker, run_id, error, created, updated"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "query", "config", "status", "attempts", "worker", "run_id", "error", "created", "updated")
+        job = dict(zip(keys, row))
+        job["config"] = json.loads(job["config"])
+        return job
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,123 @@
+"""
+Incremental parsing of streamed model output
+
+yields the string items of a top-level array (e.g. "subquestions") as soon as
+each one is complete in a streamed model response, so work can start before
+the rest of the JSON arrives; ParagraphSplitter does the same for paragraphs
+of streamed Markdown
+"""
+
+import json
+import re
+
+# heading that starts a report's reference list
+SOURCES_HEADING_RE = re.compile(r"^\s*(#+\s*|\*\*)?(sources|references)\b", re.IGNORECASE)
+
+
+class StreamingArrayParser:
+    """
+    feed() text pieces of a JSON object; returns strings newly completed inside
+    the array under `key` at the top level. Tolerates leading junk such as a
+    markdown fence because nothing is emitted until the first '{'.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.stack: list[tuple[str, str | None]] = []  # (container type, key it is the value of)
+        self.in_string = False
+        self.escape = False
+        self.buf: list[str] = []
+        self.expect_key = False
+        self.current_key: str | None = None
+
+    def feed(self, text: str) -> list[str]:
+        items: list[str] = []
+        for ch in text:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    self.buf.append(ch)
+                elif ch == "\\":
+                    self.escape = True
+                    self.buf.append(ch)
+                elif ch == '"':
+                    self.in_string = False
+                    self._on_string(json.loads('"' + "".join(self.buf) + '"'), items)
+                else:
+                    self.buf.append(ch)
+                continue
+
+            if ch == '"':
+                if self.stack:
+                    self.in_string = True
+                    self.buf = []
+            elif ch in "{[":
+                parent_key = self.current_key if self.stack and self.stack[-1][0] == "{" else None
+                self.stack.append((ch, parent_key))
+                self.expect_key = ch == "{"
+                self.current_key = None
+            elif ch in "}]":
+                if self.stack:
+                    self.stack.pop()
+                self.expect_key = False
+            elif ch == ":":
+                self.expect_key = False
+            elif ch == ",":
+                if self.stack and self.stack[-1][0] == "{":
+                    self.expect_key = True
+                    self.current_key = None
+        return items
+
+    def _on_string(self, value: str, items: list[str]) -> None:
+        container, parent_key = self.stack[-1]
+        if container == "{":
+            if self.expect_key:
+                self.current_key = value
+        elif len(self.stack) == 2 and parent_key == self.key:
+            items.append(value)
+
+
+class ParagraphSplitter:
+    """
+    feed() text pieces of streamed Markdown; returns spans of completed
+    paragraphs (blank-line separated) once they reach min_chars, headings
+    dropped. Everything from a Sources / References heading on is ignored.
+    close() returns what is left.
+    """
+
+    def __init__(self, min_chars: int = 0):
+        self.min_chars = min_chars
+        self.buf = ""
+        self.span: list[str] = []
+        self.done = False
+
+    def _take(self, paragraph: str) -> list[str]:
+        paragraph = paragraph.strip()
+        if not paragraph or self.done:
+            return []
+        if SOURCES_HEADING_RE.match(paragraph):
+            self.done = True
+            return []
+        body = "\n".join(line for line in paragraph.splitlines() if not line.lstrip().startswith("#")).strip()
+        if body:
+            self.span.append(body)
+        if sum(len(p) for p in self.span) >= self.min_chars and self.span:
+            spans, self.span = ["\n\n".join(self.span)], []
+            return spans
+        return []
+
+    def feed(self, text: str) -> list[str]:
+        self.buf += text
+        spans: list[str] = []
+        while "\n\n" in self.buf:
+            paragraph, self.buf = self.buf.split("\n\n", 1)
+            spans += self._take(paragraph)
+        return spans
+
+    def close(self) -> list[str]:
+        spans = self._take(self.buf)
+        self.buf = ""
+        if self.span:
+            spans.append("\n\n".join(self.span))
+            self.span = []
+        return spans
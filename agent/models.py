@@ -0,0 +1,128 @@
+"""
+Chat model construction & per-node model routing
+
+each LLM-calling node has its own model (defaults: the draft model, the
+verify model for CoVe compile); a ModelRouter can additionally send small
+prompts to a faster model. Provider SDKs are imported when a model is first
+built, not when the package is imported.
+
+model config files (JSON, or TOML on Python 3.11+):
+
+    [models]
+    extractor = "gpt-4o-mini"
+
+    [router]
+    fast_model = "gpt-4o-mini"
+    small_tokens = 1500
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+# LLM-calling roles, each with a configurable model
+NODE_ROLES = ("planner", "extractor", "digester", "writer", "cove_compiler", "reviser")
+
+
+def chat_model(model: str, **kwargs) -> Any:
+    # chat client for `model` (OpenAI via langchain_openai); streamed calls report token usage too
+    from langchain_openai import ChatOpenAI
+
+    kwargs.setdefault("stream_usage", True)
+    return ChatOpenAI(model=model, **kwargs)
+
+
+def node_model_map(draft_model: str, verify_model: str, overrides: dict[str, str] | None = None) -> dict[str, str]:
+    # model per role: draft model everywhere but CoVe compile, then explicit overrides
+    unknown = set(overrides or {}) - set(NODE_ROLES)
+    if unknown:
+        raise ValueError(f"Unknown node(s) {', '.join(sorted(unknown))}; expected one of {', '.join(NODE_ROLES)}")
+    models = {role: draft_model for role in NODE_ROLES}
+    models["cove_compiler"] = verify_model
+    models.update(overrides or {})
+    return models
+
+
+def parse_node_models(items: list[str] | None) -> dict[str, str]:
+    # CLI "node=model" pairs -> {node: model}
+    models = {}
+    for item in items or []:
+        node, sep, model = item.partition("=")
+        if not sep or not node.strip() or not model.strip():
+            raise ValueError(f"Expected NODE=MODEL, got {item!r}")
+        models[node.strip()] = model.strip()
+    return models
+
+
+def load_model_config(path: str | Path) -> dict[str, Any]:
+    # model config file -> {"node_models": {...}, "router": {...} | None}
+    path = Path(path)
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # pragma: no cover - Python 3.10
+            raise ValueError("TOML model configs need Python 3.11+; use JSON")
+        data = tomllib.loads(path.read_text())
+    else:
+        data = json.loads(path.read_text())
+    return {"node_models": dict(data.get("models") or {}), "router": data.get("router")}
+
+
+class ModelRouter:
+    """
+    sends small or simple inputs of the routed nodes to a faster model
+
+    a call goes to fast_model when its prompt is at most small_tokens, or -
+    with latency_budget_s set - when the node's own model has been averaging
+    slower than the budget, fast_model is quicker and the prompt fits
+    max_fast_tokens. Latencies are an EWMA per model of observed calls.
+    """
+
+    def __init__(
+            self,
+            fast_model: str = "gpt-4o-mini",
+            small_tokens: int = 1500,
+            max_fast_tokens: int = 8000,
+            latency_budget_s: float | None = None,
+            nodes: tuple[str, ...] | list[str] = ("extractor", "cove_compiler"),
+            alpha: float = 0.3,
+    ):
+        unknown = set(nodes) - set(NODE_ROLES)
+        if unknown:
+            raise ValueError(f"Unknown node(s) {', '.join(sorted(unknown))}; expected one of {', '.join(NODE_ROLES)}")
+        self.fast_model = fast_model
+        self.small_tokens = small_tokens
+        self.max_fast_tokens = max_fast_tokens
+        self.latency_budget_s = latency_budget_s
+        self.nodes = set(nodes)
+        self.alpha = alpha
+        self.latency: dict[str, float] = {}
+        self.routed = 0
+        self._lock = threading.Lock()
+
+    def choose(self, node: str, model: str, input_tokens: int) -> str:
+        # model to call for `node`, whose configured model is `model`
+        if node not in self.nodes or model == self.fast_model or input_tokens > self.max_fast_tokens:
+            return model
+        with self._lock:
+            slow = self.latency.get(model)
+            fast = self.latency.get(self.fast_model)
+            use_fast = input_tokens <= self.small_tokens or (
+                self.latency_budget_s is not None
+                and slow is not None
+                and slow > self.latency_budget_s
+                and (fast is None or fast < slow)
+            )
+            if use_fast:
+                self.routed += 1
+        return self.fast_model if use_fast else model
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            prev = self.latency.get(model)
+            self.latency[model] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"routed": self.routed, "latency_s": dict(self.latency)}
@@ -0,0 +1,110 @@
+"""
+Persistent per-source note store
+
+extracted notes are cached in SQLite, keyed by canonical URL + content hash +
+query-intent bucket, so the same page seen across queries is extracted once
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .state import Note
+from .search import canonical_url
+
+# coarse intent buckets; notes extracted for one intent are reused for others in the same bucket
+INTENT_PATTERNS = [
+    ("comparison", re.compile(r"\b(vs\.?|versus|compare|comparison|difference|pros and cons)\b")),
+    ("howto", re.compile(r"\b(how (to|do|can)|steps|guide|implement\w*)\b")),
+    ("trend", re.compile(r"\b(latest|recent|trends?|future|state of|developments?|20\d\d)\b")),
+    ("causal", re.compile(r"\b(why|causes?|impacts?|effects?)\b")),
+    ("definition", re.compile(r"\b(what (is|are)|define|definition|explain|overview)\b")),
+]
+
+
+def intent_bucket(query: str) -> str:
+    query = query.lower()
+    for bucket, pattern in INTENT_PATTERNS:
+        if pattern.search(query):
+            return bucket
+    return "general"
+
+
+def content_hash(content: str) -> str:
+    normalized = " ".join(content.split()).lower()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+class NoteStore:
+    # SQLite-backed note cache with TTL and LRU size eviction
+
+    def __init__(
+            self,
+            path: str | Path,
+            ttl_s: float = 7 * 24 * 3600,
+            max_entries: int = 10_000,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            " key TEXT PRIMARY KEY, note TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(url: str, content: str, query: str) -> str:
+        raw = f"{canonical_url(url)}|{content_hash(content)}|{intent_bucket(query)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, url: str, content: str, query: str) -> Note | None:
+        # cached note for this source, or None if missing / expired
+        key = self.key(url, content, query)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT note, created FROM notes WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_s:
+                self._db.execute("DELETE FROM notes WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE notes SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        note = json.loads(row[0])
+        # same page may be reached through a different (non-canonical) URL
+        return Note(**{**note, "source_url": url})
+
+    def put(self, url: str, content: str, query: str, note: Note) -> None:
+        key = self.key(url, content, query)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO notes (key, note, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(note), now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        # drop expired entries, then least recently used ones past max_entries
+        self._db.execute("DELETE FROM notes WHERE created < ?", (now - self.ttl_s,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM notes").fetchone()
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM notes WHERE key IN (SELECT key FROM notes ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
@@ -0,0 +1,67 @@
+"""
+Patch-based report revision
+
+the CoVe reviser can return edits (anchor text from the draft + its
+replacement) instead of the whole revised report; they are applied here to
+the draft, and the verification checklist is built locally from the
+verification results, so revision output is only as long as the changes
+"""
+
+import re
+from typing import Any
+
+from .state import VerificationClaim
+
+# a line left with nothing but a list marker once its text was removed
+EMPTY_ITEM_RE = re.compile(r"^[ \t]*(?:[-*+]|\d+[.)])?[ \t]*$")
+EVIDENCE_CHARS = 160
+
+
+def _find(text: str, anchor: str) -> tuple[int, int] | None:
+    # (start, end) of the one place anchor occurs, allowing whitespace differences; None if absent or ambiguous
+    if text.count(anchor) == 1:
+        start = text.index(anchor)
+        return start, start + len(anchor)
+    words = anchor.split()
+    if not words:
+        return None
+    matches = list(re.finditer(r"\s+".join(map(re.escape, words)), text))
+    return (matches[0].start(), matches[0].end()) if len(matches) == 1 else None
+
+
+def apply_edits(draft: str, edits: list[dict[str, Any]]) -> tuple[str, list[dict[str, Any]]]:
+    """
+    apply {"anchor", "replacement"} edits to a draft in order
+
+    each anchor must occur exactly once (whitespace may differ); an empty
+    replacement removes the anchor, and the list item / line it leaves
+    empty. Returns (patched text, edits whose anchor didn't match)
+    """
+    text = draft
+    unmatched = []
+    for edit in edits:
+        found = _find(text, str(edit.get("anchor") or ""))
+        if found is None:
+            unmatched.append(edit)
+            continue
+        start, end = found
+        replacement = str(edit.get("replacement") or "")
+        text = text[:start] + replacement + text[end:]
+        if not replacement:
+            line_start = text.rfind("\n", 0, start) + 1
+            line_end = text.find("\n", start)
+            line_end = len(text) if line_end == -1 else line_end + 1
+            if EMPTY_ITEM_RE.match(text[line_start:line_end].rstrip("\n")) and text[line_start:line_end].strip():
+                text = text[:line_start] + text[line_end:]
+    return text, unmatched
+
+
+def verification_checklist(results: list[VerificationClaim]) -> str:
+    # "Verification Checklist" section: each claim, its status and the first evidence snippet
+    lines = ["**Verification Checklist**"]
+    for claim in results:
+        evidence = (claim.get("evidence") or [""])[0].strip()
+        if len(evidence) > EVIDENCE_CHARS:
+            evidence = evidence[:EVIDENCE_CHARS].rsplit(" ", 1)[0] + "..."
+        lines.append(f"- {claim['claim']} - {claim.get('status') or 'pending'}: {evidence or 'no evidence found'}")
+    return "\n".join(lines)
@@ -2,6 +2,11 @@
 Prompt templates for the Deep Research Agent.
 
 All prompts are kept here for easy iteration and testing.
+
+Layout: stable text first, per-call content last, so calls within a run
+share a long leading prefix that providers can serve from their prompt
+cache - instructions, then the query, then (for writer & reviser) the same
+notes block, and only then the source / draft / style that varies.
 """
 
 REPORT_STYLE_HEADERS = {
@@ -53,6 +58,17 @@ PLANNER_USER = """Research query: {query}
 
 Generate subquestions and a report outline."""
 
+PLANNER_FOLLOWUP_USER = """Research query: {query}
+
+Generate only the NEW subquestions (0-4) needed to cover gaps the earlier research
+does not answer, plus a report outline for the follow-up query. An empty
+subquestions list is fine if the earlier research already covers it.
+
+This is a follow-up to earlier research on: {previous_queries}
+
+Subquestions already researched (do NOT repeat these):
+{researched}"""
+
 
 EXTRACTOR_SYSTEM = """You are a research assistant extracting factual information from a source.
 
@@ -77,25 +93,45 @@ Return VALID JSON ONLY (no markdown, no commentary). Use exactly these keys:
 
 EXTRACTOR_USER = """Research query: {query}
 
+Extract factual notes from the source below.
+
 Source URL: {url}
 Source title: {title}
 Source content:
-{content}
+{content}"""
 
-Extract factual notes from this source."""
 
+# hierarchical aggregation: one cluster of notes condensed before the writer sees it
+DIGEST_SYSTEM = """You condense research notes for a report writer. The writer will see only
+your digest, not the notes, so keep everything a report on the query would use.
+
+Rules:
+- Keep every distinct fact, number, date and named entity; merge facts repeated across sources
+- Keep the citation numbers: every bullet ends with the [n] of each source it came from
+- Keep short quotes that are worth citing verbatim
+- Note where sources disagree, citing both sides
+- Drop material that is off-topic for the query
+- Output plain markdown bullets only, no heading or commentary"""
 
-WRITER_SYSTEM = """You are a research report writer. Given research notes from multiple sources,
-write a well-structured, source-grounded report.
+DIGEST_USER = """Research query: {query}
+Subquestion: {topic}
 
-{style_header}
+Condense these notes into at most {max_bullets} bullets.
+
+Notes:
+{notes}"""
+
+
+# writer & reviser share REPORT_SYSTEM + REPORT_CONTEXT as their leading messages
+REPORT_SYSTEM = """You are a research report writer and editor. You work from research notes
+gathered from multiple sources and produce well-structured, source-grounded reports.
 
 Important:
-- If the style_header conflicts with the base structure below, follow the style_header.
 - Do NOT invent sources or citations. Only cite from the provided sources list.
 - Every non-trivial factual claim should have an inline citation [1], [2], etc.
 - If you cannot cite a claim from the sources list, either omit it or clearly label it as an inference/uncertainty.
 - Prefer higher-quality sources when available; if you cite low-quality sources, note that in uncertainty/limitations.
+- If the style instructions given with the task conflict with the base structure below, follow the style instructions.
 
 Base report structure:
 1. **Title**
@@ -108,7 +144,7 @@ Base report structure:
 
 Use [1], [2], ... for inline citations."""
 
-WRITER_USER = """Research query: {query}
+REPORT_CONTEXT = """Research query: {query}
 
 Outline to follow:
 {outline}
@@ -117,7 +153,9 @@ Research notes by source:
 {notes}
 
 Sources list:
-{sources}
+{sources}"""
+
+WRITER_USER = """{style_header}
 
 Write the research report."""
 
@@ -151,14 +189,21 @@ Return VALID JSON ONLY (no markdown, no commentary). Use exactly these keys:
 
 COVE_COMPILER_USER = """Research query: {query}
 
+Identify claims to verify in the draft report below.
+
 Draft report:
-{draft}
+{draft}"""
+
+# speculative CoVe: a span of a draft that is still being written
+COVE_COMPILER_EXCERPT_USER = """Research query: {query}
 
-Identify claims to verify."""
+Identify claims to verify in the excerpt below, taken from a draft report that is still being written. Consider only claims stated in the excerpt.
 
+Draft excerpt:
+{draft}"""
 
-COVE_REVISER_SYSTEM = """You are a research report editor. Given a draft report and verification results,
-produce a final revised report.
+
+COVE_REVISER_USER = """Revise the draft report below into a final report using the verification results.
 
 Your tasks:
 1. Correct claims that verification showed to be wrong (and update citations if needed)
@@ -174,9 +219,32 @@ Rules:
 - Do not introduce new uncited claims
 - If a claim cannot be verified, explicitly mark it as uncertain/insufficient
 
-Keep the original structure but improve accuracy based on verification."""
+Keep the original structure but improve accuracy based on verification.
+
+Draft report:
+{draft}
+
+Verification results:
+{verification_results}
+
+Produce the final revised report with verification checklist."""
 
-COVE_REVISER_USER = """Original query: {query}
+# patch revision: edits to the draft instead of the whole report (see agent.patch)
+COVE_PATCH_USER = """Revise the draft report below using the verification results, returning only the edits to make.
+
+Your tasks:
+1. Correct claims that verification showed to be wrong (and update citations if needed)
+2. Add nuance where verification showed mixed results
+3. Downgrade language (e.g., 'may', 'suggests') when evidence is insufficient, or remove a claim that cannot stand
+
+Each edit replaces one passage of the draft:
+- "anchor": text copied exactly from the draft, long enough to occur only once (a sentence or bullet)
+- "replacement": the revised text ("" removes the anchor)
+
+Rules:
+- Edit only what the verification results call for; leave everything else untouched
+- Keep the citation numbering scheme; do not introduce new uncited claims
+- Do not write a verification checklist; it is added automatically
 
 Draft report:
 {draft}
@@ -184,4 +252,5 @@ Draft report:
 Verification results:
 {verification_results}
 
-Produce the final revised report with verification checklist."""
\ No newline at end of file
+Return VALID JSON ONLY (no markdown, no commentary): {{"edits": [{{"anchor": "...", "replacement": "..."}}]}}
+Return {{"edits": []}} if nothing needs to change."""
@@ -0,0 +1,55 @@
+"""
+Report quality checks
+
+the structural checks of tests/test_eval_quality.py as functions over a
+finished run's state, so they can score runs outside the test suite
+(e.g. the autotuner in agent.tune)
+"""
+
+import re
+from typing import Any
+
+CITATION_RE = re.compile(r"\[\d+\]")
+# a run passes when it has each of these
+MIN_CITATIONS = 1
+MIN_SOURCES = 2
+
+
+def has_required_sections(report: str | None) -> bool:
+    # a TL;DR / summary and a sources section
+    report_lower = (report or "").lower()
+    return ("tl;dr" in report_lower or "summary" in report_lower) and "source" in report_lower
+
+
+def citation_count(report: str | None) -> int:
+    # citation markers like [1], [2]
+    return len(CITATION_RE.findall(report or ""))
+
+
+def quality_checks(state: dict[str, Any]) -> dict[str, Any]:
+    """
+    structural quality of a finished run
+
+    returns the raw measures (sections, citations, sources) and score: the
+    share of checks passed - sections present, >= MIN_CITATIONS citations,
+    >= MIN_SOURCES sources and, when CoVe ran, every claim given a status
+    """
+    report = state.get("report") or state.get("report_draft")
+    sources = len(state.get("sources") or [])
+    citations = citation_count(report)
+    checks = [
+        has_required_sections(report),
+        citations >= MIN_CITATIONS,
+        sources >= MIN_SOURCES,
+    ]
+    verification = state.get("verification_results")
+    if verification is not None:
+        checks.append(all(c.get("status") in ("confirmed", "mixed", "insufficient", "pending") for c in verification))
+    return {
+        "sections": checks[0],
+        "citations": citations,
+        "sources": sources,
+        "passed": sum(checks),
+        "checks": len(checks),
+        "score": sum(checks) / len(checks),
+    }
@@ -0,0 +1,112 @@
+"""
+Local passage ranking
+
+BM25 over source chunks, scored against the query & its subquestions with
+NumPy, so extraction sees the most relevant passages of a long source under
+a token budget instead of its first 500 chars
+"""
+
+import re
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the "
+    "this to was were what when where which who why will with do does did can".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars per token; good enough for budgeting without a tokenizer
+    return len(text) // 4 + 1
+
+
+def bm25_scores(
+        passages: list[str],
+        queries: list[str],
+        k1: float = 1.5,
+        b: float = 0.75,
+) -> np.ndarray:
+    """
+    BM25 score of every passage against every query -> (n_passages, n_queries)
+    only query terms are counted, so the term matrix stays n_passages x n_query_terms
+    """
+    query_tokens = [tokenize(q) for q in queries]
+    vocab = {t: i for i, t in enumerate(dict.fromkeys(t for toks in query_tokens for t in toks))}
+    if not passages or not vocab:
+        return np.zeros((len(passages), len(queries)))
+
+    tf = np.zeros((len(passages), len(vocab)), dtype=np.float32)
+    lengths = np.empty(len(passages), dtype=np.float32)
+    for row, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[row] = len(tokens)
+        for token in tokens:
+            col = vocab.get(token)
+            if col is not None:
+                tf[row, col] += 1
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+    weights = tf * (k1 + 1) / (tf + norm[:, None]) * idf
+
+    query_matrix = np.zeros((len(vocab), len(queries)), dtype=np.float32)
+    for col, tokens in enumerate(query_tokens):
+        for token in set(tokens):
+            query_matrix[vocab[token], col] = 1.0
+    return weights @ query_matrix
+
+
+def relevance_scores(passages: list[str], query: str, subquestions: list[str] | None = None) -> np.ndarray:
+    # main-query score plus the best subquestion score, per passage
+    scores = bm25_scores(passages, [query, *(subquestions or [])])
+    if scores.shape[1] == 1:
+        return scores[:, 0]
+    return scores[:, 0] + scores[:, 1:].max(axis=1)
+
+
+def select_passages(
+        chunks_by_url: dict[str, list[str]],
+        query: str,
+        subquestions: list[str] | None = None,
+        k: int = 4,
+        token_budget: int = 1000,
+) -> dict[str, str]:
+    """
+    top-k passages per source under a token budget, joined in document order
+
+    all chunks are scored in one pass so IDF reflects the whole candidate set
+    """
+    flat = [(url, i, chunk) for url, chunks in chunks_by_url.items() for i, chunk in enumerate(chunks)]
+    if not flat:
+        return {}
+    scores = relevance_scores([chunk for _, _, chunk in flat], query, subquestions)
+
+    selected: dict[str, list[tuple[int, str]]] = {url: [] for url in chunks_by_url}
+    used: dict[str, int] = {url: 0 for url in chunks_by_url}
+    # highest score first; ties keep document order
+    for idx in np.lexsort((np.arange(len(flat)), -scores)):
+        url, position, chunk = flat[idx]
+        picked = selected[url]
+        if len(picked) >= k:
+            continue
+        cost = estimate_tokens(chunk)
+        if picked and used[url] + cost > token_budget:
+            continue
+        if not picked and cost > token_budget:
+            chunk = chunk[:token_budget * 4]
+            cost = token_budget
+        picked.append((position, chunk))
+        used[url] += cost
+
+    return {
+        url: "\n\n".join(chunk for _, chunk in sorted(picked))
+        for url, picked in selected.items()
+        if picked
+    }
@@ -0,0 +1,233 @@
+"""
+Report cache with near-duplicate query lookup
+
+finished runs are cached in SQLite keyed by the config values that shape the
+report (style, CoVe, models & routing, source / search limits, search backend)
+and indexed by a hashing vector of the normalized query's character n-grams
+and words (plurals and question words folded away). A new query is matched
+against fresh entries of the same config with the same numbers (years,
+versions, model numbers) by cosine similarity, so recent near-paraphrases are
+answered from the cache in milliseconds; hits come back as runs with a run ID
+of their own, marked with metrics["served_from_cache"].
+
+    research "..." --report-cache .research_cache.db --cache-threshold 0.85 --cache-ttl 86400
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .runs import new_run_id
+from .serialize import dumps_state, loads_state
+from .state import ResearchState
+
+# run config that changes the report, with the build_graph defaults a missing key stands for
+CACHE_CONFIG_DEFAULTS: dict[str, Any] = {
+    "report_style": "default",
+    "enable_cove": True,
+    "revision_mode": "rewrite",
+    "deepen_rounds": 0,
+    "hierarchical_notes": False,
+    "speculative_cove": False,
+    "max_sources": 8,
+    "max_searches": 6,
+    "draft_model": "gpt-4o",
+    "verify_model": "gpt-4o-mini",
+    "node_models": None,
+    "model_config": None,
+    "router": None,
+    "search_provider": "tavily",
+    "local_index": None,
+}
+# words that don't change what a query asks for
+STOPWORDS = frozenset(
+    "a an the is are was were be of for in on to and or with between what whats how does do did can could "
+    "please tell me about explain give overview compare comparison vs versus".split()
+)
+NGRAM_SIZES = (3, 4)
+# weight of a whole-word feature relative to one character n-gram (a different entity word outweighs shared n-grams)
+WORD_WEIGHT = 3.0
+# words with a digit: years, versions, model numbers ("2024", "3.12", "h100")
+NUMBER_RE = re.compile(r"[a-z0-9]*\d[a-z0-9]*(?:\.\d+)*")
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def normalize_query(query: str) -> str:
+    # lowercase content words, plurals folded
+    words = re.findall(r"[a-z0-9]+", query.lower().replace("'", ""))
+    return " ".join(_stem(w) for w in words if w not in STOPWORDS) or " ".join(words)
+
+
+def query_numbers(query: str) -> frozenset[str]:
+    # numeric / version tokens of a query; queries differing in them never share a report
+    return frozenset(NUMBER_RE.findall(query.lower()))
+
+
+def query_vector(query: str, dim: int = 1024) -> np.ndarray:
+    # L2-normalized signed hashing vector of the normalized query's character n-grams & words
+    normalized = normalize_query(query)
+    text = f" {normalized} "
+    vector = np.zeros(dim, dtype=np.float32)
+    features = [(text[i:i + n], 1.0) for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+    features += [(f"w:{word}", WORD_WEIGHT) for word in normalized.split()]
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode())
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def cache_config(config: dict[str, Any]) -> str:
+    # key of the report-shaping config values (defaults filled in)
+    values = {k: config.get(k, default) for k, default in CACHE_CONFIG_DEFAULTS.items()}
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class ReportCache:
+    """
+    SQLite-backed cache of finished runs with an in-memory vector index
+
+    get() returns the stored state of the most similar fresh query (cosine >=
+    threshold) under the same config and with the same numbers; entries older than ttl_s are ignored
+    and evicted, and the oldest go past max_entries
+    """
+
+    def __init__(
+            self,
+            path: str | Path,
+            threshold: float = 0.85,
+            ttl_s: float = 24 * 3600,
+            max_entries: int = 5000,
+            dim: int = 1024,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, config TEXT NOT NULL, query TEXT NOT NULL,"
+            " vector BLOB NOT NULL, state BLOB NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.commit()
+        self._load()
+
+    def _load(self) -> None:
+        # vector index of every live entry: row ids, config keys, created times, one vector per row
+        self._evict(time.time())
+        self._db.commit()
+        rows = self._db.execute("SELECT id, config, created, vector, query FROM reports ORDER BY id").fetchall()
+        if any(len(r[3]) != self.dim * 4 for r in rows):  # indexed with another dim: start over
+            self._db.execute("DELETE FROM reports")
+            self._db.commit()
+            rows = []
+        self._ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self._configs = np.array([r[1] for r in rows], dtype=object)
+        self._created = np.array([r[2] for r in rows], dtype=np.float64)
+        self._numbers = np.array([query_numbers(r[4]) for r in rows], dtype=object)
+        self._vectors = np.stack([np.frombuffer(r[3], dtype=np.float32) for r in rows]) if rows else np.zeros((0, self.dim), np.float32)
+
+    def lookup(self, query: str, config: dict[str, Any]) -> tuple[int, float] | None:
+        # (entry id, similarity) of the best fresh match, or None
+        key = cache_config(config)
+        vector = query_vector(query, self.dim)
+        numbers = query_numbers(query)
+        with self._lock:
+            if not len(self._ids):
+                return None
+            live = (self._configs == key) & (self._created >= time.time() - self.ttl_s)
+            live &= np.array([n == numbers for n in self._numbers], dtype=bool)
+            if not live.any():
+                return None
+            candidates = np.flatnonzero(live)
+            similarity = self._vectors[candidates] @ vector
+            best = int(np.argmax(similarity))
+            if similarity[best] < self.threshold:
+                return None
+            return int(self._ids[candidates[best]]), float(similarity[best])
+
+    def get(self, query: str, config: dict[str, Any]) -> ResearchState | None:
+        # cached state for a near-duplicate query under a new run ID, marked with metrics["served_from_cache"]
+        match = self.lookup(query, config)
+        if match is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        entry_id, similarity = match
+        with self._lock:
+            row = self._db.execute("SELECT query, state, created FROM reports WHERE id = ?", (entry_id,)).fetchone()
+            if row is None:  # evicted meanwhile
+                self.misses += 1
+                return None
+            self.hits += 1
+        state = loads_state(row[1])
+        # a new run, so saving it doesn't overwrite the run it was cached from
+        source_run_id, state["run_id"] = state.get("run_id"), new_run_id()
+        state["metrics"] = {
+            **(state.get("metrics") or {}),
+            "served_from_cache": {
+                "run_id": source_run_id,
+                "query": row[0],
+                "similarity": round(similarity, 4),
+                "age_s": round(time.time() - row[2], 1),
+            },
+        }
+        return state
+
+    def put(self, query: str, config: dict[str, Any], state: ResearchState) -> None:
+        now = time.time()
+        vector = query_vector(query, self.dim)
+        key = cache_config(config)
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO reports (config, query, vector, state, created) VALUES (?, ?, ?, ?, ?)",
+                (key, query, vector.tobytes(), dumps_state(state), now),
+            )
+            self._ids = np.append(self._ids, cursor.lastrowid)
+            self._configs = np.append(self._configs, np.array([key], dtype=object))
+            self._created = np.append(self._created, now)
+            self._numbers = np.append(self._numbers, np.array([query_numbers(query)], dtype=object))
+            self._vectors = np.vstack([self._vectors, vector[None, :]])
+            if self._evict(now):
+                self._db.commit()
+                kept = np.isin(self._ids, [r[0] for r in self._db.execute("SELECT id FROM reports")])
+                self._ids, self._configs, self._created, self._numbers, self._vectors = (
+                    self._ids[kept], self._configs[kept], self._created[kept], self._numbers[kept], self._vectors[kept],
+                )
+            self._db.commit()
+
+    def _evict(self, now: float) -> int:
+        # drop expired entries, then the oldest past max_entries; returns rows removed
+        removed = self._db.execute("DELETE FROM reports WHERE created < ?", (now - self.ttl_s,)).rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM reports").fetchone()
+        if count > self.max_entries:
+            removed += self._db.execute(
+                "DELETE FROM reports WHERE id IN (SELECT id FROM reports ORDER BY created ASC LIMIT ?)",
+                (count - self.max_entries,),
+            ).rowcount
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._ids), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
@@ -0,0 +1,44 @@
+"""
+On-disk store for finished research runs
+
+lets a follow-up query pick up a previous run's sources / notes by run ID;
+runs are packed compactly with heavy fields in a shared blob directory
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+from .blobs import BlobStore
+from .serialize import dumps_state, loads_state
+from .state import ResearchState
+
+DEFAULT_RUN_DIR = ".research_runs"
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class RunStore:
+    # one packed file per run, named by run ID; blobs shared across runs
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root or os.getenv("RESEARCH_RUN_DIR", DEFAULT_RUN_DIR))
+        self.blobs = BlobStore(self.root / "blobs")
+
+    def path_for(self, run_id: str) -> Path:
+        return self.root / f"{run_id}.bin"
+
+    def save(self, state: ResearchState) -> str:
+        # persist a finished state & return its run ID
+        run_id = state.get("run_id") or new_run_id()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path_for(run_id).write_bytes(dumps_state({**state, "run_id": run_id}, self.blobs))
+        return run_id
+
+    def load(self, run_id: str) -> ResearchState:
+        path = self.path_for(run_id)
+        if not path.exists():
+            raise KeyError(f"Unknown run ID: {run_id}")
+        return loads_state(path.read_bytes(), self.blobs)
@@ -1,14 +1,22 @@
 """
 Web Search Functionality
 
-Tavily with stub fallback
+Tavily with stub fallback; several backends can be federated ("tavily+stub")
 
 """
 
+import contextvars
+import logging
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Protocol, runtime_checkable
 
 from .state import SearchResult
+from .tracing import span
+
+logger = logging.getLogger(__name__)
 
 @runtime_checkable
 class SearchProvider(Protocol):
@@ -18,7 +26,8 @@ class SearchProvider(Protocol):
 class TavilySearch:
     # tavily search provider
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, include_raw_content: bool = False):
+        self.include_raw_content = include_raw_content
         self.api_key = api_key or os.getenv("TAVILY_API_KEY")
         if not self.api_key:
             raise ValueError("TAVILY_API_KEY required")
@@ -32,7 +41,7 @@ class TavilySearch:
         response = self.client.search(
             query=query,
             max_results=max_results,
-            include_raw_content=False,
+            include_raw_content=self.include_raw_content,
         )
         # print(f"Response: {response}")
         return response.get("results") or []
@@ -54,24 +63,213 @@ class StubSearch:
             for i in range(1, min(max_results + 1, 4))
         ]
     
-def get_search_provider(provider: str = "tavily") -> SearchProvider:
-    # pull search provider
+class FederatedSearch:
+    """
+    queries several backends concurrently & merges their results
+
+    returns once min_results unique results (by canonical URL) have arrived,
+    every queried backend has answered, or deadline_s has passed - whichever
+    comes first (if nothing has arrived by the deadline, the first backend to
+    answer is awaited). Backends that answer late still finish in the
+    background so their latency is measured. Per-backend latency is an EWMA;
+    merged results are ordered fastest backend first, and a backend averaging
+    slower than the deadline is only queried every probe_every-th search
+    (to keep its estimate fresh) while a faster one is available.
+
+    a failing backend is logged & left out of the merge; a search raises when
+    every backend queried fails. close() shuts down the backend thread pool
+    """
+
+    def __init__(
+            self,
+            backends: dict[str, SearchProvider],
+            deadline_s: float = 3.0,
+            min_results: int | None = None,
+            probe_every: int = 5,
+            alpha: float = 0.3,
+    ):
+        if not backends:
+            raise ValueError("FederatedSearch needs at least one backend")
+        self.backends = dict(backends)
+        self.deadline_s = deadline_s
+        self.min_results = min_results
+        self.probe_every = probe_every
+        self.alpha = alpha
+        self.pool = ThreadPoolExecutor(max_workers=4 * len(backends), thread_name_prefix="federated")
+        self._lock = threading.Lock()
+        self._stats = {name: {"latency_s": None, "calls": 0, "errors": 0, "late": 0, "skipped": 0} for name in backends}
+        self._searches = 0
+
+    def _observe(self, name: str, seconds: float, error: bool) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            prev = stats["latency_s"]
+            stats["latency_s"] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+            stats["calls"] += 1
+            stats["errors"] += error
+
+    def _call(self, name: str, query: str, max_results: int) -> list[dict]:
+        start = time.perf_counter()
+        try:
+            with span("backend", "search", backend=name, query=query) as current:
+                results = self.backends[name].search(query, max_results=max_results) or []
+                current.set(results=len(results))
+        except Exception as e:
+            self._observe(name, time.perf_counter() - start, error=True)
+            logger.warning("search backend %s failed for %r: %s: %s", name, query, type(e).__name__, e)
+            raise
+        self._observe(name, time.perf_counter() - start, error=False)
+        return results
+
+    def ranked(self) -> list[str]:
+        # backends fastest first; unmeasured ones count as fastest so they get measured
+        with self._lock:
+            latency = {name: stats["latency_s"] for name, stats in self._stats.items()}
+        return sorted(self.backends, key=lambda name: latency[name] or 0.0)
+
+    def _select(self) -> list[str]:
+        # backends to query: all but slow ones, which are probed every probe_every-th search
+        ranked = self.ranked()
+        with self._lock:
+            self._searches += 1
+            probe = self._searches % self.probe_every == 0
+            selected = []
+            for name in ranked:
+                latency = self._stats[name]["latency_s"]
+                if selected and not probe and latency is not None and latency > self.deadline_s:
+                    self._stats[name]["skipped"] += 1
+                    continue
+                selected.append(name)
+        return selected
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        names = self._select()
+        deadline = time.perf_counter() + self.deadline_s
+        needed = self.min_results or max_results
+        futures = {
+            self.pool.submit(contextvars.copy_context().run, self._call, name, query, max_results): name
+            for name in names
+        }
+        answered: dict[str, list[dict]] = {}
+        errors: dict[str, BaseException] = {}
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 and answered:
+                break
+            # past the deadline with nothing usable: block for the next backend to answer
+            done, pending = wait(pending, timeout=remaining if remaining > 0 else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    answered[futures[future]] = future.result()
+                else:
+                    errors[futures[future]] = future.exception()
+            if len(self._merge(names, answered, max_results)) >= needed:
+                break
+
+        if not answered:
+            # only reached once every queried backend has failed
+            failures = "; ".join(f"{name}: {type(e).__name__}: {e}" for name, e in errors.items())
+            raise RuntimeError(f"All search backends failed ({failures})") from next(iter(errors.values()))
+        with self._lock:
+            for future in pending:
+                self._stats[futures[future]]["late"] += 1
+        return self._merge(names, answered, max_results)
+
+    @staticmethod
+    def _merge(names: list[str], answered: dict[str, list[dict]], max_results: int) -> list[dict]:
+        # dedupe by canonical URL, interleaving backends in latency order (each backend's ranking kept)
+        merged: dict[str, dict] = {}
+        present = [name for name in names if name in answered]
+        for rank in range(max((len(answered[name]) for name in present), default=0)):
+            for name in present:
+                if rank >= len(answered[name]):
+                    continue
+                result = answered[name][rank]
+                key = canonical_url(result.get("url") or "")
+                if key in merged:
+                    existing = merged[key]
+                    if result.get("score") is not None:
+                        existing["score"] = max(existing.get("score") or 0.0, result["score"])
+                    if not existing.get("raw_content") and result.get("raw_content"):
+                        existing["raw_content"] = result["raw_content"]
+                    existing["backends"].append(name)
+                    continue
+                merged[key] = {**result, "backends": [name]}
+        return list(merged.values())[:max_results]
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def close(self) -> None:
+        # stop the backend pool (searches still running finish in the background) & close backends that can be
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for backend in self.backends.values():
+            if hasattr(backend, "close"):
+                backend.close()
+
+
+def get_search_provider(
+        provider: str = "tavily",
+        include_raw_content: bool = False,
+        deadline_s: float = 3.0,
+        local_index: str | None = None,
+) -> SearchProvider:
+    # pull search provider; include_raw_content asks for full page text where the backend supports it
+    # "a+b" federates backends a & b (see FederatedSearch), answering within deadline_s
+    # "local" searches the on-disk index at local_index (default $RESEARCH_INDEX_DIR or .research_index)
+    if "+" in provider:
+        names = [name.strip() for name in provider.split("+")]
+        if len(set(names)) != len(names) or not all(names):
+            raise ValueError(f"Invalid federated search provider: {provider}")
+        return FederatedSearch(
+            {name: get_search_provider(name, include_raw_content, local_index=local_index) for name in names},
+            deadline_s=deadline_s,
+        )
     if provider == "stub":
         return StubSearch()
     elif provider == "tavily":
-        return TavilySearch()
+        return TavilySearch(include_raw_content=include_raw_content)
+    elif provider == "local":
+        from .corpus import LocalSearch
+        return LocalSearch(local_index)
     else:
         raise ValueError(f"Unknown search provider: {provider}")
     
 def run_search(query: str, provider: SearchProvider, max_results: int = 5) -> SearchResult:
     # Run a single search & return structured result
-    results = provider.search(query, max_results=max_results)
-    return SearchResult(query=query, results=results or [])
+    with span("search", "search", query=query, max_results=max_results) as current:
+        results = provider.search(query, max_results=max_results) or []
+        current.set(
+            results=len(results),
+            bytes=sum(len(r.get("content") or "") + len(r.get("raw_content") or "") for r in results),
+        )
+    return SearchResult(query=query, results=results)
+
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "mc_cid", "mc_eid"}
+
+
+def canonical_url(url: str) -> str:
+    # canonical form for cache keys / dedup: lowercase host, no www., fragment, tracking params or trailing slash
+    from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parsed.query)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse(((parsed.scheme or "https").lower(), host, path, "", query, ""))
 
 def extract_domain(url: str) -> str:
-    # extract domain from URL
+    # extract domain from URL; each local (file://) document counts as its own domain
     from urllib.parse import urlparse
     parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return "local:" + parsed.path.rsplit("/", 1)[-1]
     domain = parsed.netloc
     if domain.startswith("www."):
         domain = domain[4:]
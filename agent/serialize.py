@@ -0,0 +1,179 @@
+"""
+Compact state serialization
+
+states are packed with msgpack (ormsgpack / msgpack, JSON fallback) and
+optionally zstd-compressed; heavy fields are moved into a BlobStore and
+replaced by blob IDs, so checkpoints & stored runs carry each large payload
+once
+
+inside a run, page text never enters the state: a search result's
+raw_content is dropped, or kept in the run's blob store as raw_content_id when
+extraction chunks it, and state["chunks"] holds blob IDs too. Snippets, notes,
+the draft and the report stay plain text, since nodes and callers read them
+directly; they are deduplicated when serialized
+"""
+
+import json
+import zlib
+from typing import Any
+
+from .blobs import BlobStore, is_blob_ref
+from .state import ResearchState
+
+try:
+    import ormsgpack as _msgpack
+except ImportError:  # pragma: no cover - depends on installed extras
+    try:
+        import msgpack as _msgpack
+    except ImportError:
+        _msgpack = None
+
+try:
+    import zstandard as _zstd
+except ImportError:  # pragma: no cover - depends on installed extras
+    _zstd = None
+
+MAGIC = b"DRS1"
+
+# state fields externalized to the blob store
+HEAVY_FIELDS = ("search_results", "chunks", "report_draft", "report", "notes")
+# message contents at least this long are externalized (the final report is also the last message)
+MESSAGE_BLOB_MIN = 512
+# payloads smaller than this are not worth compressing
+COMPRESS_MIN = 256
+
+
+def _encode(obj: Any) -> tuple[bytes, bytes]:
+    if _msgpack is not None:
+        return b"m", _msgpack.packb(obj)
+    return b"j", json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _decode(codec: bytes, data: bytes) -> Any:
+    if codec == b"m":
+        if _msgpack is None:
+            raise RuntimeError("msgpack payload but neither ormsgpack nor msgpack is installed")
+        return _msgpack.unpackb(data)
+    return json.loads(data)
+
+
+def _compress(data: bytes, compress: bool) -> tuple[bytes, bytes]:
+    if not compress or len(data) < COMPRESS_MIN:
+        return b"n", data
+    if _zstd is not None:
+        return b"z", _zstd.ZstdCompressor(level=3).compress(data)
+    return b"g", zlib.compress(data, 6)
+
+
+def _decompress(method: bytes, data: bytes) -> bytes:
+    if method == b"z":
+        if _zstd is None:
+            raise RuntimeError("zstd payload but zstandard is not installed")
+        return _zstd.ZstdDecompressor().decompress(data)
+    if method == b"g":
+        return zlib.decompress(data)
+    return data
+
+
+def pack(obj: Any, compress: bool = True) -> bytes:
+    # MAGIC + codec byte + compression byte + payload
+    codec, data = _encode(obj)
+    method, data = _compress(data, compress)
+    return MAGIC + codec + method + data
+
+
+def unpack(data: bytes) -> Any:
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a packed payload")
+    codec, method = data[4:5], data[5:6]
+    return _decode(codec, _decompress(method, data[6:]))
+
+
+def compact_state(state: ResearchState, blobs: BlobStore) -> dict:
+    # copy of state with heavy fields / long messages replaced by blob IDs
+    compact = dict(state)
+    for field in HEAVY_FIELDS:
+        value = compact.get(field)
+        if value:
+            compact[field] = blobs.put(pack(value))
+    compact["messages"] = [
+        {**m, "content": blobs.put(pack(m["content"]))}
+        if isinstance(m.get("content"), str) and len(m["content"]) >= MESSAGE_BLOB_MIN
+        else m
+        for m in state.get("messages") or []
+    ]
+    return compact
+
+
+def expand_state(compact: dict, blobs: BlobStore) -> ResearchState:
+    state = dict(compact)
+    for field in HEAVY_FIELDS:
+        if is_blob_ref(state.get(field)):
+            state[field] = unpack(blobs.get(state[field]))
+    state["messages"] = [
+        {**m, "content": unpack(blobs.get(m["content"]))} if is_blob_ref(m.get("content")) else m
+        for m in state.get("messages") or []
+    ]
+    return state
+
+
+def dumps_state(state: ResearchState, blobs: BlobStore | None = None, compress: bool = True) -> bytes:
+    # with a blob store heavy fields go there and only references are packed
+    return pack(compact_state(state, blobs) if blobs is not None else dict(state), compress)
+
+
+def loads_state(data: bytes, blobs: BlobStore | None = None) -> ResearchState:
+    state = unpack(data)
+    return expand_state(state, blobs) if blobs is not None else state
+
+
+class CompactSerializer:
+    """
+    LangGraph checkpoint serializer: msgpack (JsonPlusSerializer) + zstd, with
+    large channel values stored once in a blob store
+
+        InMemorySaver(serde=CompactSerializer())
+        SqliteSaver(conn, serde=CompactSerializer(BlobStore(".research_blobs")))
+
+    without blobs the blob store is in memory, which only suits InMemorySaver:
+    checkpoints of a durable saver would outlive their blobs (see check_checkpointer)
+    """
+
+    def __init__(self, blobs: BlobStore | None = None, blob_min: int = 4096):
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+        self.inner = JsonPlusSerializer()
+        self.blobs = blobs if blobs is not None else BlobStore()
+        self.blob_min = blob_min
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        method, data = _compress(data, True)
+        if method != b"n":
+            type_ = f"{type_}+{'zstd' if method == b'z' else 'zlib'}"
+        if len(data) >= self.blob_min:
+            return f"{type_}+blob", self.blobs.put(data).encode()
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith("+blob"):
+            type_ = type_[:-len("+blob")]
+            payload = self.blobs.get(payload.decode())
+        if type_.endswith("+zstd"):
+            type_, payload = type_[:-len("+zstd")], _decompress(b"z", payload)
+        elif type_.endswith("+zlib"):
+            type_, payload = type_[:-len("+zlib")], _decompress(b"g", payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+def check_checkpointer(checkpointer: Any) -> None:
+    # ValueError for a durable saver whose CompactSerializer keeps its blobs in memory
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    serde = getattr(checkpointer, "serde", None)
+    if isinstance(serde, CompactSerializer) and serde.blobs.root is None and not isinstance(checkpointer, InMemorySaver):
+        raise ValueError(
+            f"{type(checkpointer).__name__} is durable but its CompactSerializer keeps blobs in memory; "
+            "pass CompactSerializer(BlobStore(root))"
+        )
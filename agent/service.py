@@ -0,0 +1,301 @@
+"""
+HTTP research service
+
+ASGI app (Starlette) in front of a bounded async worker pool:
+
+    POST /research              {"query": ..., "config": {...}} -> 202 {"job_id": ...}
+                                429 when the queue is full
+    GET  /research/{id}         job status & result
+    GET  /research/{id}/events  server-sent progress events
+    GET  /health                worker / queue stats
+    GET  /metrics               service + request coalescing counters
+
+compiled graphs are cached per config and reused across jobs (so are their
+chat / search clients), up to max_graphs (see agent.graphs); runs execute in worker threads so the event loop only
+shuttles events. A request identical to a queued / running job (same query &
+config) joins that job instead of starting another; with a report cache, a
+near-duplicate of a recently finished query is answered from it.
+
+    research serve --workers 4 --queue-size 32 --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from .graph import build_graph, research_key, stream_research
+from .graphs import MAX_CACHED_GRAPHS, GraphCache
+from .jobs import check_config
+from .report_cache import ReportCache
+from .singleflight import singleflight_stats
+
+# fields of the final state returned by GET /research/{id}
+RESULT_FIELDS = (
+    "run_id", "query", "report", "report_draft", "outline", "sources", "verification_results", "metrics", "degradations",
+)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    # one research request; events are kept so late SSE subscribers can replay them
+
+    def __init__(self, query: str, config: dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.query = query
+        self.config = config
+        self.status = "queued"
+        self.events: list[dict[str, Any]] = []
+        self.result: dict[str, Any] | None = None
+        self.error: str | None = None
+        self.created = time.time()
+        # replaced on every publish, so each waiter holds the event current when it last looked
+        self.changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("complete", "error")
+
+    def publish(self, event: dict[str, Any]) -> None:
+        self.events.append(event)
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ResearchService:
+    """
+    bounded queue + fixed worker pool running research jobs
+
+    graph_factory builds a compiled graph from a config dict; up to max_graphs
+    graphs are cached per config so ChatOpenAI / search clients are reused
+    across jobs (least recently used ones are closed)
+    """
+
+    def __init__(
+            self,
+            workers: int = 2,
+            queue_size: int = 16,
+            defaults: dict[str, Any] | None = None,
+            graph_factory: Callable[..., Any] = build_graph,
+            max_jobs: int = 1000,
+            report_cache: ReportCache | None = None,
+            max_graphs: int = MAX_CACHED_GRAPHS,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.defaults = defaults or {}
+        self.graphs = GraphCache(graph_factory, max_size=max_graphs)
+        self.max_jobs = max_jobs
+        self.report_cache = report_cache
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._inflight: dict[tuple, Job] = {}
+        self.busy = 0
+        self.coalesced_jobs = 0
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.graphs.close()
+
+    def submit(self, query: str, config: dict[str, Any] | None = None) -> Job:
+        check_config(config)
+        config = {**self.defaults, **(config or {})}
+        key = research_key(query, config)
+        existing = self._inflight.get(key) if key is not None else None
+        if existing is not None and not existing.done:
+            self.coalesced_jobs += 1
+            return existing
+
+        job = Job(query, config)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"Queue full ({self.queue_size} jobs waiting)")
+        self.jobs[job.id] = job
+        if key is not None:
+            self._inflight[key] = job
+        self._trim()
+        return job
+
+    def _trim(self) -> None:
+        # forget the oldest finished jobs past max_jobs
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            self.busy += 1
+            job.status = "running"
+            job.publish({"type": "status", "status": "running"})
+            try:
+                await asyncio.to_thread(self._run, job, loop)
+            except Exception as e:
+                job.error = str(e)
+                job.status = "error"
+                job.publish({"type": "error", "error": job.error})
+            else:
+                job.status = "complete"
+                job.publish({"type": "complete", "job_id": job.id})
+            finally:
+                self.busy -= 1
+                self._inflight.pop(research_key(job.query, job.config), None)
+                self.queue.task_done()
+
+    def _run(self, job: Job, loop: asyncio.AbstractEventLoop) -> None:
+        # worker thread: run the graph & hand events back to the loop
+        with self.graphs.using(job.config) as graph:
+            for event in stream_research(job.query, graph=graph, report_cache=self.report_cache, **job.config):
+                if event["type"] == "result":
+                    state = event["state"]
+                    job.result = {field: state.get(field) for field in RESULT_FIELDS}
+                else:
+                    loop.call_soon_threadsafe(job.publish, event)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "cached_graphs": len(self.graphs),
+            "jobs": len(self.jobs),
+            "coalesced_jobs": self.coalesced_jobs,
+            "report_cache": self.report_cache.stats() if self.report_cache is not None else None,
+        }
+
+
+def create_app(service: ResearchService | None = None, **service_kwargs) -> Starlette:
+    service = service or ResearchService(**service_kwargs)
+
+    async def submit(request: Request) -> JSONResponse:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return JSONResponse({"error": "Body must be JSON"}, status_code=400)
+        query = body.get("query") if isinstance(body, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            return JSONResponse({"error": "query is required"}, status_code=400)
+        query = query.strip()
+        if not isinstance(body.get("config", {}), (dict, type(None))):
+            return JSONResponse({"error": "config must be a JSON object"}, status_code=400)
+        try:
+            job = service.submit(query, body.get("config"))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        except QueueFull as e:
+            return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "5"})
+        return JSONResponse({"job_id": job.id, "status": job.status}, status_code=202)
+
+    async def status(request: Request) -> JSONResponse:
+        job = service.jobs.get(request.path_params["job_id"])
+        if job is None:
+            return JSONResponse({"error": "Unknown job"}, status_code=404)
+        return JSONResponse(job.summary())
+
+    async def events(request: Request):
+        job = service.jobs.get(request.path_params["job_id"])
+        if job is None:
+            return JSONResponse({"error": "Unknown job"}, status_code=404)
+
+        async def stream():
+            sent = 0
+            while True:
+                changed = job.changed
+                while sent < len(job.events):
+                    event = job.events[sent]
+                    sent += 1
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if job.done and sent >= len(job.events):
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse(service.stats())
+
+    async def metrics(request: Request) -> JSONResponse:
+        return JSONResponse({"service": service.stats(), "singleflight": singleflight_stats()})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await service.start()
+        yield
+        await service.stop()
+
+    app = Starlette(
+        routes=[
+            Route("/research", submit, methods=["POST"]),
+            Route("/research/{job_id}", status),
+            Route("/research/{job_id}/events", events),
+            Route("/health", health),
+            Route("/metrics", metrics),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.service = service
+    return app
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="research serve", description="Run the research HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent research runs (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=16, help="Jobs waiting before 429s (default: 16)")
+    parser.add_argument("--search-provider", default="tavily", help="Default search provider (default: tavily)")
+    parser.add_argument(
+        "--max-graphs", type=int, default=MAX_CACHED_GRAPHS,
+        help=f"Compiled graphs (one per request config) kept for reuse (default: {MAX_CACHED_GRAPHS})",
+    )
+    parser.add_argument("--report-cache", metavar="PATH", help="SQLite report cache answering near-duplicate queries")
+    parser.add_argument("--cache-threshold", type=float, default=0.85, help="Query similarity (0-1) for a cache hit (default: 0.85)")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600, help="Seconds a cached report stays fresh (default: 86400)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    app = create_app(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        defaults={"search_provider": args.search_provider},
+        max_graphs=args.max_graphs,
+        report_cache=ReportCache(args.report_cache, threshold=args.cache_threshold, ttl_s=args.cache_ttl)
+        if args.report_cache else None,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
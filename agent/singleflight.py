@@ -0,0 +1,89 @@
+"""
+Singleflight request coalescing
+
+concurrent calls with the same key share one execution: the first caller
+runs it, later callers wait for & receive its result (or exception)
+
+three process-wide groups are used: "research" (identical run_research
+calls), "search" (identical SearchProvider.search calls) and "llm"
+(identical chat model requests)
+"""
+
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    # one group of coalesced calls with counters
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        # returns (result, shared) where shared means another caller's execution was reused
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"executions": self.executions, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+FLIGHTS = {name: SingleFlight(name) for name in ("research", "search", "llm")}
+
+
+def singleflight_stats() -> dict[str, dict[str, int]]:
+    return {name: flight.stats() for name, flight in FLIGHTS.items()}
+
+
+class CoalescingSearch:
+    # SearchProvider wrapper: identical concurrent searches share one backend call;
+    # on_shared is called (in the caller's thread) when a search joined another caller's
+
+    def __init__(self, provider, name: str = "", on_shared: Callable[[], None] | None = None):
+        self.provider = provider
+        self.name = name or type(provider).__name__
+        self.on_shared = on_shared
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        results, shared = FLIGHTS["search"].do(
+            (self.name, query, max_results),
+            lambda: self.provider.search(query, max_results=max_results),
+        )
+        if shared and self.on_shared is not None:
+            self.on_shared()
+        return results
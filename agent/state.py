@@ -10,12 +10,27 @@ from typing import TypedDict, Annotated, Literal
 from operator import add
 
 
+def merge_metrics(left: dict | None, right: dict | None) -> dict:
+    # reducer for run metrics: numeric counters are summed, nested dicts merged, anything else is overwritten
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        if isinstance(value, (int, float)) and isinstance(merged.get(key), (int, float)):
+            merged[key] = merged[key] + value
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_metrics(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
 class Source(TypedDict):
     # normalized source with metadata
     url: str
     title: str
     domain: str
     snippet: str
+    subquestion: str  # search query that surfaced it
+    score: float  # selection score (provider score + local relevance)
 
 class Note(TypedDict):
     # extracted factual notes from a source
@@ -24,8 +39,15 @@ class Note(TypedDict):
     quote: str | None
     relevance: str
 
+class NoteDigest(TypedDict):
+    # notes of one subquestion condensed for the writer (hierarchical aggregation)
+    topic: str
+    citations: list[int]  # source numbers the digest cites
+    text: str
+    condensed: bool  # False: too few notes to condense, text is the notes themselves
+
 class SearchResult(TypedDict):
-    # raw search result from web search
+    # raw search result from web search; page text is in the run's blob store (raw_content_id), not inline
     query: str
     results: list[dict]
 
@@ -46,6 +68,7 @@ class ResearchState(TypedDict):
     """
     Main state object that goes through research graph
     Uses Annotated[list, add] for messages to use LangGraph's auto list accumulation across nodes
+    metrics is a dict of run counters that nodes add to (merged by merge_metrics)
     """
 
     # core input
@@ -55,11 +78,16 @@ class ResearchState(TypedDict):
     # planning
     plan: list[str]
     outline: list[str] | None
+    coverage: dict[str, float] | None  # outline section -> share covered by the notes (gap analysis)
+    deepen_round: int  # follow-up search rounds run for uncovered sections
+    gap_queries: list[str]  # the current deepening round's searches (the plan keeps the original subquestions)
 
     # search & sources
     search_results: list[SearchResult]
     sources: list[Source]
     notes: list[Note]
+    chunks: dict[str, str]  # source url -> blob ID of its packed page text chunks, in the run store's blobs
+    note_digests: list[NoteDigest] | None  # the writer's notes when they are aggregated hierarchically
 
     # report
     report_draft: str | None
@@ -73,4 +101,11 @@ class ResearchState(TypedDict):
     status: str | Literal["planning", "searching", "extracting", "drafting", "verifying", "revising", "complete", "error"]
     error: str | None
     report_style: str
+    metrics: Annotated[dict, merge_metrics]
+    degradations: Annotated[list[dict], add]  # what a run budget cut (see agent.budget)
+
+    # follow-up runs
+    run_id: str | None
+    parent_run_id: str | None
+    previous_queries: list[str]
     
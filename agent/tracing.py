@@ -0,0 +1,273 @@
+"""
+Tracing: spans, exporters & a waterfall / critical-path analyzer
+
+spans are OpenTelemetry-shaped (trace / span / parent IDs, kind, start & end
+in epoch ns, attributes) and cover the run, every node, LLM call, search,
+page fetch and cache lookup. A run's Tracer travels in the LangGraph config
+and is activated inside each node; from there a context variable carries it
+(and the current span) into worker threads and asyncio tasks, so spans nest
+without being threaded through call signatures. With no active tracer
+span() is a no-op.
+
+    research "..." --trace-out trace.jsonl
+    research trace trace.jsonl            # waterfall + critical path
+"""
+
+import argparse
+import contextvars
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Protocol
+
+_tracer: contextvars.ContextVar["Tracer | None"] = contextvars.ContextVar("tracer", default=None)
+_parent: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("parent_span", default=None)
+
+
+class SpanExporter(Protocol):
+    def export(self, span: dict[str, Any]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemoryExporter:
+    # keeps finished spans in a list (tests, in-process analysis)
+
+    def __init__(self):
+        self.spans: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlExporter:
+    # appends one JSON object per finished span to a file
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: dict[str, Any]) -> None:
+        line = json.dumps(span, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Span:
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    # one trace; finished spans go to the exporter
+
+    def __init__(self, exporter: SpanExporter | None = None):
+        self.exporter = exporter or InMemoryExporter()
+        self.trace_id = uuid.uuid4().hex
+
+    def start_span(self, name: str, kind: str = "internal", parent: Span | None = None, **attributes) -> Span:
+        # span ended by end_span(); for spans that outlive a single block (e.g. a streamed run)
+        return Span(name, kind, self.trace_id, parent.span_id if parent else None, attributes)
+
+    def end_span(self, current: Span) -> None:
+        current.end_ns = time.time_ns()
+        self.exporter.export(current.to_dict())
+
+    @contextmanager
+    def activate(self, parent: Span | None = None) -> Iterator["Tracer"]:
+        # make this the tracer (and `parent` the current span) for span() calls in this context
+        tokens = (_tracer.set(self), _parent.set(parent))
+        try:
+            yield self
+        finally:
+            _parent.reset(tokens[1])
+            _tracer.reset(tokens[0])
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+        current = self.start_span(name, kind, _parent.get(), **attributes)
+        token = _parent.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.status = "error"
+            current.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _parent.reset(token)
+            self.end_span(current)
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Span | _NoopSpan]:
+    # span under the active tracer, or a no-op
+    tracer = _tracer.get()
+    if tracer is None:
+        yield _NOOP
+        return
+    with tracer.span(name, kind, **attributes) as current:
+        yield current
+
+
+def load_spans(path: str | Path) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in Path(path).read_text().splitlines() if line.strip()]
+
+
+def _ms(ns: int) -> float:
+    return ns / 1e6
+
+
+def _tree(spans: list[dict[str, Any]]) -> tuple[list[dict], dict[str, list[dict]]]:
+    # (roots, children by parent span ID), each ordered by start time
+    ids = {s["span_id"] for s in spans}
+    children: dict[str, list[dict]] = defaultdict(list)
+    roots = []
+    for s in sorted(spans, key=lambda s: s["start_ns"]):
+        if s["parent_id"] in ids:
+            children[s["parent_id"]].append(s)
+        else:
+            roots.append(s)
+    return roots, children
+
+
+def critical_path(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    spans the run's end-to-end time was waiting on, outermost first
+
+    walking back from a span's end, the child that finished last is what the
+    span was blocked on; before that child started, the child that finished
+    last before it, and so on. Recurses into each chosen child.
+    """
+    if not spans:
+        return []
+    roots, children = _tree(spans)
+    root = max(roots, key=lambda s: s["end_ns"] - s["start_ns"])
+    path: list[dict[str, Any]] = []
+
+    def walk(current: dict[str, Any]) -> None:
+        path.append(current)
+        cursor = current["end_ns"]
+        blocking = []
+        for child in sorted(children[current["span_id"]], key=lambda s: s["end_ns"], reverse=True):
+            if child["end_ns"] <= cursor:
+                blocking.append(child)
+                cursor = child["start_ns"]
+        for child in reversed(blocking):
+            walk(child)
+
+    walk(root)
+    return path
+
+
+def waterfall(spans: list[dict[str, Any]], width: int = 48) -> str:
+    # one row per span: indented name, duration, bar over the trace timeline; * marks the critical path
+    if not spans:
+        return "(no spans)"
+    roots, children = _tree(spans)
+    start = min(s["start_ns"] for s in spans)
+    total = max(max(s["end_ns"] for s in spans) - start, 1)
+    critical = {s["span_id"] for s in critical_path(spans)}
+
+    rows = []
+
+    def add(current: dict[str, Any], depth: int) -> None:
+        left = int((current["start_ns"] - start) / total * width)
+        length = max(1, int((current["end_ns"] - current["start_ns"]) / total * width))
+        bar = " " * left + "#" * min(length, width - left)
+        label = ("  " * depth + f"{current['kind']}:{current['name']}")[:40]
+        mark = "*" if current["span_id"] in critical else " "
+        duration = _ms(current["end_ns"] - current["start_ns"])
+        rows.append(f"{mark} {label:<40} {duration:>9.1f} ms |{bar:<{width}}|")
+        for child in children[current["span_id"]]:
+            add(child, depth + 1)
+
+    for root in roots:
+        add(root, 0)
+    return "\n".join(rows)
+
+
+def summarize_critical_path(spans: list[dict[str, Any]]) -> str:
+    # critical-path spans with the time spent in each outside its blocking children
+    path = critical_path(spans)
+    on_path = {s["span_id"] for s in path}
+    _, children = _tree(spans)
+    lines = []
+    for s in path:
+        blocked = sum(c["end_ns"] - c["start_ns"] for c in children[s["span_id"]] if c["span_id"] in on_path)
+        self_ms = _ms(s["end_ns"] - s["start_ns"] - blocked)
+        attrs = ", ".join(f"{k}={v}" for k, v in s["attributes"].items() if k in ("model", "query", "url", "hit"))
+        lines.append(f"{_ms(s['end_ns'] - s['start_ns']):>9.1f} ms  (self {self_ms:>8.1f})  {s['kind']}:{s['name']}  {attrs}".rstrip())
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="research trace", description="Print a trace's waterfall and critical path")
+    parser.add_argument("path", help="JSON-lines trace written by --trace-out")
+    parser.add_argument("--width", type=int, default=48, help="Waterfall bar width (default: 48)")
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.path)
+    by_trace: dict[str, list[dict]] = defaultdict(list)
+    for s in spans:
+        by_trace[s["trace_id"]].append(s)
+    for trace_id, trace_spans in by_trace.items():
+        print(f"Trace {trace_id} ({len(trace_spans)} spans)\n")
+        print(waterfall(trace_spans, width=args.width))
+        print("\nCritical path:")
+        print(summarize_critical_path(trace_spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()
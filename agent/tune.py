@@ -0,0 +1,332 @@
+"""
+Parameter sweep autotuner: latency & cost vs report quality
+
+runs a query set through run_research for each configuration of a search
+space (max_searches, max_sources, min_unique_domains, enable_cove, models),
+chosen by grid or by Bayesian (TPE) search, and records per configuration
+mean latency, tokens, search calls and the quality checks of agent.quality.
+Prints the Pareto frontier over (latency, tokens, quality) and writes it,
+every trial and recommended presets (fast / balanced / quality) to JSON.
+
+every (configuration, query) run goes through its own cassette in
+--cassette-dir: the first sweep records it (live, or on the stub / local
+providers), later sweeps replay it at the recorded latencies without network
+or API keys - so a sweep can be re-run, extended or re-scored for free.
+
+    research tune queries.txt --strategy grid --search-provider stub
+    research tune queries.txt --strategy bayes --trials 24 --space space.json
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import random
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from .cassette import Cassette
+from .quality import quality_checks
+
+# knob -> candidate values (any run_research / build_graph keyword)
+DEFAULT_SPACE: dict[str, list] = {
+    "max_searches": [2, 4, 6],
+    "max_sources": [3, 5, 8],
+    "min_unique_domains": [2, 4],
+    "enable_cove": [False, True],
+    "draft_model": ["gpt-4o", "gpt-4o-mini"],
+}
+
+
+def config_id(config: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def grid(space: dict[str, list]) -> Iterator[dict[str, Any]]:
+    # every combination of the space's values
+    names = list(space)
+    for values in itertools.product(*(space[n] for n in names)):
+        yield dict(zip(names, values))
+
+
+def load_queries(path: str | Path) -> list[str]:
+    # one query per line; blank lines and # comments skipped
+    lines = (line.strip() for line in Path(path).read_text().splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def run_trial(
+        config: dict[str, Any],
+        queries: list[str],
+        cassette_dir: str | Path | None = None,
+        replay_latency: str = "original",
+        base: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    run every query under one configuration; returns its mean measures
+
+    with cassette_dir, each query replays its cassette when one exists and
+    records a new one otherwise; cassettes are keyed by the full run config
+    (base settings included) and the query
+    """
+    from .graph import run_research
+
+    runs, replayed = [], 0
+    for query in queries:
+        cassette = None
+        if cassette_dir is not None:
+            key = config_id({**(base or {}), **config})
+            path = Path(cassette_dir) / f"{key}-{config_id({'query': query})}.cassette"
+            if path.exists():
+                cassette = Cassette(path, latency=replay_latency)
+                replayed += 1
+            else:
+                cassette = Cassette(path, mode="record")
+        start = time.perf_counter()
+        state = run_research(query, cassette=cassette, **{**(base or {}), **config})
+        latency = time.perf_counter() - start
+        if cassette is not None and not cassette.replaying:
+            cassette.save()
+        metrics = state.get("metrics") or {}
+        runs.append({
+            "latency_s": latency,
+            "tokens": sum((metrics.get("input_tokens") or {}).values()) + sum((metrics.get("output_tokens") or {}).values()),
+            "search_calls": metrics.get("search_calls", 0),
+            **quality_checks(state),
+        })
+
+    def mean(key: str) -> float:
+        return sum(r[key] for r in runs) / len(runs)
+
+    return {
+        "id": config_id(config),
+        "config": config,
+        "latency_s": round(mean("latency_s"), 3),
+        "max_latency_s": round(max(r["latency_s"] for r in runs), 3),
+        "tokens": round(mean("tokens")),
+        "search_calls": round(mean("search_calls"), 2),
+        "quality": round(mean("score"), 4),
+        "citations": round(mean("citations"), 2),
+        "sources": round(mean("sources"), 2),
+        "replayed": replayed,
+    }
+
+
+def dominates(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    # a is no worse than b on latency, tokens & quality, and better on one
+    no_worse = a["latency_s"] <= b["latency_s"] and a["tokens"] <= b["tokens"] and a["quality"] >= b["quality"]
+    better = a["latency_s"] < b["latency_s"] or a["tokens"] < b["tokens"] or a["quality"] > b["quality"]
+    return no_worse and better
+
+
+def pareto_frontier(trials: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # non-dominated successful trials, fastest first
+    ok = [t for t in trials if "error" not in t]
+    frontier = [t for t in ok if not any(dominates(o, t) for o in ok)]
+    return sorted(frontier, key=lambda t: (t["latency_s"], t["tokens"]))
+
+
+def recommend(frontier: list[dict[str, Any]], min_quality: float = 0.75) -> dict[str, dict[str, Any]]:
+    """
+    presets picked from the frontier
+
+    quality: best quality, then fastest; fast: fastest with quality >=
+    min_quality (fastest overall if none qualifies); balanced: closest to
+    the ideal point once latency, tokens and quality are scaled to [0, 1]
+    """
+    if not frontier:
+        return {}
+    acceptable = [t for t in frontier if t["quality"] >= min_quality] or frontier
+
+    def span(key: str) -> tuple[float, float]:
+        return min(t[key] for t in frontier), max(t[key] for t in frontier)
+
+    def scaled(t: dict[str, Any], key: str, lo_hi: tuple[float, float]) -> float:
+        return 0.0 if lo_hi[1] == lo_hi[0] else (t[key] - lo_hi[0]) / (lo_hi[1] - lo_hi[0])
+
+    latency, tokens, quality = span("latency_s"), span("tokens"), span("quality")
+
+    def distance(t: dict[str, Any]) -> float:
+        return math.hypot(scaled(t, "latency_s", latency), scaled(t, "tokens", tokens), 1 - scaled(t, "quality", quality))
+
+    picks = {
+        "fast": min(acceptable, key=lambda t: (t["latency_s"], t["tokens"])),
+        "balanced": min(acceptable, key=distance),
+        "quality": max(frontier, key=lambda t: (t["quality"], -t["latency_s"], -t["tokens"])),
+    }
+    return {name: {"id": t["id"], **t["config"]} for name, t in picks.items()}
+
+
+def suggest_tpe(
+        space: dict[str, list],
+        history: list[tuple[dict[str, Any], float]],
+        rng: random.Random,
+        gamma: float = 0.25,
+        candidates: int = 24,
+) -> dict[str, Any]:
+    """
+    next configuration by a tree-structured Parzen estimator over the discrete space
+
+    history is (config, loss); the best gamma share are "good". Each knob
+    gets smoothed value frequencies among good (good_p) and the rest
+    (bad_p); of `candidates` configs sampled from good_p, the untried one
+    with the highest good_p(x) / bad_p(x) wins
+    """
+    ranked = sorted(history, key=lambda h: h[1])
+    n_good = max(1, int(math.ceil(gamma * len(ranked))))
+    good, bad = [c for c, _ in ranked[:n_good]], [c for c, _ in ranked[n_good:]]
+    tried = {config_id(c) for c, _ in history}
+
+    def density(configs: list[dict], name: str) -> list[float]:
+        counts = [1.0 + sum(1 for c in configs if c.get(name) == v) for v in space[name]]
+        total = sum(counts)
+        return [n / total for n in counts]
+
+    good_p = {name: density(good, name) for name in space}
+    bad_p = {name: density(bad, name) for name in space}
+    best, best_score = None, -math.inf
+    for _ in range(candidates):
+        picks = {name: rng.choices(range(len(values)), weights=good_p[name])[0] for name, values in space.items()}
+        config = {name: space[name][i] for name, i in picks.items()}
+        if config_id(config) in tried:
+            continue
+        score = sum(math.log(good_p[name][i]) - math.log(bad_p[name][i]) for name, i in picks.items())
+        if score > best_score:
+            best, best_score = config, score
+    # every sampled candidate already tried: fall back to a random untried point
+    return best or rng.choice([c for c in grid(space) if config_id(c) not in tried] or [None])
+
+
+def loss(trial: dict[str, Any], trials: list[dict[str, Any]], weight: float) -> float:
+    # lower is better: missed quality plus a weight-mixed share of the worst latency / tokens seen
+    if "error" in trial:
+        return math.inf
+    max_latency = max((t["latency_s"] for t in trials if "error" not in t), default=1.0) or 1.0
+    max_tokens = max((t["tokens"] for t in trials if "error" not in t), default=1) or 1
+    cost = weight * trial["latency_s"] / max_latency + (1 - weight) * trial["tokens"] / max_tokens
+    return (1 - trial["quality"]) + 0.5 * cost
+
+
+def sweep(
+        queries: list[str],
+        space: dict[str, list] | None = None,
+        strategy: str = "grid",
+        trials: int | None = None,
+        seed: int = 0,
+        cassette_dir: str | Path | None = None,
+        replay_latency: str = "original",
+        base: dict[str, Any] | None = None,
+        min_quality: float = 0.75,
+        on_trial: Any = None,
+) -> dict[str, Any]:
+    """
+    evaluate configurations of `space` on `queries`; returns trials, frontier & presets
+
+    grid: every configuration (a seeded sample of `trials` of them if given);
+    bayes: `trials` configurations, random at first then by suggest_tpe with
+    a random latency / tokens weighting each step so the search spreads
+    along the frontier. A failing configuration is kept with its error.
+    """
+    space = space or DEFAULT_SPACE
+    rng = random.Random(seed)
+    if strategy not in ("grid", "bayes"):
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    results: list[dict[str, Any]] = []
+
+    def evaluate(config: dict[str, Any]) -> None:
+        try:
+            trial = run_trial(config, queries, cassette_dir, replay_latency, base)
+        except Exception as e:
+            trial = {"id": config_id(config), "config": config, "error": f"{type(e).__name__}: {e}"}
+        results.append(trial)
+        if on_trial is not None:
+            on_trial(trial)
+
+    if strategy == "grid":
+        configs = list(grid(space))
+        if trials is not None and trials < len(configs):
+            configs = rng.sample(configs, trials)
+        for config in configs:
+            evaluate(config)
+    else:
+        size = math.prod(len(v) for v in space.values())
+        budget = min(trials or 20, size)
+        startup = min(budget, max(4, len(space)))
+        for config in rng.sample(list(grid(space)), startup):
+            evaluate(config)
+        while len(results) < budget:
+            weight = rng.random()
+            history = [(t["config"], loss(t, results, weight)) for t in results]
+            config = suggest_tpe(space, history, rng)
+            if config is None:
+                break
+            evaluate(config)
+
+    frontier = pareto_frontier(results)
+    return {
+        "queries": queries,
+        "strategy": strategy,
+        "space": space,
+        "trials": results,
+        "frontier": [t["id"] for t in frontier],
+        "presets": recommend(frontier, min_quality),
+    }
+
+
+def format_trial(trial: dict[str, Any]) -> str:
+    knobs = " ".join(f"{k}={v}" for k, v in trial["config"].items())
+    if "error" in trial:
+        return f"{trial['id']}  error: {trial['error']}  {knobs}"
+    return (f"{trial['id']}  {trial['latency_s']:>8.2f}s {trial['tokens']:>8} tok {trial['search_calls']:>5} search "
+            f" quality {trial['quality']:.2f}  {knobs}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="research tune", description="Sweep run settings for the latency / quality trade-off")
+    parser.add_argument("queries", help="File with one query per line")
+    parser.add_argument("--space", metavar="PATH", help="JSON {knob: [values]} (default: searches, sources, domains, CoVe, draft model)")
+    parser.add_argument("--strategy", choices=["grid", "bayes"], default="grid")
+    parser.add_argument("--trials", type=int, help="Configurations to try (bayes default 20; grid default all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--search-provider", default="tavily", help="Search provider for recorded runs (default: tavily)")
+    parser.add_argument("--cassette-dir", default=".tune_cassettes", help="Per-run cassettes; replayed when present (default: .tune_cassettes)")
+    parser.add_argument("--replay-latency", choices=["original", "zero"], default="original")
+    parser.add_argument("--min-quality", type=float, default=0.75, help="Quality floor (0-1) for the fast / balanced presets (default: 0.75)")
+    parser.add_argument("--out", default="tune.json", help="Results file (default: tune.json)")
+    args = parser.parse_args(argv)
+
+    queries = load_queries(args.queries)
+    if not queries:
+        parser.error(f"No queries in {args.queries}")
+    space = json.loads(Path(args.space).read_text()) if args.space else None
+
+    print(f"Sweeping {len(queries)} queries ({args.strategy})\n")
+    result = sweep(
+        queries,
+        space=space,
+        strategy=args.strategy,
+        trials=args.trials,
+        seed=args.seed,
+        cassette_dir=args.cassette_dir,
+        replay_latency=args.replay_latency,
+        base={"search_provider": args.search_provider},
+        min_quality=args.min_quality,
+        on_trial=lambda t: print(format_trial(t)),
+    )
+    Path(args.out).write_text(json.dumps(result, indent=2))
+
+    by_id = {t["id"]: t for t in result["trials"]}
+    print("\nPareto frontier:")
+    for trial_id in result["frontier"]:
+        print(format_trial(by_id[trial_id]))
+    print("\nPresets:")
+    for name, preset in result["presets"].items():
+        print(f"{name:<9} " + " ".join(f"{k}={v}" for k, v in preset.items() if k != "id"))
+    print(f"\nResults: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Research workers pulling from a durable job queue
+
+each worker process runs `concurrency` threads; a thread leases a job,
+runs it through the compiled graph for its config (from a GraphCache like
+the HTTP service's, so clients are reused), saves the run to the shared
+RunStore and acks the job with its run ID. The lease is extended while the
+run is in flight, so only a worker that has stopped heartbeating loses its
+job. Workers share nothing but the queue and the run directory, so
+throughput grows with the number of workers.
+
+    research worker --queue .research_jobs.db --run-dir /shared/runs --concurrency 4
+    research worker --enqueue "What is tidal power?" --config '{"enable_cove": false}'
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Any, Callable
+
+from .graphs import GraphCache
+from .jobs import JobQueue, LeasedJob, SQLiteJobQueue
+from .runs import RunStore
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    pulls jobs from a JobQueue and runs them
+
+    lease_s: how long a job stays held without a heartbeat (heartbeats come
+    every lease_s / 3); poll_s: idle wait between empty polls
+    """
+
+    def __init__(
+            self,
+            queue: JobQueue,
+            run_store: RunStore | None = None,
+            concurrency: int = 1,
+            lease_s: float = 120.0,
+            poll_s: float = 1.0,
+            defaults: dict[str, Any] | None = None,
+            graph_factory: Callable[..., Any] | None = None,
+            worker_id: str | None = None,
+    ):
+        self.queue = queue
+        self.run_store = run_store or RunStore()
+        self.concurrency = concurrency
+        self.lease_s = lease_s
+        self.poll_s = poll_s
+        self.defaults = defaults or {}
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.stop_event = threading.Event()
+        self.completed = 0
+        self.failed = 0
+        self.graphs = GraphCache(graph_factory)
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def run_one(self) -> bool:
+        # lease & run one job; False when none was ready
+        job = self.queue.lease(self.worker_id, self.lease_s)
+        if job is None:
+            return False
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            run_id = self._run(job)
+        except Exception as e:
+            logger.exception("job %s failed (attempt %d)", job["id"], job["attempts"])
+            with self._lock:
+                self.failed += 1
+            if not self.queue.fail(job["id"], self.worker_id, f"{type(e).__name__}: {e}"):
+                logger.warning("job %s: lease lost before the failure was recorded", job["id"])
+        else:
+            with self._lock:
+                self.completed += 1
+            if not self.queue.ack(job["id"], self.worker_id, run_id):
+                # another worker took the job over after our lease lapsed; it will save its own run
+                logger.warning("job %s: lease lost, run %s saved but not acked", job["id"], run_id)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        return True
+
+    def _run(self, job: LeasedJob) -> str:
+        # run a job to completion, saving the run; returns its run ID
+        from .graph import stream_research
+
+        config = {**self.defaults, **job["config"]}
+        state = None
+        with self.graphs.using(config) as graph:
+            for event in stream_research(job["query"], run_store=self.run_store, graph=graph, **config):
+                if event["type"] == "result":
+                    state = event["state"]
+        return state["run_id"]
+
+    def _heartbeat(self, job: LeasedJob, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_s / 3):
+            if not self.queue.heartbeat(job["id"], self.worker_id, self.lease_s):
+                logger.warning("job %s: lease lost while running", job["id"])
+                return
+
+    def _loop(self, drain: bool) -> None:
+        while not self.stop_event.is_set():
+            if not self.run_one():
+                if drain:
+                    return
+                self.stop_event.wait(self.poll_s)
+
+    def run(self, drain: bool = False) -> None:
+        # work until stop(), or with drain until no job is ready
+        self._threads = [
+            threading.Thread(target=self._loop, args=(drain,), name=f"worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.wait()
+
+    def wait(self) -> None:
+        # until the threads of run() have exited
+        for thread in self._threads:
+            thread.join()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def close(self) -> None:
+        # release the cached graphs' search pools & clients
+        self.graphs.close()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="research worker", description="Run research jobs from a durable queue")
+    parser.add_argument("--queue", metavar="PATH", help="SQLite job queue (default: $RESEARCH_QUEUE or .research_jobs.db)")
+    parser.add_argument("--run-dir", metavar="DIR", help="Shared run store results are saved to (default: .research_runs)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs this worker runs at once (default: 1)")
+    parser.add_argument("--lease", type=float, default=120.0, help="Seconds a job stays held without a heartbeat (default: 120)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Tries per job before it is marked failed (default: 3)")
+    parser.add_argument("--search-provider", default="tavily", help="Default search provider (default: tavily)")
+    parser.add_argument("--enqueue", metavar="QUERY", action="append", help="Add a job instead of working; repeatable")
+    parser.add_argument("--config", default="{}", help="JSON run config for --enqueue (same keys as the HTTP service)")
+    parser.add_argument("--status", metavar="JOB_ID", help="Print a job's status and exit")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    queue = SQLiteJobQueue(args.queue, max_attempts=args.max_attempts)
+    if args.enqueue:
+        config = json.loads(args.config)
+        for query in args.enqueue:
+            print(queue.put(query, config))
+        return
+    if args.status:
+        job = queue.get(args.status)
+        if job is None:
+            raise SystemExit(f"Unknown job: {args.status}")
+        print(json.dumps(job, indent=2))
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(message)s")
+    worker = Worker(
+        queue,
+        RunStore(args.run_dir),
+        concurrency=args.concurrency,
+        lease_s=args.lease,
+        defaults={"search_provider": args.search_provider},
+    )
+    logger.info("worker %s: %d threads on %s", worker.worker_id, args.concurrency, queue.path)
+    try:
+        worker.run(drain=args.drain)
+    except KeyboardInterrupt:
+        # threads finish their current job, then exit (a second ^C abandons it: its lease lapses and it is retried)
+        worker.stop()
+        worker.wait()
+    worker.close()
+    logger.info("worker %s: %d complete, %d failed, queue %s", worker.worker_id, worker.completed, worker.failed, queue.stats())
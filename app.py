@@ -4,12 +4,12 @@ import streamlit as st
 import time
 import threading
 import random
-from pathlib import Path
+from collections import OrderedDict
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from agent import run_research
+from agent.graph import build_graph, stream_research
 
 # Page config
 st.set_page_config(
@@ -38,8 +38,8 @@ if "query" not in st.session_state:
     st.session_state.query = ""
 if "result" not in st.session_state:
     st.session_state.result = None
-if "running" not in st.session_state:
-    st.session_state.running = False
+if "run_key" not in st.session_state:
+    st.session_state.run_key = None
 
 # Sidebar configuration
 with st.sidebar:
@@ -86,116 +86,198 @@ query = st.text_area(
     placeholder="e.g., " + st.session_state.placeholder,
 )
 
+# Follow-ups reuse the previous result's searches, sources and notes
+follow_up = False
+if st.session_state.result:
+    follow_up = st.checkbox(
+        "Follow up on previous result",
+        value=True,
+        help=f"Builds on: {st.session_state.result['query']}",
+    )
+
 # Run button
 col1, col2 = st.columns([1, 5])
 with col1:
     run_button = st.button(
         "Run Research",
-        disabled=st.session_state.running or not query.strip(),
+        disabled=st.session_state.run_key is not None or not query.strip(),
         type="primary",
     )
 
-# Progress phases
-def get_phases(enable_cove: bool) -> list[tuple[str, float]]:
-    """Return phases with estimated relative durations."""
-    phases = [
-        ("Planning research...", 0.10),
-        ("Running searches...", 0.35),
-        ("Extracting notes...", 0.25),
-        ("Drafting report...", 0.20),
-    ]
-    if enable_cove:
-        phases.extend([
-            ("Compiling verification...", 0.03),
-            ("Verifying claims...", 0.04),
-            ("Revising report...", 0.03),
-        ])
-    return phases
-
-def estimate_total_time(max_searches: int, max_sources: int, enable_cove: bool) -> float:
-    """Estimate total runtime in seconds."""
-    base = 10  # minimum
-    search_time = max_searches * 3  # ~3s per search
-    extract_time = max_sources * 2  # ~2s per extraction
-    cove_time = 15 if enable_cove else 0
-    return base + search_time + extract_time + cove_time
-
-# Execute research
-if run_button and query.strip():
-    st.session_state.running = True
-    st.session_state.result = None
-    
-    # Create containers
-    progress_container = st.empty()
-    status_container = st.empty()
-    
-    phases = get_phases(enable_cove)
-    total_time = estimate_total_time(max_searches, max_sources, enable_cove)
-    
-    # Thread to run research in background
-    result_holder = {"result": None, "error": None}
-    
-    def run_agent():
+# Progress labels per graph node
+NODE_LABELS = {
+    "plan_research": "Planning research...",
+    "run_searches": "Running searches...",
+    "select_and_extract": "Extracting notes...",
+    "draft_report": "Drafting report...",
+    "compile_verification": "Compiling verification...",
+    "verify_claims": "Verifying claims...",
+    "revise_report": "Revising report...",
+}
+MAX_CACHED_RESULTS = 32
+RENDER_INTERVAL_S = 0.15
+
+
+class ResearchRun:
+    """A research run in a background thread; events are buffered so any rerun can (re)attach."""
+
+    def __init__(self, query: str, previous, graph, config: dict):
+        self.events: list[dict] = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, args=(query, previous, graph, config), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, query, previous, graph, config):
         try:
-            result_holder["result"] = run_research(
-                query=query.strip(),
-                search_provider=search_provider,
-                max_searches=max_searches,
-                max_sources=max_sources,
-                enable_cove=enable_cove,
-                report_style=report_style,
-            )
+            for event in stream_research(query, previous=previous, graph=graph, tokens=True, **config):
+                if event["type"] == "result":
+                    self.result = event["state"]
+                with self._cond:
+                    self.events.append(event)
+                    self._cond.notify_all()
         except Exception as e:
-            result_holder["error"] = str(e)
-    
-    # Start research thread
-    thread = threading.Thread(target=run_agent)
-    thread.start()
-    
-    # Fake progress while thread runs
-    elapsed = 0.0
-    phase_idx = 0
-    cumulative = 0.0
-    
-    progress_bar = progress_container.progress(0)
-    
-    while thread.is_alive():
-        # Update phase based on elapsed time
-        target_fraction = elapsed / total_time
-        
-        # Find current phase
-        cumulative = 0.0
-        for i, (phase_name, phase_fraction) in enumerate(phases):
-            cumulative += phase_fraction
-            if target_fraction < cumulative:
-                phase_idx = i
-                break
-        else:
-            phase_idx = len(phases) - 1
-        
-        status_container.text(phases[phase_idx][0])
-        progress_bar.progress(min(target_fraction, 0.95))
-        
-        time.sleep(0.2)
-        elapsed += 0.2
-    
-    thread.join()
-    
-    # Complete progress
-    progress_bar.progress(1.0)
-    status_container.text("Complete!")
-    time.sleep(0.3)
-    
-    # Clear progress indicators
-    progress_container.empty()
-    status_container.empty()
-    
-    st.session_state.running = False
-    
-    if result_holder["error"]:
-        st.error(f"Error: {result_holder['error']}")
+            self.error = str(e)
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def wait_events(self, start: int, timeout: float = 1.0) -> list[dict]:
+        """Block until there are events past `start` (or the run ends); no sleep-polling."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > start or self.done, timeout)
+            return self.events[start:]
+
+
+class RunRegistry:
+    """In-flight runs and recent results, shared by every session and rerun."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs: dict[tuple, ResearchRun] = {}
+        self.results: OrderedDict[tuple, dict] = OrderedDict()
+
+    def cached(self, key: tuple):
+        with self._lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key]
+            return None
+
+    def start(self, key: tuple, query: str, previous, graph, config: dict) -> ResearchRun:
+        # joins an identical run already in flight
+        with self._lock:
+            run = self.runs.get(key)
+            if run is None or run.done:
+                run = self.runs[key] = ResearchRun(query, previous, graph, config)
+            return run
+
+    def finish(self, key: tuple):
+        with self._lock:
+            run = self.runs.pop(key, None)
+            if run is not None and run.result is not None:
+                self.results[key] = run.result
+                while len(self.results) > MAX_CACHED_RESULTS:
+                    self.results.popitem(last=False)
+            return run
+
+
+@st.cache_resource
+def get_registry() -> RunRegistry:
+    return RunRegistry()
+
+
+@st.cache_resource(show_spinner=False)
+def get_graph(config_items: tuple):
+    """Compiled graph (and its chat / search clients) per config, shared across sessions."""
+    return build_graph(**dict(config_items))
+
+
+registry = get_registry()
+config = {
+    "search_provider": search_provider,
+    "max_searches": max_searches,
+    "max_sources": max_sources,
+    "enable_cove": enable_cove,
+    "report_style": report_style,
+}
+config_items = tuple(sorted(config.items()))
+
+# Start research (or serve a memoized result)
+if run_button and query.strip():
+    previous = st.session_state.result if follow_up else None
+    key = (
+        " ".join(query.lower().split()),
+        config_items,
+        previous.get("run_id") if previous else None,
+    )
+    cached = registry.cached(key)
+    if cached is not None:
+        st.session_state.result = cached
+        st.rerun()
+    registry.start(key, query.strip(), previous, get_graph(config_items), config)
+    st.session_state.run_key = key
+    st.rerun()
+
+# Follow the in-flight run; survives reruns because the run lives in the registry
+if st.session_state.run_key is not None:
+    key = st.session_state.run_key
+    run = registry.runs.get(key)
+
+    if run is None:
+        # finished in another session / rerun
+        st.session_state.run_key = None
+        st.session_state.result = registry.cached(key) or st.session_state.result
+        st.rerun()
+
+    total_nodes = 7 if dict(key[1])["enable_cove"] else 4
+    status_container = st.empty()
+    status_container.text(NODE_LABELS["plan_research"])
+    progress_bar = st.progress(0.0)
+    report_container = st.empty()
+
+    seen = 0
+    finished_nodes = 0
+    report_text = ""
+    report_node = None
+    last_render = 0.0
+
+    while True:
+        events = run.wait_events(seen)
+        seen += len(events)
+        for event in events:
+            if event["type"] == "progress":
+                finished_nodes += 1
+                next_label = list(NODE_LABELS.values())[min(finished_nodes, len(NODE_LABELS) - 1)]
+                status_container.text(next_label if finished_nodes < total_nodes else "Complete!")
+                progress_bar.progress(min(finished_nodes / total_nodes, 1.0))
+            elif event["type"] == "token":
+                if event["node"] != report_node:
+                    report_node, report_text = event["node"], ""
+                report_text += event["text"]
+
+        # throttle live report rendering
+        if report_text and time.monotonic() - last_render > RENDER_INTERVAL_S:
+            report_container.markdown(report_text)
+            last_render = time.monotonic()
+
+        if run.done and seen >= len(run.events):
+            break
+
+    registry.finish(key)
+    st.session_state.run_key = None
+
+    if run.error:
+        status_container.empty()
+        progress_bar.empty()
+        st.error(f"Error: {run.error}")
     else:
-        st.session_state.result = result_holder["result"]
+        st.session_state.result = run.result
         st.rerun()
 
 # Display results
@@ -0,0 +1,72 @@
+"""
+Local corpus index benchmark
+
+builds an index over a synthetic corpus and reports build time, index size,
+query latency and the memory a query process needs with the index mapped
+
+    python benchmarks/bench_corpus.py [--docs 20000] [--queries 200]
+"""
+
+import argparse
+import random
+import resource
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agent.corpus import LocalIndex, build_index
+
+WORDS = [f"w{i}" for i in range(50000)]
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    # zipf-ish word choice so postings lengths look like natural text
+    return " ".join(WORDS[min(int(rng.paretovariate(1.1)) - 1, len(WORDS) - 1)] for _ in range(words)) + "."
+
+
+def make_corpus(root: Path, docs: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    for i in range(docs):
+        sub = root / f"d{i % 100:02d}"
+        sub.mkdir(exist_ok=True)
+        body = "\n\n".join(paragraph(rng, rng.randint(40, 120)) for _ in range(rng.randint(2, 6)))
+        (sub / f"doc{i}.txt").write_text(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, index_dir = Path(tmp) / "docs", Path(tmp) / "index"
+        source.mkdir()
+        make_corpus(source, args.docs)
+        stats = build_index(source, index_dir, chunk_chars=600)
+        print(f"built: {stats['documents']:,} docs, {stats['passages']:,} passages, {stats['terms']:,} terms, "
+              f"{stats['postings']:,} postings, {stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.1f}s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        index = LocalIndex(index_dir)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(1)
+        latencies = []
+        for _ in range(args.queries):
+            query = " ".join(rng.choice(WORDS[:5000]) for _ in range(rng.randint(2, 5)))
+            start = time.perf_counter()
+            index.search(query, max_results=5)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(f"open: {open_ms:.2f} ms")
+        print(f"query: p50 {statistics.median(latencies):.2f} ms, p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms")
+        print(f"peak RSS growth while querying: {(rss_after - rss_before) / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Import-time benchmark
+
+times cold imports of the package entry points, each in a fresh interpreter
+(interpreter startup excluded), and fails when a median exceeds its budget
+
+    python benchmarks/bench_import.py [--repeat 5] [--scale 1.0]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# statement -> budget in ms for the median cold import
+BUDGETS_MS = {
+    "import agent": 50,
+    "from agent import ResearchState": 50,
+    "import agent.cli": 100,
+    "import agent.runs": 150,
+    "from agent import run_research": 3000,
+}
+
+# modules the lightweight entry points must not load
+HEAVY_MODULES = ("langchain_openai", "openai", "langgraph", "tavily", "numpy", "httpx")
+
+PROBE = """
+import sys, time
+t = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed * 1000, ",".join(heavy))
+"""
+
+
+def time_import(stmt: str) -> tuple[float, list[str]]:
+    # (ms, heavy modules loaded) for one cold import
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(stmt=stmt, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), out[1].split(",") if len(out) > 1 else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines / CI)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'statement':<36}{'median ms':>10}{'budget ms':>10}  heavy modules")
+    for stmt, budget in BUDGETS_MS.items():
+        runs = [time_import(stmt) for _ in range(args.repeat)]
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = runs[0][1]
+        budget *= args.scale
+        print(f"{stmt:<36}{median:>10.1f}{budget:>10.0f}  {', '.join(heavy) or '-'}")
+        if median > budget:
+            failures.append(stmt)
+
+    if failures:
+        print(f"\nover budget: {'; '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
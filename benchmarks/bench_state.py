@@ -0,0 +1,133 @@
+"""
+State size / serialization benchmark
+
+builds a realistic end-of-run ResearchState (CoVe on, raw content on) and
+compares JSON against the compact msgpack(+zstd) format, with and without
+heavy fields moved to the blob store, plus a checkpointed run's footprint
+
+    python benchmarks/bench_state.py [--subquestions 6] [--repeat 50]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from agent.blobs import BlobStore
+from agent.serialize import dumps_state, loads_state, CompactSerializer
+
+
+WORDS = (
+    "solar panel efficiency improved steadily across decade field data regions cost module "
+    "silicon perovskite tandem cell record laboratory percent output degradation warranty "
+    "installation capacity grid storage battery inverter tracking rooftop utility scale"
+).split()
+
+
+def text(rng: random.Random, chars: int) -> str:
+    # pseudo-random prose so compression ratios are realistic
+    words = []
+    size = 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+def make_state(subquestions: int = 6, results_per_query: int = 5, report_chars: int = 8000) -> dict:
+    rng = random.Random(0)
+    search_results = [
+        {
+            "query": f"subquestion {q}",
+            "results": [
+                {
+                    "url": f"https://site{q}-{r}.com/article",
+                    "title": f"Article {q}-{r}",
+                    "content": text(rng, 500),
+                    "raw_content": text(rng, 6000),
+                    "score": 0.8,
+                }
+                for r in range(results_per_query)
+            ],
+        }
+        for q in range(subquestions)
+    ]
+    sources = [
+        {"url": r["url"], "title": r["title"], "domain": r["url"][8:-8], "snippet": r["content"][:500],
+         "subquestion": sr["query"], "score": 0.8}
+        for sr in search_results for r in sr["results"][:2]
+    ][:8]
+    report = text(rng, report_chars)
+    return {
+        "messages": [
+            {"role": "user", "content": "How efficient are solar panels?"},
+            {"role": "assistant", "content": "Planned 6 subquestions."},
+            {"role": "assistant", "content": report},
+        ],
+        "query": "How efficient are solar panels?",
+        "plan": [sr["query"] for sr in search_results],
+        "outline": ["Background", "Efficiency", "Outlook"],
+        "search_results": search_results,
+        "sources": sources,
+        "notes": [
+            {"source_url": s["url"], "bullets": [text(rng, 120) for _ in range(4)], "quote": None, "relevance": "high"}
+            for s in sources
+        ],
+        "chunks": {s["url"]: [text(rng, 1200) for _ in range(5)] for s in sources},
+        "report_draft": report,
+        "report": report,
+        "verification_spec": None,
+        "verification_results": None,
+        "status": "complete",
+        "error": None,
+        "report_style": "default",
+        "metrics": {},
+    }
+
+
+def timed(fn, repeat: int) -> tuple[object, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subquestions", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    state = make_state(args.subquestions)
+    rows = []
+
+    data, dump_ms = timed(lambda: json.dumps(state).encode(), args.repeat)
+    _, load_ms = timed(lambda: json.loads(data), args.repeat)
+    rows.append(("json", len(data), 0, dump_ms, load_ms))
+
+    for compress in (False, True):
+        name = "msgpack+zstd" if compress else "msgpack"
+        data, dump_ms = timed(lambda: dumps_state(state, compress=compress), args.repeat)
+        _, load_ms = timed(lambda: loads_state(data), args.repeat)
+        rows.append((name, len(data), 0, dump_ms, load_ms))
+
+        blobs = BlobStore()
+        data, dump_ms = timed(lambda: dumps_state(state, blobs, compress=compress), args.repeat)
+        _, load_ms = timed(lambda: loads_state(data, blobs), args.repeat)
+        rows.append((f"{name} + blobs", len(data), blobs.nbytes, dump_ms, load_ms))
+
+    # checkpoint footprint: every channel value of the final state through the serializer
+    serde = CompactSerializer()
+    checkpoint_bytes = sum(len(serde.dumps_typed(v)[1]) for v in state.values())
+    plain_bytes = sum(len(serde.inner.dumps_typed(v)[1]) for v in state.values())
+
+    print(f"{'format':<22}{'state bytes':>12}{'blob bytes':>12}{'dump ms':>10}{'load ms':>10}")
+    for name, size, blob_bytes, dump_ms, load_ms in rows:
+        print(f"{name:<22}{size:>12,}{blob_bytes:>12,}{dump_ms:>10.3f}{load_ms:>10.3f}")
+    print(f"\ncheckpoint channels: {plain_bytes:,} bytes plain msgpack -> "
+          f"{checkpoint_bytes:,} inline + {serde.blobs.nbytes:,} blob bytes (compact serializer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Shared test fixtures.
+
+`fake_llm` swaps the OpenAI chat model for a deterministic offline chat model so the full
+graph can run with stub search and no API keys.
+"""
+
+import json
+import os
+import re
+from typing import ClassVar
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def _query_from(messages) -> str:
+    # pull the research query line out of the user prompt(s)
+    text = "\n".join(m.content for m in messages[1:])
+    match = re.search(r"query: (.+)", text)
+    return match.group(1).strip() if match else "the topic"
+
+
+def fake_response(messages) -> str:
+    # canned responses keyed on the system prompt of each node
+    system = messages[0].content if messages else ""
+    query = _query_from(messages)
+
+    if "research planning assistant" in system:
+        return json.dumps({
+            "subquestions": [f"{query} basics", f"{query} details"],
+            "outline": ["Background", "Analysis"],
+        })
+    if "extracting factual information" in system:
+        return json.dumps({
+            "bullets": [f"Fact about {query}."],
+            "quote": None,
+            "relevance": "Directly relevant.",
+            "caveats": [],
+        })
+    if "verification specialist" in system:
+        return json.dumps({
+            "claims": [
+                {
+                    "claim": f"{query} is well documented",
+                    "source_in_draft": "Key Findings",
+                    "verification_query": f"{query} documentation",
+                },
+            ],
+            "verification_focus": "accuracy",
+        })
+    return (
+        f"# Report: {query}\n\n"
+        f"**TL;DR**: A short answer about {query} [1].\n\n"
+        f"**Key Findings**:\n- {query} is well documented [1].\n\n"
+        f"**Sources**\n[1] Stub Result 1"
+    )
+
+
+def _prompt(messages) -> str:
+    return "".join(f"<{m.type}>{m.content}" for m in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    # offline chat model; every instance logs into the class-level `calls`
+    # usage reports prompt "tokens" (chars / 4) and, like a provider prompt cache,
+    # counts the longest prefix shared with an earlier call to the same model as cached
+
+    model: str = "fake"
+    calls: ClassVar[list] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _usage(self, messages) -> dict:
+        prompt = _prompt(messages)
+        earlier = [_prompt(m) for model, m in type(self).calls if model == self.model]
+        cached = max((len(os.path.commonprefix([prompt, p])) for p in earlier), default=0)
+        type(self).calls.append((self.model, messages))
+        return {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": 0,
+            "total_tokens": len(prompt) // 4,
+            "input_token_details": {"cache_read": cached // 4},
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        usage = self._usage(messages)
+        message = AIMessage(content=fake_response(messages), usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        usage = self._usage(messages)
+        content = fake_response(messages)
+        for i in range(0, len(content), 16):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[i:i + 16]))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Patch the graph's chat model with FakeChatModel and return the class."""
+    import agent.graph
+
+    class Recorder(FakeChatModel):
+        calls: ClassVar[list] = []
+
+    monkeypatch.setattr(agent.graph, "chat_model", lambda model, **kw: Recorder(model=model, **kw))
+    return Recorder
+
+
+def calls_for(recorder, marker: str) -> list:
+    # LLM calls whose system prompt contains `marker`
+    return [m for _, m in recorder.calls if marker in m[0].content]
@@ -0,0 +1,97 @@
+"""Tests for run budgets and graceful degradation."""
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_budget_accounting_and_policy():
+    """Searches are capped, call estimates track observed calls, and the policy degrades in order."""
+    from agent.budget import Budget
+
+    clock = FakeClock()
+    budget = Budget(deadline_s=60, max_search_calls=4, clock=clock)
+    assert Budget.from_options() is None
+    with pytest.raises(ValueError):
+        Budget(max_tokens=0)
+
+    # searches: 2 kept back for CoVe verification
+    assert budget.plan_size(6, cove=True) == (2, "searches")
+    assert budget.plan_size(6, cove=False) == (4, "searches")
+    assert [budget.take_search() for _ in range(5)] == [True] * 4 + [False]
+    assert budget.summary()["denied_searches"] == 1
+    assert budget.gap_searches(2, cove=False) == (0, "searches")
+
+    # 2 s calls with 40 s left: 20 calls, less report + CoVe reserve
+    budget = Budget(deadline_s=60, clock=clock)
+    clock.now = 20.0
+    budget.observe_call(2.0, 1000)
+    assert budget.source_count(8, cove=False) == (8, None)
+    assert budget.source_count(20, cove=True) == (11, "deadline")
+    assert budget.extraction_degraded(sources_cut=False) == (False, None)  # a third of the time used
+    assert budget.extraction_degraded(sources_cut=True) == (True, "deadline")
+    assert budget.cove_affordable() == (True, None)
+    assert budget.gap_searches(3, cove=False) == (3, None)
+    assert budget.gap_searches(8, cove=True) == (5, "deadline")  # two extractions per gap search
+    clock.now = 55.0
+    assert budget.cove_affordable() == (False, "deadline")
+    assert budget.gap_searches(3, cove=False) == (0, "deadline")
+
+
+def test_unbudgeted_run_has_no_degradations(fake_llm):
+    """Without limits the run is unchanged and records nothing."""
+    from agent.graph import run_research
+
+    result = run_research(query="What is wind power?", search_provider="stub", enable_cove=True)
+
+    assert result["degradations"] == []
+    assert "budget" not in result["metrics"]
+    assert result["verification_results"]
+
+
+def test_search_budget_trims_plan_and_keeps_searches_for_cove(fake_llm):
+    """A search budget plans fewer subquestions and still verifies with what it kept back."""
+    from agent.graph import run_research
+
+    result = run_research(query="What is solar power?", search_provider="stub", enable_cove=True, max_search_calls=3)
+
+    assert len(result["plan"]) == 1
+    assert result["degradations"][0] == {
+        "stage": "plan", "action": "fewer_subquestions", "reason": "searches", "requested": 6, "used": 1,
+    }
+    assert result["metrics"]["budget"]["search_calls"] <= 3
+    assert result["metrics"]["search_calls"] == result["metrics"]["budget"]["search_calls"]
+    assert result["verification_results"]
+    assert result["report"]
+
+
+def test_exhausted_deadline_degrades_everything_but_returns_a_report(fake_llm):
+    """Past the deadline the run cuts every optional stage and the draft becomes the report."""
+    from agent.graph import run_research
+    from tests.conftest import calls_for
+
+    result = run_research(
+        query="What is hydro power?",
+        search_provider="stub",
+        enable_cove=True,
+        draft_model="big",
+        verify_model="mini",
+        deadline_s=1e-6,
+    )
+
+    actions = [d["action"] for d in result["degradations"]]
+    assert actions == ["fewer_subquestions", "fewer_sources", "smaller_extraction_model", "skipped_cove"]
+    assert all(d["reason"] == "deadline" for d in result["degradations"])
+    assert len(result["plan"]) == 1
+    assert len(result["sources"]) == 1
+    assert {model for model, messages in fake_llm.calls if "extracting factual information" in messages[0].content} == {"mini"}
+    assert not calls_for(fake_llm, "verification specialist")
+    assert result["status"] == "complete"
+    assert result["report"] == result["report_draft"]
+    assert result["report"].startswith("# Report")
@@ -0,0 +1,80 @@
+"""Tests for record/replay cassettes of LLM and search I/O."""
+
+import time
+
+import pytest
+
+
+def _no_live_clients(monkeypatch):
+    # replay must not build a chat model or search provider
+    import agent.graph
+
+    def fail(*args, **kwargs):
+        raise AssertionError("live client built during replay")
+
+    monkeypatch.setattr(agent.graph, "chat_model", fail)
+    monkeypatch.setattr(agent.graph, "get_search_provider", fail)
+
+
+def test_record_then_replay_offline(fake_llm, monkeypatch, tmp_path):
+    """A recorded run replays to the same report with no live model or search."""
+    from agent.cassette import Cassette, CassetteMiss
+    from agent.graph import run_research
+
+    path = tmp_path / "run.cassette"
+    recorder = Cassette(path, mode="record")
+    recorded = run_research(query="What is nuclear fusion?", search_provider="stub", enable_cove=True, cassette=recorder)
+    recorder.save()
+    kinds = {i["kind"] for i in recorder.interactions}
+    assert kinds == {"chat", "search"}
+
+    _no_live_clients(monkeypatch)
+    replayed = run_research(
+        query="What is nuclear fusion?",
+        search_provider="stub",
+        enable_cove=True,
+        cassette=Cassette(path, latency="zero"),
+    )
+    assert replayed["report"] == recorded["report"]
+    assert replayed["sources"] == recorded["sources"]
+    assert replayed["metrics"]["input_tokens"] == recorded["metrics"]["input_tokens"]
+
+    with pytest.raises(CassetteMiss):
+        run_research(query="Something else", search_provider="stub", cassette=Cassette(path, latency="zero"))
+
+
+def test_replay_latency_modes(fake_llm, monkeypatch, tmp_path):
+    """Original latency reproduces recorded waits; zero latency skips them."""
+    import agent.graph
+    from agent.cassette import Cassette
+    from agent.graph import run_research
+
+    class Slow(fake_llm):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(0.05)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            for chunk in super()._stream(messages, stop, run_manager, **kwargs):
+                time.sleep(0.005)
+                yield chunk
+
+    monkeypatch.setattr(agent.graph, "chat_model", lambda model, **kw: Slow(model=model))
+    path = tmp_path / "slow.cassette"
+    recorder = Cassette(path, mode="record")
+    config = dict(query="What is ocean thermal energy?", search_provider="stub", enable_cove=False)
+    start = time.perf_counter()
+    run_research(**config, cassette=recorder)
+    recorded_s = time.perf_counter() - start
+    recorder.save()
+
+    _no_live_clients(monkeypatch)
+    start = time.perf_counter()
+    run_research(**config, cassette=Cassette(path, latency="original"))
+    original_s = time.perf_counter() - start
+    start = time.perf_counter()
+    run_research(**config, cassette=Cassette(path, latency="zero"))
+    zero_s = time.perf_counter() - start
+
+    assert original_s >= 0.8 * recorded_s
+    assert zero_s < 0.5 * original_s
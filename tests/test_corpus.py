@@ -0,0 +1,80 @@
+"""Tests for the local corpus index and search provider."""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "energy").mkdir(parents=True)
+    (docs / "energy" / "geothermal.md").write_text(
+        "# Geothermal Power\n\nGeothermal plants convert heat from the earth's crust into electricity.\n"
+        "Iceland produces about a quarter of its electricity from geothermal sources.\n"
+    )
+    (docs / "energy" / "solar.txt").write_text(
+        "Solar panels convert sunlight into electricity.\n\nPerovskite cells reached 26 percent efficiency.\n"
+    )
+    (docs / "tides.html").write_text(
+        "<html><head><title>Tidal Energy</title><style>p {}</style></head>"
+        "<body><nav>menu</nav><p>Tidal barrages capture energy from the rise and fall of the sea.</p></body></html>"
+    )
+    (docs / "image.png").write_bytes(b"\x89PNG")
+    long_text = " ".join(["filler text about unrelated matters."] * 60) + " The hydrogen electrolyzer splits water."
+    (docs / "long.txt").write_text(long_text)
+    return docs
+
+
+def test_build_and_search(corpus, tmp_path):
+    """BM25 search ranks the matching document first and returns url/title/content."""
+    from agent.corpus import LocalIndex, build_index
+
+    stats = build_index(corpus, tmp_path / "index", chunk_chars=400)
+    assert stats["documents"] == 4
+    assert stats["passages"] >= 4
+
+    index = LocalIndex(tmp_path / "index")
+    assert isinstance(index.post_ids, np.memmap)
+
+    results = index.search("geothermal electricity Iceland", max_results=3)
+    assert results[0]["title"] == "Geothermal Power"
+    assert results[0]["url"].startswith("file://") and results[0]["url"].endswith("geothermal.md")
+    assert "Iceland" in results[0]["content"]
+    assert results[0]["score"] == 1.0
+    assert len({r["url"] for r in results}) == len(results)
+
+    (tidal,) = index.search("tidal barrages", max_results=1)
+    assert tidal["title"] == "Tidal Energy"
+    assert "menu" not in tidal["raw_content"]
+    assert index.search("zeppelin") == []
+
+
+def test_snippet_centers_on_matches(corpus, tmp_path):
+    """Snippets of long passages are windows around the query terms."""
+    from agent.corpus import LocalIndex, build_index
+
+    build_index(corpus, tmp_path / "index", chunk_chars=5000)
+    (result,) = LocalIndex(tmp_path / "index").search("hydrogen electrolyzer", max_results=1)
+    assert "hydrogen electrolyzer" in result["content"]
+    assert len(result["content"]) <= 330
+    assert result["content"].startswith("…")
+
+
+def test_local_provider_in_graph(corpus, tmp_path, fake_llm):
+    """--search-provider local runs the graph on the index with no web search."""
+    from agent.corpus import build_index
+    from agent.graph import run_research
+    from agent.search import get_search_provider
+
+    with pytest.raises(ValueError):
+        get_search_provider("local", local_index=str(tmp_path / "missing"))
+
+    build_index(corpus, tmp_path / "index")
+    result = run_research(
+        query="How does geothermal power work?",
+        search_provider="local",
+        local_index=str(tmp_path / "index"),
+        enable_cove=False,
+        min_source_relevance=0.0,
+    )
+    assert any(s["url"].endswith("geothermal.md") for s in result["sources"])
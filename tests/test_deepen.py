@@ -0,0 +1,106 @@
+"""Tests for the iterative deepening loop (gap analysis after extraction)."""
+
+import json
+import re
+
+import pytest
+
+import tests.conftest
+
+
+@pytest.fixture
+def topical_run(fake_llm, monkeypatch):
+    """Plan topical outline sections; notes echo what each search result is about; URLs differ per query."""
+    import agent.search
+
+    canned = tests.conftest.fake_response
+
+    def fake_response(messages):
+        system = messages[0].content
+        if "research planning assistant" in system:
+            query = tests.conftest._query_from(messages)
+            return json.dumps({
+                "subquestions": [f"{query} basics"],
+                "outline": ["Background", "Turbine efficiency", "Grid storage"],
+            })
+        if "extracting factual information" in system:
+            about = re.search(r"information about (.+?)\. ", messages[1].content).group(1)
+            return json.dumps({"bullets": [f"Covers {about}."], "quote": None, "relevance": "High."})
+        return canned(messages)
+
+    stub_search = agent.search.StubSearch.search
+
+    def search(self, query, max_results=5):
+        return [{**r, "url": f"{r['url']}/{abs(hash(query))}"} for r in stub_search(self, query, max_results)]
+
+    monkeypatch.setattr(tests.conftest, "fake_response", fake_response)
+    monkeypatch.setattr(agent.search.StubSearch, "search", search)
+    return fake_llm
+
+
+def test_section_coverage():
+    """Coverage is the best single note's share of a section's topic words; generic sections count as covered."""
+    from agent.extract import section_coverage
+
+    notes = [
+        {"source_url": "a", "bullets": ["Turbine efficiency rose 5%."], "quote": None, "relevance": ""},
+        {"source_url": "b", "bullets": ["Battery prices fell."], "quote": "grid operators agree", "relevance": ""},
+    ]
+    coverage = section_coverage(["Background", "Turbine efficiency", "Grid storage", "Offshore wind"], notes)
+    assert coverage == {"Background": 1.0, "Turbine efficiency": 1.0, "Grid storage": 0.5, "Offshore wind": 0.0}
+    assert section_coverage(["Grid storage"], []) == {"Grid storage": 0.0}
+
+
+def test_gap_searches_target_uncovered_sections(topical_run):
+    """One round searches the uncovered sections; the next gap analysis finds them covered and drafts."""
+    from agent.graph import stream_research
+
+    events = list(stream_research(
+        "What is wind power?", search_provider="stub", enable_cove=False, min_unique_domains=1, deepen_rounds=3,
+    ))
+
+    progress = [e["node"] for e in events if e["type"] == "progress"]
+    assert progress == [
+        "plan_research", "run_searches", "select_and_extract", "analyze_gaps",
+        "run_searches", "select_and_extract", "analyze_gaps", "draft_report",
+    ]
+    state = events[-1]["state"]
+    assert [sr["query"] for sr in state["search_results"]] == [
+        "What is wind power? basics",
+        "What is wind power? Turbine efficiency",
+        "What is wind power? Grid storage",
+    ]
+    assert state["coverage"] == {"Background": 1.0, "Turbine efficiency": 1.0, "Grid storage": 1.0}
+    # gap searches run from their own key; the plan keeps the planned subquestions
+    assert state["plan"] == ["What is wind power? basics"]
+    assert state["gap_queries"] == []  # cleared once the gaps converge
+    assert state["metrics"]["deepen_rounds"] == 1 and state["metrics"]["gap_searches"] == 2
+    # the first round's sources plus a couple per gap search
+    assert len(state["sources"]) == 3 + 2 * 2
+    assert state["report"]
+
+
+def test_no_deepening_without_gaps(fake_llm):
+    """Outlines with nothing uncovered go straight to drafting; deepen_rounds=0 has no gap analysis."""
+    from agent.graph import stream_research
+
+    def run(**kwargs):
+        return list(stream_research("What is wind power?", search_provider="stub", enable_cove=False, **kwargs))
+
+    # the canned outline has no topical sections, so there is nothing to deepen
+    events = run(deepen_rounds=2)
+    assert [e.get("node") for e in events].count("analyze_gaps") == 1
+    assert "deepen_rounds" not in events[-1]["state"]["metrics"]
+
+    assert "analyze_gaps" not in [e.get("node") for e in run()]
+
+
+def test_deepening_converges_without_new_coverage(topical_run, monkeypatch):
+    """When gap searches bring nothing that covers a section, the loop stops after one round."""
+    import agent.graph
+    from agent.graph import run_research
+
+    monkeypatch.setattr(agent.graph, "COVERAGE_THRESHOLD", 1.01)  # no section ever counts as covered
+    state = run_research("What is wind power?", search_provider="stub", enable_cove=False, deepen_rounds=5)
+    assert state["metrics"]["deepen_rounds"] == 1
+    assert state["metrics"]["gap_searches"] == 3
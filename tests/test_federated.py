@@ -0,0 +1,145 @@
+"""Tests for federated multi-backend search."""
+
+import time
+
+
+class LocalBackend:
+    # stand-in search backend with a fixed latency and URL set
+    def __init__(self, urls, delay=0.0, fail=False):
+        self.urls = urls
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def search(self, query, max_results=5):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return [{"url": url, "title": url, "content": f"{query} at {url}", "score": 0.5} for url in self.urls[:max_results]]
+
+
+def test_merges_and_dedupes_by_canonical_url():
+    """Results from all backends are interleaved and deduped by canonical URL."""
+    from agent.search import FederatedSearch
+
+    a = LocalBackend(["https://www.a.com/x/", "https://b.com/y"])
+    b = LocalBackend(["https://a.com/x?utm_source=feed", "https://c.com/z"])
+    search = FederatedSearch({"a": a, "b": b}, deadline_s=1.0, min_results=10)
+
+    results = search.search("q", max_results=5)
+    assert [r["url"] for r in results] == ["https://www.a.com/x/", "https://b.com/y", "https://c.com/z"]
+    assert sorted(results[0]["backends"]) == ["a", "b"]
+
+
+def test_returns_without_waiting_for_slow_backend():
+    """Enough results from the fast backend return before the slow one answers."""
+    from agent.search import FederatedSearch
+
+    fast = LocalBackend([f"https://fast.com/{i}" for i in range(5)])
+    slow = LocalBackend(["https://slow.com/1"], delay=0.5)
+    search = FederatedSearch({"slow": slow, "fast": fast}, deadline_s=2.0)
+
+    start = time.perf_counter()
+    results = search.search("q", max_results=5)
+    assert time.perf_counter() - start < 0.3
+    assert len(results) == 5
+    assert search.stats()["slow"]["late"] == 1
+
+
+def test_deadline_and_latency_tracking():
+    """At the deadline partial results return; a backend slower than the deadline is then skipped."""
+    from agent.search import FederatedSearch
+
+    fast = LocalBackend(["https://fast.com/1"], delay=0.01)
+    slow = LocalBackend(["https://slow.com/1", "https://slow.com/2"], delay=0.3)
+    broken = LocalBackend([], fail=True)
+    search = FederatedSearch({"fast": fast, "slow": slow, "broken": broken}, deadline_s=0.1, probe_every=100)
+
+    start = time.perf_counter()
+    results = search.search("q", max_results=5)
+    assert time.perf_counter() - start < 0.25
+    assert [r["url"] for r in results] == ["https://fast.com/1"]
+
+    time.sleep(0.35)  # let the slow backend finish & be measured
+    stats = search.stats()
+    assert stats["fast"]["latency_s"] < stats["slow"]["latency_s"]
+    assert stats["broken"]["errors"] == 1
+    assert search.ranked()[-1] == "slow"
+
+    search.search("q2", max_results=5)
+    assert slow.calls == 1
+    assert search.stats()["slow"]["skipped"] == 1
+
+
+def test_failures_are_logged_and_all_failing_raises(caplog):
+    """Each backend failure is logged; a search fails only when every backend does; close() stops the pool."""
+    import logging
+
+    import pytest
+
+    from agent.search import FederatedSearch
+
+    search = FederatedSearch({"ok": LocalBackend(["https://a.com/1"]), "broken": LocalBackend([], fail=True)})
+    with caplog.at_level(logging.WARNING, logger="agent.search"):
+        assert [r["url"] for r in search.search("q", max_results=5)] == ["https://a.com/1"]
+    assert "search backend broken failed for 'q': RuntimeError: backend down" in caplog.text
+
+    down = FederatedSearch({"a": LocalBackend([], fail=True), "b": LocalBackend([], fail=True)})
+    with pytest.raises(RuntimeError, match="All search backends failed"):
+        down.search("q")
+
+    search.close()
+    with pytest.raises(RuntimeError):
+        search.pool.submit(print)
+
+
+def test_federated_provider_config(monkeypatch):
+    """'a+b' provider strings build a FederatedSearch over both backends."""
+    import pytest
+
+    from agent.search import FederatedSearch, StubSearch, TavilySearch, get_search_provider
+
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    provider = get_search_provider("tavily+stub", deadline_s=1.5)
+    assert isinstance(provider, FederatedSearch)
+    assert provider.deadline_s == 1.5
+    assert isinstance(provider.backends["tavily"], TavilySearch)
+    assert isinstance(provider.backends["stub"], StubSearch)
+
+    with pytest.raises(ValueError):
+        get_search_provider("stub+stub")
+    with pytest.raises(ValueError):
+        get_search_provider("stub+nope")
+
+
+def test_federated_search_in_graph(fake_llm, monkeypatch):
+    """The graph runs on a federated provider; merged results feed source selection."""
+    import agent.graph
+    from agent.graph import run_research
+    from agent.search import FederatedSearch
+
+    backends = {
+        "one": LocalBackend([f"https://one{i}.org/page" for i in range(3)]),
+        "two": LocalBackend([f"https://two{i}.net/page" for i in range(3)], delay=0.05),
+    }
+    monkeypatch.setattr(agent.graph, "get_search_provider", lambda *a, **k: FederatedSearch(backends, min_results=6))
+
+    result = run_research(query="What is hydropower?", search_provider="one+two", enable_cove=False)
+    domains = {s["domain"] for s in result["sources"]}
+    assert any(d.startswith("one") for d in domains) and any(d.startswith("two") for d in domains)
+
+
+def test_run_closes_the_graph_it_builds(fake_llm, monkeypatch):
+    """A graph built for one run is closed when the run ends; a graph passed in is left open."""
+    from agent.graph import ResearchAgent, build_graph, run_research, stream_research
+
+    closed = []
+    monkeypatch.setattr(ResearchAgent, "close", lambda self: closed.append(self))
+
+    run_research("What is wind power?", search_provider="stub", enable_cove=False)
+    assert len(closed) == 1
+
+    graph = build_graph(search_provider="stub", enable_cove=False)
+    list(stream_research("What is wind power?", graph=graph, search_provider="stub", enable_cove=False))
+    assert len(closed) == 1
@@ -0,0 +1,190 @@
+"""
+Page fetcher tests - run against a local HTTP fixture server
+"""
+
+import gzip
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ARTICLE = """<html><head><title>Solar</title><style>body {color: red}</style>
+<script>var tracking = "ignore me entirely please";</script></head>
+<body><nav><a href="/">Home</a> <a href="/about">About us and other links here</a></nav>
+<article><h1>Solar power</h1>
+<p>Solar panels convert sunlight into electricity using photovoltaic cells.</p>
+<p>Modern panels reach efficiencies above twenty percent in field conditions.</p></article>
+<footer>Copyright 2026 Example Corp all rights reserved</footer></body></html>"""
+
+HUGE_BYTES = 20 * 1024 * 1024
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    hits: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        FixtureHandler.hits[self.path] = FixtureHandler.hits.get(self.path, 0) + 1
+        if self.path == "/article":
+            body = ARTICLE.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/gzip":
+            body = gzip.compress(ARTICLE.encode())
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/huge":
+            # 20 MB page streamed in 64 KB blocks
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(HUGE_BYTES))
+            self.end_headers()
+            block = b"<p>" + b"word " * 13100 + b"</p>"
+            sent = 0
+            try:
+                while sent < HUGE_BYTES:
+                    piece = block[:HUGE_BYTES - sent]
+                    self.wfile.write(piece)
+                    sent += len(piece)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        elif self.path == "/truncated":
+            # plain text whose last character is cut off mid-sequence
+            body = "Caf\u00e9 owners say solar panels cut their power bills.".encode() + "\u00e9".encode()[:1]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/binary":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.end_headers()
+            self.wfile.write(b"%PDF")
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+@pytest.fixture
+def fixture_server():
+    FixtureHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_strips_boilerplate(fixture_server):
+    """Article text is kept; scripts, nav and footer are dropped; gzip is decoded."""
+    from agent.fetch import PageFetcher
+
+    pages = PageFetcher().fetch_all([
+        f"{fixture_server}/article",
+        f"{fixture_server}/gzip",
+        f"{fixture_server}/missing",
+        f"{fixture_server}/binary",
+    ])
+
+    assert set(pages) == {f"{fixture_server}/article", f"{fixture_server}/gzip"}
+    text = "\n".join(pages[f"{fixture_server}/article"])
+    assert "photovoltaic cells" in text
+    assert "twenty percent" in text
+    assert "tracking" not in text
+    assert "About us" not in text
+    assert "Copyright" not in text
+    assert pages[f"{fixture_server}/gzip"] == pages[f"{fixture_server}/article"]
+
+
+def test_huge_page_is_capped(fixture_server):
+    """A 20 MB page is read only up to max_bytes and never held in memory whole."""
+    from agent.fetch import PageFetcher
+
+    fetcher = PageFetcher(max_bytes=512 * 1024, chunk_chars=1000)
+    tracemalloc.start()
+    pages = fetcher.fetch_all([f"{fixture_server}/huge"])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    chunks = pages[f"{fixture_server}/huge"]
+    assert all(len(c) <= 1000 for c in chunks)
+    assert sum(len(c) for c in chunks) <= 512 * 1024
+    assert peak < 8 * 1024 * 1024
+
+
+def test_page_cache_avoids_refetch(fixture_server, tmp_path):
+    """Second fetch of a page is served from the compressed on-disk cache."""
+    from agent.fetch import PageFetcher
+
+    url = f"{fixture_server}/article"
+    first = PageFetcher(cache_dir=tmp_path).fetch_all([url])
+    second = PageFetcher(cache_dir=tmp_path).fetch_all([url])
+
+    assert first == second
+    assert FixtureHandler.hits["/article"] == 1
+    assert list(tmp_path.rglob("*.txt.gz"))
+
+
+def test_fetcher_reuses_its_client(fixture_server):
+    """Calls share one pooled client on the fetcher's loop; close() stops it and a later fetch starts over."""
+    from agent.fetch import PageFetcher
+
+    fetcher = PageFetcher()
+    first = fetcher.fetch_all([f"{fixture_server}/article"])
+    client = fetcher._client
+    assert fetcher.fetch_all([f"{fixture_server}/gzip"])
+    assert fetcher._client is client
+
+    fetcher.close()
+    assert client.is_closed and fetcher._loop is None
+    assert fetcher.fetch_all([f"{fixture_server}/article"]) == first
+    fetcher.close()
+
+
+def test_decoder_is_flushed_at_end_of_stream(fixture_server):
+    """A character cut off at the end of the body is decoded (as U+FFFD), not dropped."""
+    from agent.fetch import PageFetcher
+
+    fetcher = PageFetcher()
+    (text,) = fetcher.fetch_all([f"{fixture_server}/truncated"])[f"{fixture_server}/truncated"]
+    fetcher.close()
+    assert text == "Caf\u00e9 owners say solar panels cut their power bills.\ufffd"
+
+
+def test_concurrent_cache_writes(tmp_path):
+    """Concurrent writers of one page each use their own temp file; no temp files are left behind."""
+    from agent.fetch import PageCache
+
+    cache = PageCache(tmp_path)
+    threads = [threading.Thread(target=cache.put, args=("https://a.com/page", f"text {i}")) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.get("https://a.com/page").startswith("text ")
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_chunk_text_respects_limit():
+    """Chunks follow paragraph boundaries and never exceed max_chars."""
+    from agent.fetch import chunk_text
+
+    text = "\n\n".join(["Short paragraph here."] * 5 + ["Long sentence number one. " * 40])
+    chunks = chunk_text(text, max_chars=200)
+
+    assert all(len(c) <= 200 for c in chunks)
+    assert chunks[0].startswith("Short paragraph here.\n\nShort paragraph here.")
+    assert "".join(chunks).count("Long sentence number one.") == 40
@@ -0,0 +1,56 @@
+"""
+Follow-up research tests - reuse of a previous run's state
+"""
+
+from tests.conftest import calls_for
+
+
+def test_followup_reuses_previous_state(fake_llm):
+    """Follow-up searches only new subquestions and keeps prior sources & notes."""
+    from agent.graph import run_research
+
+    first = run_research(query="What is solar power?", search_provider="stub", enable_cove=False)
+    fake_llm.calls.clear()
+
+    result = run_research(
+        query="How efficient are solar panels?",
+        previous=first,
+        search_provider="stub",
+        enable_cove=False,
+    )
+
+    assert result["status"] == "complete"
+    assert result["parent_run_id"] == first["run_id"]
+    assert result["previous_queries"] == ["What is solar power?"]
+
+    prior_queries = {sr["query"] for sr in first["search_results"]}
+    new_queries = [sr["query"] for sr in result["search_results"] if sr["query"] not in prior_queries]
+    assert len(result["search_results"]) == len(first["search_results"]) + len(new_queries)
+    assert new_queries == result["plan"]
+
+    # prior sources & notes are kept as-is; only sources not seen before are extracted
+    assert result["sources"][:len(first["sources"])] == first["sources"]
+    assert result["notes"][:len(first["notes"])] == first["notes"]
+    new_sources = len(result["sources"]) - len(first["sources"])
+    assert len(calls_for(fake_llm, "extracting factual information")) == new_sources
+
+
+def test_followup_by_run_id(fake_llm, tmp_path):
+    """A stored run ID can be followed up on."""
+    from agent.graph import run_research
+    from agent.runs import RunStore
+
+    store = RunStore(tmp_path)
+    first = run_research(query="What is wind power?", run_store=store, search_provider="stub", enable_cove=False)
+    assert store.path_for(first["run_id"]).exists()
+
+    result = run_research(
+        query="Where is wind power growing?",
+        previous=first["run_id"],
+        run_store=store,
+        search_provider="stub",
+        enable_cove=False,
+    )
+
+    assert result["parent_run_id"] == first["run_id"]
+    assert result["notes"][:len(first["notes"])] == first["notes"]
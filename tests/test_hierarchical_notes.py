@@ -0,0 +1,88 @@
+"""Tests for hierarchical (map-reduce) note aggregation."""
+
+import re
+
+import pytest
+
+import tests.conftest
+
+
+def _note(url, bullet="Fact."):
+    return {"source_url": url, "bullets": [bullet], "quote": None, "relevance": ""}
+
+
+def test_cluster_notes_and_citations():
+    """Notes group by their source's subquestion, big groups split evenly; citations are parsed."""
+    from agent.extract import cited_numbers, cluster_notes
+
+    sources = [{"url": f"u{i}", "subquestion": "a" if i < 5 else "b"} for i in range(7)]
+    notes = [_note(f"u{i}") for i in range(7)] + [_note("elsewhere")]
+    clusters = cluster_notes(notes, sources, max_size=3)
+    assert [(topic, len(group)) for topic, group in clusters] == [("a", 3), ("a", 2), ("b", 2), ("Other", 1)]
+    assert cited_numbers("x [1], y [2, 10] and [3][4]; not [a]") == {1, 2, 3, 4, 10}
+
+
+@pytest.fixture
+def digester(fake_llm, monkeypatch):
+    """Digests cite the sources of the notes they were given (or `cite`, when set); URLs differ per query."""
+    import agent.search
+
+    canned = tests.conftest.fake_response
+    stub_search = agent.search.StubSearch.search
+    options = {"cite": None}
+
+    def fake_response(messages):
+        if "condense research notes" in messages[0].content:
+            topic = re.search(r"Subquestion: (.+)", messages[1].content).group(1)
+            cited = options["cite"] or sorted(set(re.findall(r"^\[(\d+)\]", messages[1].content, re.M)))
+            return f"- Digest of {topic} " + " ".join(f"[{n}]" for n in cited)
+        return canned(messages)
+
+    def search(self, query, max_results=5):
+        return [{**r, "url": f"{r['url']}/{abs(hash(query))}"} for r in stub_search(self, query, max_results)]
+
+    monkeypatch.setattr(tests.conftest, "fake_response", fake_response)
+    monkeypatch.setattr(agent.search.StubSearch, "search", search)
+    return options
+
+
+def test_writer_sees_digests(digester, fake_llm):
+    """Each subquestion's notes are condensed and the writer gets the digests instead of the notes."""
+    from agent.graph import run_research
+    from tests.conftest import calls_for
+
+    state = run_research(
+        "What is wind power?", search_provider="stub", enable_cove=False,
+        min_unique_domains=1, hierarchical_notes=True,
+    )
+
+    assert state["metrics"]["digest_calls"] == 2
+    assert state["metrics"]["digested_notes"] == 6
+    basics, details = state["note_digests"]
+    assert (basics["topic"], details["topic"]) == ("What is wind power? basics", "What is wind power? details")
+    assert basics["condensed"] and details["condensed"]
+    assert sorted(basics["citations"] + details["citations"]) == [1, 2, 3, 4, 5, 6]
+    (writer,) = calls_for(fake_llm, "research report writer")
+    assert f"### What is wind power? details\n{details['text']}" in writer[1].content
+    assert details["text"].startswith("- Digest of What is wind power? details [")
+    assert "Fact about" not in writer[1].content
+
+
+def test_small_or_uncited_clusters_pass_notes_through(digester, fake_llm):
+    """Clusters below DIGEST_MIN_NOTES, and digests citing none of their sources, keep the raw notes."""
+    from agent.graph import run_research
+
+    digester["cite"] = ["9"]
+    state = run_research(
+        "What is wind power?", search_provider="stub", enable_cove=False,
+        min_unique_domains=1, hierarchical_notes=True,
+    )
+    assert state["metrics"]["digest_calls"] == 2
+    assert not any(d["condensed"] for d in state["note_digests"])
+    assert "Fact about" in state["note_digests"][0]["text"]
+
+    state = run_research(
+        "What is solar power?", search_provider="stub", enable_cove=False, hierarchical_notes=True,
+    )  # one source per subquestion (domain cap)
+    assert state["metrics"]["digest_calls"] == 0
+    assert [d["citations"] for d in state["note_digests"]] == [[1], [2]]
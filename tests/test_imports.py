@@ -0,0 +1,54 @@
+"""Cold-start tests: the package & CLI import without the heavy dependencies."""
+
+import subprocess
+import sys
+
+HEAVY = ("langchain_openai", "openai", "langgraph", "tavily", "numpy", "httpx", "agent.fetch")
+
+
+def _loaded(stmt: str) -> set[str]:
+    # run `stmt` in a fresh interpreter; the heavy modules it loaded
+    code = (
+        "import os, sys\n"
+        "os.environ.setdefault('OPENAI_API_KEY', 'sk-test')\n"
+        f"{stmt}\n"
+        f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return set(out.split())
+
+
+def test_import_agent_is_lightweight():
+    """import agent, the state types, the CLI, run store, worker & graph cache load no heavy dependency."""
+    for stmt in (
+        "import agent",
+        "from agent import ResearchState, Note",
+        "import agent.cli",
+        "import agent.runs",
+        "import agent.worker",
+        "from agent.graphs import GraphCache; GraphCache()",
+    ):
+        heavy = _loaded(stmt)
+        assert not heavy, f"{stmt} loaded {heavy}"
+
+
+def test_lazy_public_api():
+    """Public names resolve on first access; unknown names still raise."""
+    import pytest
+
+    import agent
+    from agent.graph import build_graph
+
+    assert agent.build_graph is build_graph
+    assert "run_research" in dir(agent)
+    with pytest.raises(AttributeError):
+        agent.not_a_name
+
+
+def test_page_fetcher_loads_only_when_enabled():
+    """The graph imports agent.fetch only for graphs built with fetch_pages (or use_raw_content)."""
+    for stmt, loaded in (
+        ("from agent.graph import build_graph; build_graph(search_provider='stub')", False),
+        ("from agent.graph import build_graph; build_graph(search_provider='stub', fetch_pages=True)", True),
+    ):
+        assert ("agent.fetch" in _loaded(stmt)) == loaded, stmt
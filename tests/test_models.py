@@ -0,0 +1,92 @@
+"""Tests for per-node model selection and the model router."""
+
+
+def test_node_model_map_defaults_and_overrides():
+    """Draft model everywhere but CoVe compile; overrides win; unknown nodes rejected."""
+    import pytest
+
+    from agent.models import node_model_map
+
+    models = node_model_map("big", "small", {"extractor": "mini"})
+    assert models == {
+        "planner": "big",
+        "extractor": "mini",
+        "digester": "big",
+        "writer": "big",
+        "cove_compiler": "small",
+        "reviser": "big",
+    }
+    with pytest.raises(ValueError):
+        node_model_map("big", "small", {"extracter": "mini"})
+
+
+def test_load_model_config(tmp_path):
+    """JSON and TOML config files give node models and router settings."""
+    from agent.models import load_model_config, parse_node_models
+
+    (tmp_path / "models.toml").write_text('[models]\nextractor = "mini"\n\n[router]\nfast_model = "mini"\n')
+    (tmp_path / "models.json").write_text('{"models": {"writer": "big"}}')
+
+    assert load_model_config(tmp_path / "models.toml") == {
+        "node_models": {"extractor": "mini"},
+        "router": {"fast_model": "mini"},
+    }
+    assert load_model_config(tmp_path / "models.json") == {"node_models": {"writer": "big"}, "router": None}
+    assert parse_node_models(["extractor=mini", " writer = big "]) == {"extractor": "mini", "writer": "big"}
+
+
+def test_router_token_and_latency_rules():
+    """Small prompts go fast; mid-size ones only once the node's model is observed slow."""
+    from agent.models import ModelRouter
+
+    router = ModelRouter(fast_model="mini", small_tokens=100, max_fast_tokens=1000, latency_budget_s=2.0)
+    assert router.choose("extractor", "big", 50) == "mini"
+    assert router.choose("extractor", "big", 500) == "big"
+    assert router.choose("writer", "big", 50) == "big"  # not a routed node
+
+    router.observe("big", 5.0)
+    router.observe("mini", 0.5)
+    assert router.choose("extractor", "big", 500) == "mini"
+    assert router.choose("extractor", "big", 5000) == "big"  # too large for the fast model
+    assert router.stats()["routed"] == 2
+
+
+def test_run_uses_node_models(fake_llm):
+    """Each node calls its configured model and calls are counted per model."""
+    from agent.graph import run_research
+    from tests.conftest import calls_for
+
+    result = run_research(
+        query="What is geothermal energy?",
+        search_provider="stub",
+        enable_cove=False,
+        draft_model="big",
+        node_models={"extractor": "mini"},
+    )
+
+    def is_extract(messages):
+        return "extracting factual information" in messages[0].content
+
+    assert {model for model, messages in fake_llm.calls if is_extract(messages)} == {"mini"}
+    assert {model for model, messages in fake_llm.calls if not is_extract(messages)} == {"big"}
+    assert result["metrics"]["model_calls"]["mini"] == len(calls_for(fake_llm, "extracting factual information"))
+    assert result["metrics"]["model_calls"]["big"] == 2  # planner + writer
+
+
+def test_router_sends_snippet_extraction_to_fast_model(fake_llm):
+    """With a router, snippet-sized extraction prompts go to the fast model."""
+    from agent.graph import run_research
+
+    result = run_research(
+        query="What is tidal power?",
+        search_provider="stub",
+        enable_cove=False,
+        draft_model="big",
+        router={"fast_model": "mini"},
+    )
+    assert set(result["metrics"]["model_calls"]) == {"big", "mini"}
+    assert all(
+        model == "mini"
+        for model, messages in fake_llm.calls
+        if "extracting factual information" in messages[0].content
+    )
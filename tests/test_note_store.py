@@ -0,0 +1,58 @@
+"""
+Note store tests - cached extraction keyed by URL, content and intent
+"""
+
+import time
+
+from tests.conftest import calls_for
+
+NOTE = {"source_url": "https://en.wikipedia.org/wiki/AI", "bullets": ["AI is a field."], "quote": None, "relevance": "high"}
+
+
+def test_hit_on_canonical_url_and_same_intent(tmp_path):
+    """Non-canonical URL variants and same-intent queries share an entry."""
+    from agent.note_store import NoteStore
+
+    store = NoteStore(tmp_path / "notes.sqlite")
+    store.put(NOTE["source_url"], "AI is a field.", "What is AI?", NOTE)
+
+    hit = store.get("https://www.en.wikipedia.org/wiki/AI/?utm_source=x#intro", "AI  is a field.", "Explain machine learning")
+    assert hit is not None
+    assert hit["bullets"] == NOTE["bullets"]
+    assert hit["source_url"].endswith("#intro")
+
+    assert store.get(NOTE["source_url"], "Changed content.", "What is AI?") is None
+    assert store.get(NOTE["source_url"], "AI is a field.", "Compare AI vs ML") is None
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    """Expired entries miss; the least recently used entries are evicted past max_entries."""
+    from agent.note_store import NoteStore
+
+    store = NoteStore(tmp_path / "notes.sqlite", ttl_s=0.05)
+    store.put(NOTE["source_url"], "x", "What is AI?", NOTE)
+    time.sleep(0.1)
+    assert store.get(NOTE["source_url"], "x", "What is AI?") is None
+
+    store = NoteStore(tmp_path / "lru.sqlite", max_entries=2)
+    for i in range(3):
+        store.put(f"https://example.com/{i}", "x", "What is AI?", NOTE)
+    assert len(store) == 2
+    assert store.get("https://example.com/0", "x", "What is AI?") is None
+
+
+def test_second_run_skips_extraction(fake_llm, tmp_path):
+    """A repeat run serves every note from the store and reports it in metrics."""
+    from agent.graph import run_research
+
+    cache = str(tmp_path / "notes.sqlite")
+    first = run_research(query="What is AI?", search_provider="stub", enable_cove=False, note_cache=cache)
+    assert first["metrics"]["note_cache_misses"] == len(first["sources"])
+
+    fake_llm.calls.clear()
+    second = run_research(query="What is AI?", search_provider="stub", enable_cove=False, note_cache=cache)
+
+    assert calls_for(fake_llm, "extracting factual information") == []
+    assert second["metrics"]["note_cache_hits"] == len(second["sources"])
+    assert second["metrics"]["extract_calls"] == 0
+    assert second["notes"] == first["notes"]
@@ -0,0 +1,73 @@
+"""Tests for patch-based CoVe revision."""
+
+import json
+
+import pytest
+
+import tests.conftest
+
+
+def test_apply_edits():
+    """Anchors match once (whitespace may differ); removals drop emptied list items; misses are returned."""
+    from agent.patch import apply_edits
+
+    draft = "# Report\n\nSolar output rose 20% [1].\n\n- Panels last  30 years [2].\n- Costs fell [1].\n"
+    patched, unmatched = apply_edits(draft, [
+        {"anchor": "Solar output rose 20% [1].", "replacement": "Solar output may have risen 20% [1]."},
+        {"anchor": "Panels last 30 years [2].", "replacement": ""},
+        {"anchor": "[1]", "replacement": "[3]"},  # ambiguous
+        {"anchor": "Wind output fell.", "replacement": "x"},
+    ])
+    assert patched == "# Report\n\nSolar output may have risen 20% [1].\n\n- Costs fell [1].\n"
+    assert [e["anchor"] for e in unmatched] == ["[1]", "Wind output fell."]
+
+
+def _rewrites(recorder) -> list:
+    # full-report reviser calls
+    return [m for _, m in recorder.calls if "Produce the final revised report" in m[-1].content]
+
+
+@pytest.fixture
+def reviser_edits(fake_llm, monkeypatch):
+    """Make the patch reviser return the edits in `edits`."""
+    canned = tests.conftest.fake_response
+    edits = []
+
+    def fake_response(messages):
+        if "returning only the edits" in messages[-1].content:
+            return json.dumps({"edits": edits})
+        return canned(messages)
+
+    monkeypatch.setattr(tests.conftest, "fake_response", fake_response)
+    return edits
+
+
+def test_patch_revision_edits_the_draft(reviser_edits, fake_llm):
+    """The draft is patched in place with a local checklist; no full rewrite and no streamed JSON."""
+    from agent.graph import stream_research
+
+    reviser_edits.append({"anchor": "is well documented [1].", "replacement": "appears to be documented [1]."})
+    events = list(stream_research(
+        "What is wind power?", search_provider="stub", enable_cove=True, revision_mode="patch", tokens=True,
+    ))
+
+    state = events[-1]["state"]
+    assert state["report"].startswith(state["report_draft"].replace("is well documented [1].", "appears to be documented [1].").rstrip())
+    assert "**Verification Checklist**\n- What is wind power? is well documented - " in state["report"]
+    assert state["metrics"]["revision_edits"] == 1
+    assert "revision_fallbacks" not in state["metrics"]
+    assert not _rewrites(fake_llm)
+    assert not [e for e in events if e["type"] == "token" and e["node"] == "revise_report"]
+
+
+def test_unmatched_anchor_falls_back_to_rewrite(reviser_edits, fake_llm):
+    """An edit whose anchor isn't in the draft triggers the full rewrite."""
+    from agent.graph import run_research
+
+    reviser_edits.append({"anchor": "A sentence the writer never wrote.", "replacement": "x"})
+    state = run_research("What is wind power?", search_provider="stub", enable_cove=True, revision_mode="patch")
+
+    assert state["metrics"]["revision_fallbacks"] == 1
+    assert "revision_edits" not in state["metrics"]
+    assert len(_rewrites(fake_llm)) == 1
+    assert state["report"].startswith("# Report")
@@ -0,0 +1,80 @@
+"""
+Streaming planner tests - subquestions are searched while the plan streams
+"""
+
+import json
+import time
+
+import pytest
+
+import tests.conftest
+
+
+def test_parser_emits_items_as_they_complete():
+    """Array items are emitted as soon as their closing quote arrives."""
+    from agent.jsonstream import StreamingArrayParser
+
+    doc = json.dumps({
+        "outline": ["Intro", "Not a \"subquestion\""],
+        "subquestions": ["What is \"X\"?", "How, exactly: [does] it work?"],
+        "nested": {"subquestions": ["ignored"]},
+    })
+    parser = StreamingArrayParser("subquestions")
+    emitted = []
+    for i in range(0, len(doc), 3):
+        emitted.append(parser.feed(doc[i:i + 3]))
+
+    flat = [item for batch in emitted for item in batch]
+    assert flat == ['What is "X"?', "How, exactly: [does] it work?"]
+    # the first item is out well before the document ends
+    first_batch = next(i for i, batch in enumerate(emitted) if batch)
+    assert first_batch < len(emitted) - 5
+
+
+def test_searches_overlap_planner_stream(fake_llm, monkeypatch):
+    """The first search starts before the planner finishes streaming."""
+    import agent.graph
+    from agent.search import StubSearch
+
+    events = []
+
+    class SlowStream(fake_llm):
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            for chunk in super()._stream(messages, stop, run_manager, **kwargs):
+                time.sleep(0.005)
+                yield chunk
+            events.append(("plan_done", time.perf_counter()))
+
+    class RecordingSearch(StubSearch):
+        def search(self, query, max_results=5):
+            events.append(("search", time.perf_counter()))
+            return super().search(query, max_results)
+
+    monkeypatch.setattr(agent.graph, "chat_model", lambda model, **kw: SlowStream(model=model))
+    monkeypatch.setattr(agent.graph, "get_search_provider", lambda *a, **k: RecordingSearch())
+
+    result = agent.graph.run_research(query="What is hydropower?", search_provider="stub", enable_cove=False)
+
+    plan_done = next(t for name, t in events if name == "plan_done")
+    first_search = min(t for name, t in events if name == "search")
+    assert first_search < plan_done
+    assert result["metrics"]["searches_during_planning"] == len(result["plan"])
+    assert [sr["query"] for sr in result["search_results"]] == result["plan"]
+
+
+@pytest.mark.parametrize("content", ['["What is hydropower?"]', '"hydropower"', "null", "{not json"])
+def test_non_object_plan_searches_the_query(fake_llm, monkeypatch, content):
+    """A planner response that isn't a JSON object falls back to searching the query itself."""
+    from agent.graph import run_research
+
+    canned = tests.conftest.fake_response
+
+    def fake_response(messages):
+        return content if "research planning assistant" in messages[0].content else canned(messages)
+
+    monkeypatch.setattr(tests.conftest, "fake_response", fake_response)
+    result = run_research(query="What is tidal power?", search_provider="stub", enable_cove=False)
+
+    assert result["plan"] == ["What is tidal power?"]
+    assert result["outline"] is None
+    assert result["report"]
@@ -0,0 +1,38 @@
+"""Tests for the cache-friendly prompt layout and per-node cached token metrics."""
+
+import os
+
+
+def test_extraction_prompts_share_query_prefix(fake_llm):
+    """Extraction calls differ only after the instructions and query."""
+    from agent.graph import run_research
+    from tests.conftest import calls_for
+
+    run_research(query="What is wave energy?", search_provider="stub", enable_cove=False)
+
+    prompts = [m[-1].content for m in calls_for(fake_llm, "extracting factual information")]
+    assert len(prompts) > 1
+    shared = os.path.commonprefix(prompts)
+    assert "What is wave energy?" in shared
+    assert "Extract factual notes" in shared
+    assert "Source title" not in shared
+
+
+def test_writer_and_reviser_share_context(fake_llm):
+    """Writer and reviser lead with identical system + notes messages; the reviser's is cached."""
+    from agent.graph import run_research
+    from tests.conftest import calls_for
+
+    result = run_research(query="What is biomass energy?", search_provider="stub", enable_cove=True)
+
+    writer, reviser = calls_for(fake_llm, "research report writer and editor")
+    assert [m.content for m in writer[:2]] == [m.content for m in reviser[:2]]
+    assert "Research notes by source" in writer[1].content
+    assert "Verification results" in reviser[-1].content
+
+    metrics = result["metrics"]
+    assert set(metrics["input_tokens"]) >= {"plan_research", "select_and_extract", "draft_report", "revise_report"}
+    context_tokens = sum(len(m.content) for m in writer[:2]) // 4
+    assert metrics["cached_tokens"]["revise_report"] >= context_tokens
+    assert metrics["cached_tokens"]["select_and_extract"] > 0
+    assert metrics["first_token_s"]["plan_research"] >= 0
@@ -0,0 +1,60 @@
+"""
+Passage ranking tests - BM25 selection of the best chunks per source
+"""
+
+from tests.conftest import calls_for
+
+
+def test_relevant_passage_ranks_first():
+    """The chunk that mentions the query terms scores highest."""
+    from agent.rank import relevance_scores
+
+    passages = [
+        "The company was founded in 1998 and has offices worldwide.",
+        "Battery energy density improved to 300 Wh/kg in lithium cells.",
+        "Our newsletter covers many topics each week.",
+    ]
+    scores = relevance_scores(passages, "lithium battery energy density", ["battery cost trends"])
+
+    assert scores.argmax() == 1
+    assert scores[0] == 0
+
+
+def test_select_passages_respects_k_and_budget():
+    """At most k passages per source, within the token budget, in document order."""
+    from agent.rank import estimate_tokens, select_passages
+
+    chunks = {
+        "https://a.com": [f"Filler paragraph number {i} about nothing much." for i in range(10)]
+        + ["Solar panel efficiency reached 24 percent.", "Solar costs fell; panel efficiency keeps rising."],
+        "https://b.com": ["Unrelated text only."],
+    }
+    selected = select_passages(chunks, "solar panel efficiency", k=2, token_budget=40)
+
+    text = selected["https://a.com"]
+    assert text.split("\n\n") == chunks["https://a.com"][10:]
+    assert estimate_tokens(text) <= 40 + 2
+    assert selected["https://b.com"] == "Unrelated text only."
+
+
+def test_extraction_uses_ranked_raw_content(fake_llm, tmp_path):
+    """With raw content enabled, extraction sees ranked passages instead of the snippet."""
+    from agent.graph import run_research
+    from agent.runs import RunStore
+    from agent.serialize import unpack
+
+    store = RunStore(tmp_path)
+    result = run_research(
+        query="What is geothermal energy?",
+        search_provider="stub",
+        enable_cove=False,
+        use_raw_content=True,
+        run_store=store,
+    )
+
+    prompts = [m[-1].content for m in calls_for(fake_llm, "extracting factual information")]
+    assert len(prompts) == len(result["sources"])
+    assert all("Extended stub content" in p for p in prompts)
+    # the state keeps the chunks' blob IDs; the chunks are in the run store's blobs
+    assert set(result["chunks"]) == {s["url"] for s in result["sources"]}
+    assert all("Extended stub content" in "".join(unpack(store.blobs.get(ref))) for ref in result["chunks"].values())
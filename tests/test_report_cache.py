@@ -0,0 +1,99 @@
+"""Tests for the near-duplicate report cache."""
+
+
+def _state(query, report="# Report"):
+    return {"query": query, "report": report, "status": "complete", "metrics": {"extract_calls": 3}}
+
+
+def test_query_similarity_separates_paraphrases_from_new_topics():
+    """Rewordings score above the default threshold; a different subject does not."""
+    from agent.report_cache import query_vector
+
+    def sim(a, b):
+        return float(query_vector(a) @ query_vector(b))
+
+    assert sim("How do heat pumps work?", "how does a heat pump work") > 0.85
+    assert sim("Compare Rust and Go for backend services", "Rust vs Go for backend services") > 0.85
+    assert sim("benefits of remote work", "Remote work: benefits") > 0.85
+    assert sim("history of the Roman empire", "history of the Ottoman empire") < 0.85
+    assert sim("What is wind power?", "What is solar power?") < 0.85
+
+
+def test_numbers_must_match_for_a_hit(tmp_path):
+    """Queries differing only in a year, version or model number never share a report."""
+    from agent.report_cache import ReportCache, query_numbers
+
+    assert query_numbers("New features in Python 3.12 vs 3.11") == {"3.12", "3.11"}
+    cache = ReportCache(tmp_path / "reports.db")
+    pairs = [
+        ("State of AI regulation in the EU in 2023", "State of AI regulation in the EU in 2024"),
+        ("new features in Python 3.12", "new features in Python 3.11"),
+        ("latest iPhone 15 camera improvements", "latest iPhone 16 camera improvements"),
+    ]
+    for cached, other in pairs:
+        cache.put(cached, {}, _state(cached))
+        assert cache.get(other, {}) is None
+        assert cache.get(cached.lower(), {})["metrics"]["served_from_cache"]["query"] == cached
+    # numbers are recovered from the stored queries on reopen
+    assert ReportCache(tmp_path / "reports.db").lookup("State of AI regulation in the EU in 2024", {}) is None
+
+
+def test_cache_matches_config_ttl_and_persists(tmp_path, monkeypatch):
+    """Hits need the same report config and a fresh entry; entries survive reopening."""
+    import agent.report_cache
+    from agent.report_cache import ReportCache
+
+    path = tmp_path / "reports.db"
+    cache = ReportCache(path, ttl_s=100)
+    cache.put("How do heat pumps work?", {"report_style": "default"}, _state("How do heat pumps work?"))
+
+    hit = cache.get("how does a heat pump work", {})  # default style either way
+    assert hit["report"] == "# Report"
+    assert hit["metrics"]["extract_calls"] == 3
+    assert hit["metrics"]["served_from_cache"]["query"] == "How do heat pumps work?"
+    assert cache.get("how does a heat pump work", {"report_style": "academic"}) is None
+    for config in ({"speculative_cove": True}, {"router": {"fast_model": "gpt-4o-mini"}}, {"max_sources": 4}, {"max_searches": 3}):
+        assert cache.get("how does a heat pump work", config) is None
+    assert cache.get("What is tidal power?", {}) is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 6}
+
+    assert len(ReportCache(path)) == 1
+    now = agent.report_cache.time.time()
+    monkeypatch.setattr(agent.report_cache.time, "time", lambda: now + 101)
+    assert cache.get("How do heat pumps work?", {}) is None
+    assert len(ReportCache(path, ttl_s=100)) == 0  # expired entries are evicted on open
+
+
+def test_run_served_from_cache(fake_llm, tmp_path):
+    """A paraphrased query is answered from the cache without calling the model."""
+    from agent.graph import run_research, stream_research
+    from agent.report_cache import ReportCache
+    from agent.runs import RunStore
+
+    cache = ReportCache(tmp_path / "reports.db")
+    store = RunStore(tmp_path / "runs")
+    first = run_research(
+        "What is geothermal energy?", search_provider="stub", enable_cove=False, report_cache=cache, run_store=store,
+    )
+    assert "served_from_cache" not in first["metrics"]
+    calls = len(fake_llm.calls)
+
+    events = list(stream_research(
+        "what's geothermal energy", search_provider="stub", enable_cove=False, report_cache=cache, run_store=store,
+    ))
+    assert [e["node"] for e in events if e["type"] == "progress"] == ["report_cache"]
+    second = events[-1]["state"]
+    assert len(fake_llm.calls) == calls
+    assert second["report"] == first["report"]
+    # a run of its own, pointing at the run it was cached from
+    assert second["run_id"] != first["run_id"]
+    assert second["metrics"]["served_from_cache"]["run_id"] == first["run_id"]
+    # saving the served run leaves the stored original as it was
+    assert "served_from_cache" not in store.load(first["run_id"])["metrics"]
+    assert store.load(second["run_id"])["report"] == first["report"]
+    assert second["metrics"]["served_from_cache"]["similarity"] >= 0.85
+
+    # CoVe changes the report, so it is a different cache entry
+    run_research("what's geothermal energy", search_provider="stub", enable_cove=True, report_cache=cache)
+    assert len(fake_llm.calls) > calls
+    assert len(cache) == 2
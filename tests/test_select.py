@@ -0,0 +1,72 @@
+"""
+Source selection tests - scored, subquestion-aware selection
+"""
+
+
+def _result(url, title, content, score):
+    return {"url": url, "title": title, "content": content, "score": score}
+
+
+def test_every_subquestion_is_covered():
+    """A later subquestion still gets a source when earlier ones have many high scorers."""
+    from agent.extract import select_sources
+
+    results = [
+        {"query": "solar cost", "results": [
+            _result(f"https://site{i}.com/solar", "Solar cost", "Solar cost per watt fell sharply.", 0.95)
+            for i in range(6)
+        ]},
+        {"query": "wind capacity", "results": [
+            _result("https://wind.org/capacity", "Wind capacity", "Wind capacity grew in 2025.", 0.4),
+        ]},
+    ]
+    sources = select_sources(results, max_sources=3, query="renewable energy")
+
+    assert len(sources) == 3
+    assert "https://wind.org/capacity" in [s["url"] for s in sources]
+    assert {s["subquestion"] for s in sources} == {"solar cost", "wind capacity"}
+
+
+def test_relevance_floor_and_score_order():
+    """Low-relevance results are dropped; the rest are taken by score."""
+    from agent.extract import select_sources
+
+    results = [{"query": "lithium battery density", "results": [
+        _result("https://a.com/x", "Cookie policy", "We use cookies on this site.", 0.05),
+        _result("https://b.com/x", "Battery density", "Lithium battery density reached 300 Wh/kg.", 0.6),
+        _result("https://c.com/x", "Battery news", "Lithium battery prices and density trends.", 0.9),
+    ]}]
+    sources = select_sources(results, max_sources=5, query="lithium battery", min_relevance=0.2)
+
+    urls = [s["url"] for s in sources]
+    assert "https://a.com/x" not in urls
+    assert urls == ["https://c.com/x", "https://b.com/x"]
+    assert sources[0]["score"] >= sources[1]["score"]
+
+
+def test_relevance_floor_is_absolute():
+    """A pool of weak matches is dropped whole; the best of them isn't kept just for being the best."""
+    from agent.extract import select_sources
+
+    results = [{"query": "lithium battery density", "results": [
+        _result("https://a.com/x", "Cookie policy", "We use cookies on this site.", 0.1),
+        _result("https://b.com/x", "Newsletter", "Sign up for battery deals and news.", 0.1),
+    ]}]
+    assert select_sources(results, max_sources=5, query="lithium battery", min_relevance=0.4) == []
+    # the same results clear a floor their provider scores alone meet
+    assert len(select_sources(results, max_sources=5, query="lithium battery", min_relevance=0.05)) == 2
+
+
+def test_dedupes_canonical_urls_and_spreads_domains():
+    """URL variants collapse to one source and same-domain results are penalized."""
+    from agent.extract import select_sources
+
+    results = [{"query": "fusion energy", "results": [
+        _result("https://www.big.com/a?utm_source=x", "Fusion energy", "Fusion energy research at ITER.", 0.9),
+        _result("https://big.com/a", "Fusion energy", "Fusion energy research at ITER.", 0.9),
+        _result("https://big.com/b", "Fusion energy", "Fusion energy research update.", 0.85),
+        _result("https://small.org/c", "Fusion energy", "Fusion energy research results.", 0.8),
+    ]}]
+    sources = select_sources(results, max_sources=2, min_unique_domains=1, query="fusion energy")
+
+    assert [s["domain"] for s in sources] == ["big.com", "small.org"]
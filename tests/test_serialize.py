@@ -0,0 +1,108 @@
+"""
+Compact serialization tests - blob store, packed states, checkpoint serializer
+"""
+
+import pytest
+
+
+def test_state_roundtrip_stores_report_once():
+    """Report text shared by report, report_draft and the last message is one blob."""
+    from agent.blobs import BlobStore
+    from agent.serialize import dumps_state, loads_state
+
+    report = "Findings. " * 200
+    state = {
+        "query": "q",
+        "messages": [{"role": "user", "content": "q"}, {"role": "assistant", "content": report}],
+        "search_results": [{"query": "q", "results": [{"url": "https://a.com", "content": "x" * 2000}]}],
+        "report_draft": report,
+        "report": report,
+        "notes": [],
+        "status": "complete",
+    }
+    blobs = BlobStore()
+    data = dumps_state(state, blobs)
+
+    assert loads_state(data, blobs) == state
+    assert len(data) < 300
+    assert len(blobs) == 2  # search results + one copy of the report
+
+
+def test_dir_blob_store_shared_across_runs(tmp_path):
+    """Runs saved to the same store share identical payloads on disk."""
+    from agent.runs import RunStore
+
+    store = RunStore(tmp_path)
+    base = {"query": "q", "messages": [], "report": "r" * 1000, "report_draft": "r" * 1000}
+    store.save({**base, "run_id": "one"})
+    store.save({**base, "run_id": "two"})
+
+    assert store.load("two")["report"] == "r" * 1000
+    assert len(store.blobs) == 1
+
+
+def test_checkpointed_run_with_compact_serializer(fake_llm):
+    """A checkpointed run works with the compact serializer and its state can be read back."""
+    from langgraph.checkpoint.memory import InMemorySaver
+    from agent.graph import run_research
+    from agent.serialize import CompactSerializer
+
+    serde = CompactSerializer(blob_min=256)
+    saver = InMemorySaver(serde=serde)
+    result = run_research(query="What is tidal power?", search_provider="stub", enable_cove=False, checkpointer=saver)
+
+    checkpoint = saver.get({"configurable": {"thread_id": result["run_id"]}})
+    assert checkpoint["channel_values"]["report"] == result["report"]
+    assert len(serde.blobs) > 0
+
+
+def test_durable_saver_needs_an_on_disk_blob_store(tmp_path):
+    """A durable checkpointer with in-memory blobs is refused; an on-disk blob store is accepted."""
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from agent.blobs import BlobStore
+    from agent.graph import build_graph
+    from agent.serialize import CompactSerializer
+
+    class DurableSaver(BaseCheckpointSaver):
+        pass
+
+    with pytest.raises(ValueError, match="in memory"):
+        build_graph(search_provider="stub", checkpointer=DurableSaver(serde=CompactSerializer()))
+    build_graph(search_provider="stub", checkpointer=DurableSaver(serde=CompactSerializer(BlobStore(tmp_path))))
+
+
+def test_report_is_not_copied_into_messages(fake_llm):
+    """The finished state holds the report once; messages only describe the steps."""
+    from agent.graph import run_research
+
+    result = run_research(query="What is tidal power?", search_provider="stub", enable_cove=True)
+
+    assert result["report"]
+    assert all(result["report"] not in m["content"] for m in result["messages"])
+    assert result["messages"][-1]["content"].startswith("Revised the draft (")
+
+
+@pytest.mark.parametrize("use_raw_content", [False, True])
+def test_page_text_stays_out_of_the_state(fake_llm, use_raw_content):
+    """No streamed state carries raw_content; with use_raw_content it is a blob ID extraction reads back."""
+    from agent.graph import build_graph, stream_research
+    from tests.conftest import calls_for
+
+    config = {"search_provider": "stub", "enable_cove": False, "use_raw_content": use_raw_content}
+    graph = build_graph(**config)
+    values = []
+
+    class Recording:
+        def stream(self, *args, **kwargs):
+            for mode, chunk in graph.stream(*args, **kwargs):
+                if mode == "values":
+                    values.append(chunk)
+                yield mode, chunk
+
+    events = list(stream_research("What is wave power?", graph=Recording(), **config))
+
+    results = [r for state in [*values, events[-1]["state"]] for sr in state["search_results"] for r in sr["results"]]
+    assert results and not any("raw_content" in r for r in results)
+    assert all(("raw_content_id" in r) == use_raw_content for r in results)
+    prompts = [m[-1].content for m in calls_for(fake_llm, "extracting factual information")]
+    assert all(("Extended stub content" in p) == use_raw_content for p in prompts)
@@ -0,0 +1,130 @@
+"""
+HTTP service tests - stub search + fake model through the ASGI app
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("starlette")
+
+
+def _sse_events(response) -> list[dict]:
+    events = []
+    for line in response.iter_lines():
+        if line.startswith("data: "):
+            events.append(json.loads(line[len("data: "):]))
+    return events
+
+
+def test_submit_stream_and_fetch_result(fake_llm):
+    """A job runs to completion, streams node progress and exposes its report."""
+    from starlette.testclient import TestClient
+    from agent.service import create_app
+
+    app = create_app(workers=2, defaults={"search_provider": "stub", "enable_cove": False})
+    with TestClient(app) as client:
+        response = client.post("/research", json={"query": "What is nuclear fusion?"})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        with client.stream("GET", f"/research/{job_id}/events") as stream:
+            events = _sse_events(stream)
+
+        nodes = [e["node"] for e in events if e["type"] == "progress"]
+        assert nodes == ["plan_research", "run_searches", "select_and_extract", "draft_report"]
+        assert events[-1]["type"] == "complete"
+
+        job = client.get(f"/research/{job_id}").json()
+        assert job["status"] == "complete"
+        assert job["result"]["report"]
+        assert job["result"]["sources"]
+
+        # same config -> the compiled graph is reused
+        client.post("/research", json={"query": "What is nuclear fission?"})
+        assert client.get("/health").json()["cached_graphs"] == 1
+        (graph,) = app.state.service.graphs._graphs.values()
+
+    # shutting the service down releases the cached graph's search pool
+    assert graph.research_agent.search_pool._shutdown
+    assert not len(app.state.service.graphs)
+
+
+def test_queue_full_returns_429():
+    """Submissions past the queue bound are rejected with 429."""
+    from starlette.testclient import TestClient
+    from agent.service import create_app
+
+    app = create_app(workers=0, queue_size=1, defaults={"search_provider": "stub"})
+    with TestClient(app) as client:
+        assert client.post("/research", json={"query": "first"}).status_code == 202
+        response = client.post("/research", json={"query": "second"})
+        assert response.status_code == 429
+        assert client.get("/health").json()["queued"] == 1
+
+
+def test_rejects_bad_requests():
+    """Missing query, unknown config keys and unknown jobs are client errors."""
+    from starlette.testclient import TestClient
+    from agent.service import create_app
+
+    with TestClient(create_app(workers=0)) as client:
+        assert client.post("/research", json={}).status_code == 400
+        assert client.post("/research", json={"query": "q", "config": {"checkpointer": 1}}).status_code == 400
+        assert client.post("/research", json={"query": "q", "config": ["max_sources"]}).status_code == 400
+        assert client.post("/research", json={"query": "q", "config": 5}).status_code == 400
+        assert client.post("/research", json={"query": 5}).status_code == 400
+        assert client.get("/research/nope").status_code == 404
+
+
+def test_graph_cache_is_bounded():
+    """Past max_size the least recently used graph is evicted, and closed once its runs release it."""
+    from agent.graphs import GraphCache
+
+    closed = []
+
+    class Agent:
+        def __init__(self, config):
+            self.config = config
+
+        def close(self):
+            closed.append(self.config)
+
+    class Graph:
+        def __init__(self, **config):
+            self.research_agent = Agent(config)
+
+    graphs = GraphCache(Graph, max_size=2)
+    a = graphs.acquire({"max_sources": 1})
+    graphs.release(a)
+    with graphs.using({"max_sources": 2, "max_tokens": 100}) as b:  # budget options don't key the cache
+        assert graphs.acquire({"max_sources": 2}) is b
+        graphs.release(b)
+        assert graphs.acquire({"max_sources": 1}) is a  # a is now the most recently used
+        graphs.release(a)
+        with graphs.using({"max_sources": 3}):
+            assert closed == []  # b was evicted but is still running
+        assert len(graphs) == 2
+    assert closed == [{"max_sources": 2}]
+
+    graphs.close()
+    assert sorted(c["max_sources"] for c in closed) == [1, 2, 3]
+    assert len(graphs) == 0
+
+
+def test_identical_requests_join_one_job():
+    """A request identical to a pending job returns that job instead of queueing another."""
+    from starlette.testclient import TestClient
+    from agent.service import create_app
+
+    with TestClient(create_app(workers=0, queue_size=4)) as client:
+        first = client.post("/research", json={"query": "Trending topic", "config": {"search_provider": "stub"}})
+        second = client.post("/research", json={"query": "trending  TOPIC", "config": {"search_provider": "stub"}})
+        other = client.post("/research", json={"query": "Trending topic", "config": {"search_provider": "stub", "max_sources": 3}})
+
+        assert first.json()["job_id"] == second.json()["job_id"]
+        assert other.json()["job_id"] != first.json()["job_id"]
+        metrics = client.get("/metrics").json()
+        assert metrics["service"]["queued"] == 2
+        assert metrics["service"]["coalesced_jobs"] == 1
+        assert "search" in metrics["singleflight"]
@@ -0,0 +1,141 @@
+"""
+Singleflight tests - identical concurrent work runs once
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tests.conftest import calls_for
+
+
+def test_concurrent_calls_share_one_execution():
+    """Callers with the same key get the leader's result; errors reach everyone."""
+    from agent.singleflight import SingleFlight
+
+    flight = SingleFlight("test")
+    executions = []
+
+    def slow():
+        executions.append(1)
+        time.sleep(0.05)
+        return {"value": 42}
+
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: flight.do("k", slow), range(5)))
+
+    assert len(executions) == 1
+    assert all(r == {"value": 42} for r, _ in results)
+    assert sum(shared for _, shared in results) == 4
+    assert flight.stats() == {"executions": 1, "shared": 4, "in_flight": 0}
+
+    def boom():
+        time.sleep(0.05)
+        raise RuntimeError("backend down")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flight.do, "err", boom) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_coalescing_search_single_backend_call():
+    """Identical concurrent searches hit the provider once."""
+    from agent.singleflight import CoalescingSearch
+
+    calls = []
+    barrier = threading.Barrier(4)
+
+    class SlowProvider:
+        def search(self, query, max_results=5):
+            calls.append(query)
+            time.sleep(0.05)
+            return [{"url": "https://a.com", "title": "A", "content": query}]
+
+    search = CoalescingSearch(SlowProvider(), name="slow-test")
+
+    def run(_):
+        barrier.wait()
+        return search.search("same query")
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(run, range(4)))
+
+    assert calls == ["same query"]
+    assert all(r == results[0] for r in results)
+
+
+def test_coalescing_groups_separate_indexes_and_cassettes(tmp_path):
+    """Searches only coalesce across agents reading the same index without a cassette of their own."""
+    from agent.cassette import Cassette
+    from agent.graph import ResearchAgent
+
+    def group(**kwargs):
+        return ResearchAgent(search_provider="stub", **kwargs).search.name
+
+    assert group() == group()
+    assert group(local_index=str(tmp_path / "a")) != group(local_index=str(tmp_path / "b"))
+    assert group(cassette=Cassette(tmp_path / "c", mode="record")) != group()
+
+
+def test_identical_runs_coalesce(fake_llm, tmp_path):
+    """Concurrent identical run_research calls share one pipeline execution, saved to every caller's store."""
+    from agent.graph import run_research
+    from agent.runs import RunStore
+
+    barrier = threading.Barrier(3)
+    stores = [RunStore(tmp_path / str(i)) for i in range(3)]
+
+    def run(i):
+        barrier.wait()
+        return run_research(query="What is graphene?", search_provider="stub", enable_cove=False, run_store=stores[i])
+
+    with ThreadPoolExecutor(3) as pool:
+        results = list(pool.map(run, range(3)))
+
+    assert len(calls_for(fake_llm, "research planning assistant")) == 1
+    assert sum(1 for r in results if r["metrics"].get("coalesced")) == 2
+    assert len({r["report"] for r in results}) == 1
+    assert all(store.load(results[0]["run_id"])["report"] == results[0]["report"] for store in stores)
+
+
+def test_shared_calls_are_counted_per_run(fake_llm, monkeypatch):
+    """Runs that join each other's model calls & searches count them as shared, not as their own calls."""
+    import agent.search
+    import tests.conftest
+    from agent.graph import run_research
+
+    canned = tests.conftest.fake_response
+    stub_search = agent.search.StubSearch.search
+
+    def slow_response(messages):
+        time.sleep(0.05)
+        return canned(messages)
+
+    def slow_search(self, query, max_results=5):
+        time.sleep(0.05)
+        return stub_search(self, query, max_results)
+
+    monkeypatch.setattr(tests.conftest, "fake_response", slow_response)
+    monkeypatch.setattr(agent.search.StubSearch, "search", slow_search)
+    barrier = threading.Barrier(2)
+
+    def run(_):
+        barrier.wait()
+        return run_research(
+            query="What is perovskite?", search_provider="stub", enable_cove=False, stream_plan=False, coalesce=False,
+        )
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(run, range(2)))
+
+    metrics = [r["metrics"] for r in results]
+    assert sum(m.get("shared_llm_calls", 0) for m in metrics) >= 1
+    assert sum(m.get("shared_searches", 0) for m in metrics) >= 1
+    # every model call is reported by exactly one run; each run made or joined all of its calls
+    assert sum(sum(m.get("model_calls", {}).values()) for m in metrics) == len(fake_llm.calls)
+    per_run = [sum(m.get("model_calls", {}).values()) + m.get("shared_llm_calls", 0) for m in metrics]
+    assert per_run[0] == per_run[1]
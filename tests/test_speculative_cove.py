@@ -0,0 +1,77 @@
+"""Tests for speculative CoVe (verifying the draft while it streams)."""
+
+import time
+
+import pytest
+
+
+@pytest.fixture
+def slow_writer(fake_llm, monkeypatch):
+    """Stream report text slowly so speculative work can overlap it."""
+    stream = fake_llm._stream
+
+    def slow_stream(self, messages, *args, **kwargs):
+        for chunk in stream(self, messages, *args, **kwargs):
+            if "verification specialist" not in messages[0].content:
+                time.sleep(0.02)
+            yield chunk
+
+    monkeypatch.setattr(fake_llm, "_stream", slow_stream)
+    return fake_llm
+
+
+def test_paragraph_splitter():
+    """Completed paragraphs come out in spans of min_chars, headings and sources dropped."""
+    from agent.jsonstream import ParagraphSplitter
+
+    splitter = ParagraphSplitter(min_chars=20)
+    text = "# Title\n\nShort one.\n\nA longer second paragraph.\n\nThird\n\n**Sources**\n[1] x\n\nmore"
+    spans = [s for i in range(0, len(text), 5) for s in splitter.feed(text[i:i + 5])]
+    assert spans == ["Short one.\n\nA longer second paragraph."]
+    assert splitter.close() == ["Third"]
+
+
+def test_speculative_run_skips_serial_cove_stages(fake_llm, monkeypatch):
+    """Claims are verified inside draft_report and the run goes straight to revision."""
+    import agent.graph
+    from agent.graph import stream_research
+    from tests.conftest import calls_for
+
+    monkeypatch.setattr(agent.graph, "COVE_SPAN_CHARS", 0)
+    events = list(stream_research(
+        "What is wave power?", search_provider="stub", enable_cove=True, speculative_cove=True, tokens=True,
+    ))
+
+    progress = [e["node"] for e in events if e["type"] == "progress"]
+    assert progress == ["plan_research", "run_searches", "select_and_extract", "draft_report", "revise_report"]
+    state = events[-1]["state"]
+    compiles = calls_for(fake_llm, "verification specialist")
+    assert len(compiles) == state["metrics"]["speculative_spans"] == 2  # TL;DR and findings paragraphs
+    assert all("Draft excerpt:" in m[1].content for m in compiles)
+    assert len(state["verification_results"]) == 2
+    assert all(c["status"] in ("confirmed", "mixed", "insufficient") for c in state["verification_results"])
+    assert state["report"] and state["status"] == "complete"
+    # compile output is not streamed as report text
+    drafted = "".join(e["text"] for e in events if e["type"] == "token" and e["node"] == "draft_report")
+    assert drafted == state["report_draft"]
+
+
+def test_verification_overlaps_the_draft(slow_writer, monkeypatch):
+    """Claim compilation starts before the draft has finished streaming."""
+    import agent.graph
+    from agent.graph import run_research
+    from agent.tracing import InMemoryExporter, Tracer
+
+    monkeypatch.setattr(agent.graph, "COVE_SPAN_CHARS", 0)
+    exporter = InMemoryExporter()
+    run_research(
+        query="What is tidal energy?", search_provider="stub", enable_cove=True, speculative_cove=True,
+        tracer=Tracer(exporter),
+    )
+
+    llm = [s for s in exporter.spans if s["kind"] == "llm"]
+    writer = next(s for s in llm if s["attributes"].get("speculative"))
+    # dispatched while the writer streams, so nested under its span
+    compiles = [s for s in llm if s["parent_id"] == writer["span_id"]]
+    assert compiles and all(s["attributes"]["model"] == "gpt-4o-mini" for s in compiles)
+    assert min(s["start_ns"] for s in compiles) < writer["end_ns"]
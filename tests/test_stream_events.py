@@ -0,0 +1,20 @@
+"""
+Event stream tests - progress and live report tokens from stream_research
+"""
+
+
+def test_stream_research_events(fake_llm):
+    """Progress events follow the graph nodes and tokens rebuild the report."""
+    from agent.graph import stream_research
+
+    events = list(stream_research("What is AI?", search_provider="stub", enable_cove=True, tokens=True))
+
+    progress = [e["node"] for e in events if e["type"] == "progress"]
+    assert progress == [
+        "plan_research", "run_searches", "select_and_extract", "draft_report",
+        "compile_verification", "verify_claims", "revise_report",
+    ]
+    final = events[-1]
+    assert final["type"] == "result"
+    revised = "".join(e["text"] for e in events if e["type"] == "token" and e["node"] == "revise_report")
+    assert revised == final["state"]["report"]
@@ -0,0 +1,79 @@
+"""Tests for run tracing and the critical-path analyzer."""
+
+
+def _span(span_id, parent_id, start, end, name=None):
+    return {
+        "trace_id": "t", "span_id": span_id, "parent_id": parent_id, "name": name or span_id,
+        "kind": "node", "start_ns": start, "end_ns": end, "status": "ok", "attributes": {},
+    }
+
+
+def test_critical_path_follows_blocking_children():
+    """The path takes the child that finished last, then what finished before it started."""
+    from agent.tracing import critical_path
+
+    spans = [
+        _span("root", None, 0, 100),
+        _span("a", "root", 0, 30),   # overlaps b, finishes first: not blocking
+        _span("b", "root", 10, 90),
+        _span("b1", "b", 20, 80),
+        _span("c", "root", 90, 100),
+    ]
+    assert [s["span_id"] for s in critical_path(spans)] == ["root", "b", "b1", "c"]
+
+
+def test_traced_run_spans(fake_llm):
+    """A traced run nests node, LLM and search spans under one run span."""
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from agent.graph import run_research
+    from agent.tracing import InMemoryExporter, Tracer, critical_path
+
+    exporter = InMemoryExporter()
+    run_research(
+        query="What is solar thermal energy?",
+        search_provider="stub",
+        enable_cove=True,
+        tracer=Tracer(exporter),
+        checkpointer=InMemorySaver(),
+    )
+    spans = exporter.spans
+    by_id = {s["span_id"]: s for s in spans}
+    (root,) = [s for s in spans if s["parent_id"] is None]
+    assert root["kind"] == "run"
+    assert len({s["trace_id"] for s in spans}) == 1
+
+    nodes = {s["name"]: s for s in spans if s["kind"] == "node"}
+    assert set(nodes) == {
+        "plan_research", "run_searches", "select_and_extract", "draft_report",
+        "compile_verification", "verify_claims", "revise_report",
+    }
+    assert all(s["parent_id"] == root["span_id"] for s in nodes.values())
+
+    llm = [s for s in spans if s["kind"] == "llm"]
+    assert all(s["attributes"]["model"] and s["attributes"]["input_tokens"] > 0 for s in llm)
+    searches = [s for s in spans if s["kind"] == "search"]
+    # searches dispatched while the plan streams sit under the planner's LLM span
+    assert searches and all(by_id[s["parent_id"]]["kind"] in ("node", "llm") for s in searches)
+    assert all("bytes" in s["attributes"] for s in searches)
+
+    path = critical_path(spans)
+    assert path[0] is root
+    assert "draft_report" in [s["name"] for s in path]
+
+
+def test_trace_file_and_analyzer(fake_llm, tmp_path, capsys):
+    """--trace-out style JSONL traces load back into a waterfall and critical path."""
+    from agent.graph import run_research
+    from agent.tracing import JsonlExporter, Tracer, main
+
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(JsonlExporter(path))
+    run_research(query="What is hydrogen storage?", search_provider="stub", enable_cove=False, tracer=tracer)
+    tracer.shutdown()
+
+    main([str(path)])
+    out = capsys.readouterr().out
+    assert "run:research" in out
+    assert "node:draft_report" in out
+    assert "Critical path:" in out
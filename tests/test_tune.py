@@ -0,0 +1,92 @@
+"""Tests for the parameter sweep autotuner and quality checks."""
+
+
+def _trial(trial_id, latency, tokens, quality):
+    return {"id": trial_id, "config": {"max_sources": trial_id}, "latency_s": latency, "tokens": tokens, "quality": quality}
+
+
+def test_quality_checks_mirror_eval_checks():
+    """Sections, citations and sources are measured; score is the share of checks passed."""
+    from agent.quality import quality_checks
+
+    good = quality_checks({
+        "report": "**TL;DR**: x [1] and [2]\n\n**Sources**\n[1] a",
+        "sources": [{}, {}],
+        "verification_results": [{"status": "confirmed"}],
+    })
+    assert good == {"sections": True, "citations": 3, "sources": 2, "passed": 4, "checks": 4, "score": 1.0}
+    bad = quality_checks({"report": "no structure", "sources": [{}]})
+    assert (bad["passed"], bad["checks"]) == (0, 3)
+
+
+def test_pareto_frontier_and_presets():
+    """Dominated and failed trials drop out; presets come from the frontier."""
+    from agent.tune import pareto_frontier, recommend
+
+    trials = [
+        _trial(1, 1.0, 100, 0.5),
+        _trial(2, 2.0, 200, 1.0),
+        _trial(3, 3.0, 300, 1.0),  # dominated by 2
+        _trial(4, 1.5, 150, 0.75),
+        {"id": 5, "config": {}, "error": "boom"},
+    ]
+    frontier = pareto_frontier(trials)
+    assert [t["id"] for t in frontier] == [1, 4, 2]
+
+    presets = recommend(frontier, min_quality=0.75)
+    assert presets["fast"]["id"] == 4
+    assert presets["quality"]["id"] == 2
+    assert presets["balanced"]["max_sources"] in (2, 4)
+
+
+def test_grid_sweep_records_then_replays(fake_llm, tmp_path):
+    """A second sweep over the same grid is served from the first sweep's cassettes."""
+    from agent.tune import sweep
+
+    space = {"max_sources": [1, 3], "enable_cove": [False, True]}
+    kwargs = dict(space=space, cassette_dir=tmp_path, replay_latency="zero", base={"search_provider": "stub"})
+
+    first = sweep(["What is wind power?"], **kwargs)
+    assert len(first["trials"]) == 4
+    assert not any("error" in t for t in first["trials"])
+    assert all(t["replayed"] == 0 for t in first["trials"])
+    by_config = {(t["config"]["max_sources"], t["config"]["enable_cove"]): t for t in first["trials"]}
+    assert by_config[(3, True)]["search_calls"] > by_config[(3, False)]["search_calls"]
+    assert by_config[(1, False)]["tokens"] < by_config[(3, False)]["tokens"]
+    assert set(first["presets"]) == {"fast", "balanced", "quality"}
+
+    calls = len(fake_llm.calls)
+    second = sweep(["What is wind power?"], **kwargs)
+    assert len(fake_llm.calls) == calls  # nothing reached the chat model
+    assert all(t["replayed"] == 1 for t in second["trials"])
+    assert [t["tokens"] for t in second["trials"]] == [t["tokens"] for t in first["trials"]]
+
+    # other base settings record their own cassettes rather than replaying these
+    third = sweep(["What is wind power?"], **{**kwargs, "base": {"search_provider": "stub", "max_searches": 2}})
+    assert all(t["replayed"] == 0 for t in third["trials"])
+
+
+def test_bayes_sweep_explores_without_repeats(monkeypatch):
+    """The TPE search stays within its trial budget, never repeats a config and finds the best region."""
+    import agent.tune
+    from agent.tune import config_id, sweep
+
+    def fake_trial(config, queries, *args):
+        # quality peaks at max_sources=5; latency grows with searches
+        return {
+            "id": config_id(config),
+            "config": config,
+            "latency_s": config["max_searches"] * 1.0,
+            "tokens": config["max_sources"] * 100,
+            "search_calls": config["max_searches"],
+            "quality": 1.0 - abs(config["max_sources"] - 5) / 10,
+        }
+
+    monkeypatch.setattr(agent.tune, "run_trial", fake_trial)
+    space = {"max_searches": [2, 4, 6, 8], "max_sources": [1, 3, 5, 7, 9], "enable_cove": [False, True]}
+    result = sweep(["q"], space=space, strategy="bayes", trials=16, seed=3)
+
+    ids = [t["id"] for t in result["trials"]]
+    assert len(ids) == 16 and len(set(ids)) == 16
+    assert result["presets"]["quality"]["max_sources"] == 5
+    assert result["presets"]["fast"]["max_searches"] == min(t["config"]["max_searches"] for t in result["trials"])
@@ -0,0 +1,96 @@
+"""Tests for the durable job queue and research workers."""
+
+import threading
+import time
+
+import pytest
+
+
+def test_queue_leases_acks_and_retries(tmp_path):
+    """A leased job is held until acked or its lease lapses; failures retry up to max_attempts."""
+    from agent.jobs import SQLiteJobQueue
+
+    queue = SQLiteJobQueue(tmp_path / "jobs.db", max_attempts=2, retry_delay_s=0)
+    with pytest.raises(ValueError):
+        queue.put("q", {"checkpointer": 1})
+    first = queue.put("first", {"enable_cove": False})
+    second = queue.put("second")
+
+    job = queue.lease("a", lease_s=60)
+    assert (job["id"], job["config"], job["attempts"]) == (first, {"enable_cove": False}, 1)
+    assert queue.lease("b", lease_s=60)["id"] == second
+    assert queue.lease("c", lease_s=60) is None
+    assert queue.heartbeat(first, "a", lease_s=60)
+    assert not queue.ack(first, "b", "run-b")  # not b's lease
+    assert queue.ack(first, "a", "run-a")
+    assert queue.get(first)["status"] == "complete" and queue.get(first)["run_id"] == "run-a"
+
+    # a failure goes back in the queue until the last attempt
+    assert queue.fail(second, "b", "boom")
+    assert queue.get(second)["status"] == "queued"
+    assert queue.lease("c", lease_s=60)["attempts"] == 2
+    assert queue.fail(second, "c", "boom again")
+    assert queue.get(second)["status"] == "failed" and queue.get(second)["error"] == "boom again"
+    assert queue.stats() == {"queued": 0, "running": 0, "complete": 1, "failed": 1}
+
+    # survives reopening
+    assert SQLiteJobQueue(tmp_path / "jobs.db").get(first)["status"] == "complete"
+
+
+def test_crashed_workers_job_is_picked_up(fake_llm, tmp_path):
+    """A job whose worker died mid-run is leased again once its lease lapses, and completes."""
+    from agent.jobs import SQLiteJobQueue
+    from agent.runs import RunStore
+    from agent.worker import Worker
+
+    queue = SQLiteJobQueue(tmp_path / "jobs.db")
+    job_id = queue.put("What is geothermal energy?")
+    assert queue.lease("crashed", lease_s=0.05)["id"] == job_id  # ...and never heard from again
+
+    store = RunStore(tmp_path / "runs")
+    worker = Worker(queue, store, lease_s=30, defaults={"search_provider": "stub", "enable_cove": False})
+    assert not worker.run_one()  # still leased
+    time.sleep(0.1)
+    worker.run(drain=True)
+
+    job = queue.get(job_id)
+    assert job["status"] == "complete" and job["attempts"] == 2
+    assert store.load(job["run_id"])["report"]
+    assert not queue.ack(job_id, "crashed", "stale-run")  # the dead worker's late ack is refused
+
+
+def test_workers_share_a_queue(fake_llm, tmp_path):
+    """Several workers drain one queue; every job runs exactly once and lands in the shared run store."""
+    from agent.jobs import SQLiteJobQueue
+    from agent.runs import RunStore
+    from agent.worker import Worker
+
+    path = tmp_path / "jobs.db"
+    job_ids = [SQLiteJobQueue(path).put(f"Topic number {i}") for i in range(6)]
+    store = RunStore(tmp_path / "runs")
+    built = []
+
+    def factory(**config):
+        from agent.graph import build_graph
+
+        built.append(config)
+        return build_graph(**config)
+
+    # separate queue connections, as separate processes would have
+    workers = [
+        Worker(SQLiteJobQueue(path), store, concurrency=2, defaults={"search_provider": "stub", "enable_cove": False},
+               graph_factory=factory)
+        for _ in range(2)
+    ]
+    threads = [threading.Thread(target=w.run, kwargs={"drain": True}) for w in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    queue = SQLiteJobQueue(path)
+    assert sum(w.completed for w in workers) == 6
+    assert queue.stats()["complete"] == 6
+    assert all(queue.get(j)["attempts"] == 1 for j in job_ids)
+    assert sorted(store.load(queue.get(j)["run_id"])["query"] for j in job_ids) == sorted(f"Topic number {i}" for i in range(6))
+    assert len(built) <= 2  # one compiled graph per worker process & config